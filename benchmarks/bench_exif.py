@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import datetime
+import tempfile
+from PIL import Image
+from PIL.ExifTags import TAGS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.exif_reader import get_exif_date
+
+# Usage: python benchmarks/bench_exif.py [folder] [count]
+
+def legacy_get_exif_date(file_path):
+    # The previous Image.open + _getexif + TAGS loop, kept for comparison
+    try:
+        image = Image.open(file_path)
+        exif_data = image._getexif()
+        if exif_data:
+            for tag, value in exif_data.items():
+                if TAGS.get(tag) == 'DateTimeOriginal':
+                    return datetime.datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+    except Exception:
+        pass
+    return None
+
+def make_corpus(folder, count):
+    exif = Image.Exif()
+    exif.get_ifd(0x8769)[0x9003] = "2021:03:14 15:09:26"
+    image = Image.new("RGB", (640, 480), (120, 80, 40))
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"IMG_{i:05d}.jpg")
+        image.save(path, exif=exif if i % 4 else Image.Exif())
+        paths.append(path)
+    return paths
+
+def bench(func, paths):
+    start = time.perf_counter()
+    dates = [func(p) for p in paths]
+    elapsed = time.perf_counter() - start
+    return len(paths) / elapsed, dates
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        if folder:
+            paths = [os.path.join(r, f) for r, _, fs in os.walk(folder) for f in fs][:count]
+        else:
+            paths = make_corpus(tmp, count)
+
+        legacy_rate, legacy_dates = bench(legacy_get_exif_date, paths)
+        fast_rate, fast_dates = bench(get_exif_date, paths)
+        mismatches = sum(a != b for a, b in zip(legacy_dates, fast_dates))
+
+        print(f"📷 Files: {len(paths)}")
+        print(f"🐢 PIL _getexif + TAGS: {legacy_rate:,.0f} files/s")
+        print(f"⚡ Header reader:       {fast_rate:,.0f} files/s ({fast_rate / legacy_rate:.1f}x)")
+        print(f"🔎 Mismatched dates: {mismatches}")
+
+if __name__ == "__main__":
+    main()
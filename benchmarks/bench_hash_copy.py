@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.hashing import default_algorithm, hash_file, hash_sample
+from utils.transfer import Checksum, copy_file, hash_copy
+
+# Usage: python benchmarks/bench_hash_copy.py [total_mb] [file_mb] [dest_dir]
+#
+# Compares getting a copy plus its hashes three ways: copying (in-kernel
+# copy_file_range) and hashing the source afterwards, as a later duplicate
+# scan would; hashing while copying (utils.transfer.hash_copy) at several
+# buffer sizes; and hashing while copying with verification. Source files are
+# evicted from the page cache before every run where the platform allows.
+
+BUFFER_SIZES = (256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024)
+
+def make_files(folder, total_mb, file_mb):
+    chunk = os.urandom(1024 * 1024)
+    paths = []
+    for i in range(max(1, total_mb // file_mb)):
+        path = os.path.join(folder, f"VID_{i:04d}.mp4")
+        with open(path, "wb") as f:
+            for _ in range(file_mb):
+                f.write(chunk)
+        paths.append(path)
+    return paths
+
+def evict(paths):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def copy_then_hash(path, dest):
+    copy_file(path, dest)
+    # A later duplicate scan finds the source cold again
+    evict([path])
+    return hash_file(path), hash_sample(path)
+
+def timed(name, paths, dest_dir, func):
+    shutil.rmtree(dest_dir, ignore_errors=True)
+    os.makedirs(dest_dir)
+    evict(paths)
+    start = time.perf_counter()
+    for path in paths:
+        func(path, os.path.join(dest_dir, os.path.basename(path)))
+    seconds = time.perf_counter() - start
+    mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+    print(f"   {name:<30} {seconds:7.2f}s  {mb / seconds:8.1f} MB/s", end="")
+    return seconds
+
+def main():
+    total_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    file_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        dest_dir = os.path.join(sys.argv[3] if len(sys.argv) > 3 else tmp, "bench_hash_copy_dest")
+        src = os.path.join(tmp, "src")
+        os.makedirs(src)
+        paths = make_files(src, total_mb, file_mb)
+        print(f"📂 {len(paths)} file(s) of {file_mb} MB, hash {default_algorithm()}")
+
+        baseline = timed("copy, then hash the source", paths, dest_dir, copy_then_hash)
+        print()
+        for size in BUFFER_SIZES:
+            def one_pass(path, dest, size=size):
+                hash_copy(path, dest, Checksum(), buffer_size=size)
+            seconds = timed(f"hash while copying ({size // 1024} KB)", paths, dest_dir, one_pass)
+            print(f"  {baseline / seconds:5.2f}x")
+        timed("hash while copying + verify", paths, dest_dir,
+              lambda path, dest: hash_copy(path, dest, Checksum(verify=True)))
+        print()
+        shutil.rmtree(dest_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
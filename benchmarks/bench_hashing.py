@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import hashlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.hashing import HASH_METHODS, default_algorithm, hash_file
+from utils.hash_engine import HashEngine
+
+# Usage: python benchmarks/bench_hashing.py [total_mb] [file_mb] [algorithm]
+#
+# Compares full-file hashing of a folder of files: the old md5 loop over
+# 4 KB reads, utils.hashing.hash_file with each read method, and HashEngine
+# at several worker counts. Files are evicted from the page cache before
+# every run where the platform allows, so the numbers include the reads.
+
+WORKER_COUNTS = (1, 4, 8)
+
+def make_files(folder, total_mb, file_mb):
+    chunk = os.urandom(1024 * 1024)
+    items = []
+    for i in range(max(1, total_mb // file_mb)):
+        path = os.path.join(folder, f"IMG_{i:04d}.jpg")
+        with open(path, "wb") as f:
+            for _ in range(file_mb):
+                f.write(chunk)
+        items.append((path, os.path.getsize(path)))
+    return items
+
+def evict(items):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path, _ in items:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def legacy_md5(path):
+    # main.get_file_hash before the shared hashing helpers
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(4096), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def timed(name, items, run, baseline=None):
+    evict(items)
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    mb = sum(size for _, size in items) / (1024 * 1024)
+    line = f"   {name:<30} {seconds:7.2f}s  {mb / seconds:8.1f} MB/s"
+    if baseline:
+        line += f"  {baseline / seconds:5.2f}x"
+    print(line)
+    return seconds
+
+def main():
+    total_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    file_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    algorithm = sys.argv[3] if len(sys.argv) > 3 else default_algorithm()
+    with tempfile.TemporaryDirectory() as tmp:
+        items = make_files(tmp, total_mb, file_mb)
+        print(f"📂 {len(items)} file(s) of {file_mb} MB, hash {algorithm}, {os.cpu_count()} CPU(s)")
+
+        baseline = timed("md5, 4 KB reads (old)", items, lambda: [legacy_md5(path) for path, _ in items])
+        for method in HASH_METHODS:
+            timed(f"hash_file, {method}", items,
+                  lambda: [hash_file(path, algorithm, method=method) for path, _ in items], baseline)
+        for method in HASH_METHODS:
+            for workers in WORKER_COUNTS:
+                engine = HashEngine(workers=workers, algorithm=algorithm, method=method)
+                timed(f"HashEngine, {method}, {workers} worker(s)", items,
+                      lambda: list(engine.hash_files(items)), baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import datetime
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.catalog import ensure_schema
+from utils.query import CatalogQuery, open_catalog
+
+# Usage: python benchmarks/bench_query.py [row_count] [page_size]
+#
+# Fills a catalog with synthetic rows, then times the first page, a page
+# deep into the results (resumed from a cursor) and a full streamed pass of
+# typical searches, with the query plan and peak Python memory of the pass.
+
+SEARCHES = {
+    "videos March 2021 > 5 min": dict(media_type="video", date_from="2021-03", date_to="2021-03", min_duration=300),
+    "images 2019 by date": dict(media_type="image", date_from="2019", date_to="2019"),
+    "everything by date": dict(),
+    "files over 1 GB by size": dict(min_size=1024 ** 3, order="size"),
+    "4K videos": dict(media_type="video", min_resolution="3840x2160"),
+}
+
+def fill(db_path, count, seed=0):
+    rng = random.Random(seed)
+    epoch = datetime.datetime(2010, 1, 1)
+    conn = sqlite3.connect(db_path)
+    ensure_schema(conn)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def rows():
+        for i in range(count):
+            kind = rng.choice(("image", "image", "image", "video", "other"))
+            date = epoch + datetime.timedelta(seconds=rng.randrange(15 * 365 * 86400))
+            video = kind == "video"
+            yield (f"IMG_{i:08d}.jpg", f"/archive/{date:%Y/%m}/IMG_{i:08d}.jpg", kind,
+                   date.isoformat() if rng.random() > 0.02 else None,
+                   int(rng.lognormvariate(15, 2)), i, i, f"{rng.getrandbits(64):016x}",
+                   rng.uniform(1, 1800) if video else None,
+                   rng.choice(("1920x1080", "3840x2160", "1280x720")) if video else None)
+
+    conn.executemany(
+        "INSERT INTO media (filename, filepath, media_type, date_taken, size, mtime_ns, inode, content_hash, "
+        "duration, resolution) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows())
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "media.db")
+        start = time.perf_counter()
+        fill(db_path, count)
+        print(f"🏗️  {count:,} rows in {time.perf_counter() - start:.1f}s")
+        conn = open_catalog(db_path)
+
+        for name, filters in SEARCHES.items():
+            query = CatalogQuery(conn, **filters)
+            start = time.perf_counter()
+            pages = query.pages(page_size)
+            first = next(pages, None)
+            first_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            total = len(first.rows) if first else 0
+            deep_cursor = None
+            for index, page in enumerate(pages):
+                total += len(page.rows)
+                if index == 50:
+                    deep_cursor = page.cursor
+            full = time.perf_counter() - start
+
+            # Separate pass: tracemalloc slows allocation-heavy loops a lot
+            tracemalloc.start()
+            for page in query.pages(page_size):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            deep_ms = None
+            if deep_cursor:
+                start = time.perf_counter()
+                next(query.pages(page_size, after=deep_cursor), None)
+                deep_ms = (time.perf_counter() - start) * 1000
+
+            print(f"\n🔎 {name}: {total:,} rows")
+            print(f"   first page {first_ms:.2f} ms"
+                  + (f", page 50 via cursor {deep_ms:.2f} ms" if deep_ms is not None else "")
+                  + f", full pass {full:.2f}s, peak {peak / 1024:.0f} KB")
+            print(f"   plan: {' | '.join(query.explain())}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
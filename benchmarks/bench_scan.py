@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.scanner import scan
+
+# Usage: python benchmarks/bench_scan.py [file_count] [existing_folder]
+
+def make_tree(folder, count, files_per_dir=500):
+    for i in range(count):
+        sub = os.path.join(folder, f"d{i // (files_per_dir * 20):03d}", f"s{i // files_per_dir:05d}")
+        if i % files_per_dir == 0:
+            os.makedirs(sub, exist_ok=True)
+        ext = (".jpg", ".mp4", ".pdf", ".bin")[i % 4]
+        with open(os.path.join(sub, f"IMG_{i:07d}{ext}"), "wb") as f:
+            f.write(b"x" * (i % 64))
+
+def walk_and_stat(folder):
+    # What every operation used to do: os.walk into a list, then stat again
+    all_files = []
+    for root, _, files in os.walk(folder):
+        for file in files:
+            all_files.append(os.path.join(root, file))
+    total = 0
+    for path in all_files:
+        total += os.path.getsize(path) + int(os.path.getmtime(path))
+    return len(all_files), total
+
+def scanner(folder):
+    count = total = 0
+    for entry in scan(folder):
+        count += 1
+        total += entry.size + int(entry.mtime)
+    return count, total
+
+def timed(func, folder):
+    start = time.perf_counter()
+    result = func(folder)
+    return time.perf_counter() - start, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = sys.argv[2] if len(sys.argv) > 2 else tmp
+        if folder == tmp:
+            print(f"🏗️  Building synthetic tree with {count:,} files...")
+            make_tree(tmp, count)
+
+        walk_time, walk_result = timed(walk_and_stat, folder)
+        scan_time, scan_result = timed(scanner, folder)
+        assert walk_result == scan_result, (walk_result, scan_result)
+
+        print(f"📂 Files: {walk_result[0]:,}")
+        print(f"🐢 os.walk + getsize/getmtime: {walk_time:.2f}s")
+        print(f"⚡ scandir scanner:            {scan_time:.2f}s ({walk_time / scan_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startup-time benchmark with a budget.
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --repeat 10 --import-budget-ms 120
+#
+# For each entry point it runs `python -X importtime -c "import <module>"` in
+# a fresh interpreter, takes the median cumulative import time and lists
+# which heavy dependencies got loaded. It then times a whole cron-style run
+# (`cli.py by-size` on a tiny drop folder) from process start to exit.
+#
+# Exits with status 1 when an import or the cron run is over budget, or when
+# a light entry point loads a heavy dependency (cv2, PIL, numpy, tqdm,
+# multiprocessing), so a stray top-level import is caught even on a fast box.
+
+HEAVY_MODULES = ("cv2", "PIL", "numpy", "tqdm", "ffmpeg", "multiprocessing")
+
+# (module, heavy modules it may load, budget in ms or None for the default)
+ENTRY_POINTS = (
+    ("cli", (), None),
+    ("main", (), None),
+    ("operations.sort_by_size", (), None),
+    ("operations.sort_by_date", (), None),
+    ("operations.separate_media", (), None),
+    ("operations.organize_documents", (), None),
+    ("operations.duplicate_finder", (), None),
+    ("gui_app", (), None),
+    # Needs numpy by nature, but must not drag in OpenCV or PIL
+    ("operations.near_duplicates", ("numpy",), 400),
+)
+
+def import_profile(module):
+    # Returns (cumulative import seconds, set of top-level packages loaded)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip()}")
+    cumulative = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # the header line
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1_000_000
+    return cumulative, loaded
+
+def cron_run(tmp, index):
+    source = os.path.join(tmp, "drop")
+    if not os.path.isdir(source):
+        os.makedirs(source)
+        for i in range(5):
+            with open(os.path.join(source, f"IMG_{i:04d}.jpg"), "wb") as f:
+                f.write(os.urandom(1024))
+    dest = os.path.join(tmp, f"out{index}")
+    command = [sys.executable, os.path.join(ROOT, "cli.py"), "by-size", source, "-d", dest,
+               "--catalog", os.path.join(tmp, "catalog.db")]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"cron run failed:\n{result.stderr.strip()}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and cron-run startup time against a budget")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the median counts")
+    parser.add_argument("--import-budget-ms", type=float, default=150, help="budget per entry point import")
+    parser.add_argument("--run-budget-ms", type=float, default=250, help="budget for a whole cron-style run")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"🚀 Import time (median of {args.repeat}, budget {args.import_budget_ms:.0f} ms):")
+    for module, allowed, budget in ENTRY_POINTS:
+        budget = budget or args.import_budget_ms
+        timings = []
+        loaded = set()
+        for _ in range(args.repeat):
+            seconds, loaded = import_profile(module)
+            timings.append(seconds)
+        ms = statistics.median(timings) * 1000
+        heavy = sorted(name for name in loaded if name in HEAVY_MODULES and name not in allowed)
+        over = ms > budget
+        mark = "❌" if over or heavy else "✅"
+        extra = f"  loads {', '.join(heavy)}" if heavy else ""
+        print(f"   {mark} {module:<32} {ms:>7.1f} ms{extra}")
+        if over:
+            failures.append(f"{module} imports in {ms:.1f} ms (budget {budget:.0f} ms)")
+        if heavy:
+            failures.append(f"{module} loads {', '.join(heavy)} at import time")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = [cron_run(tmp, i) for i in range(args.repeat)]
+    ms = statistics.median(timings) * 1000
+    over = ms > args.run_budget_ms
+    print(f"\n⏱️  cli.py by-size on 5 files: {ms:.1f} ms (budget {args.run_budget_ms:.0f} ms) "
+          f"{'❌' if over else '✅'}")
+    if over:
+        failures.append(f"cron run takes {ms:.1f} ms")
+
+    if failures:
+        print("\n❌ Over budget:\n   " + "\n   ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.async_transfer import TransferEngine
+from utils.transfer import transfer_file
+
+# Usage: python benchmarks/bench_transfer.py [file_count] [latency_ms] [max_files]
+#
+# Simulates a network share by adding latency_ms to every copy, then
+# compares one-at-a-time copies with the asyncio engine. Point TMPDIR at a
+# tmpfs (e.g. /dev/shm) to measure only the scheduling, not the disk.
+
+def make_files(folder, count, size=64 * 1024):
+    payload = os.urandom(size)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"IMG_{i:05d}.jpg")
+        with open(path, "wb") as f:
+            f.write(payload)
+        paths.append(path)
+    return paths
+
+def serial(paths, dest, latency):
+    for path in paths:
+        time.sleep(latency)
+        transfer_file(path, os.path.join(dest, os.path.basename(path)))
+
+def engine(paths, dest, latency, max_files):
+    with TransferEngine(max_files=max_files, latency=latency) as eng:
+        for path in paths:
+            eng.submit(path, os.path.join(dest, os.path.basename(path)))
+        eng.drain()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 5) / 1000
+    max_files = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dest_a, dest_b = (os.path.join(tmp, name) for name in ("src", "serial", "engine"))
+        for folder in (src, dest_a, dest_b):
+            os.makedirs(folder)
+        paths = make_files(src, count)
+
+        start = time.perf_counter()
+        serial(paths, dest_a, latency)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine(paths, dest_b, latency, max_files)
+        engine_time = time.perf_counter() - start
+        assert sorted(os.listdir(dest_a)) == sorted(os.listdir(dest_b))
+
+        print(f"📂 Files: {count:,} with {latency * 1000:.1f} ms injected latency each")
+        print(f"🐢 one at a time:           {serial_time:.2f}s")
+        print(f"⚡ engine ({max_files} in flight): {engine_time:.2f}s ({serial_time / engine_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import struct
+import datetime
+
+# Deterministic synthetic media corpus for the benchmark suite.
+#
+# The same (files, seed) always produces byte-identical files, names, tree
+# shape and mtimes, so timings from different commits are comparable. The
+# mix covers what the operations care about:
+#   JPEGs with and without EXIF DateTimeOriginal, tiny MP4s with and without
+#   an mvhd creation time, documents, other files, runs of same-named files
+#   in different folders, a few very deep folders and exact-duplicate clusters.
+#
+# Usage: python benchmarks/corpus.py <folder> [file_count] [seed]
+
+CORPUS_VERSION = 2
+CORPUS_INFO = "corpus.json"
+PRESETS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+KIND_WEIGHTS = (("jpeg_exif", 30), ("jpeg_plain", 15), ("mp4", 15), ("document", 25), ("other", 15))
+DOCUMENT_EXTENSIONS = (".pdf", ".docx", ".xlsx", ".pptx", ".txt", ".csv", ".odt")
+OTHER_EXTENSIONS = (".bin", ".zip", ".json", ".log")
+SHARED_NAME_RATIO = 0.3     # files drawn from a small pool of repeating names
+SHARED_NAMES = 200
+DUPLICATE_RATIO = 0.05      # files that are exact copies of an earlier file
+DEEP_TREE_RATIO = 0.02      # files placed 8-16 folders deep
+FILES_PER_FOLDER = 400
+DATE_PLACEHOLDER = b"2000:01:01 00:00:00"
+MP4_EPOCH_OFFSET = 2082844800
+# UTC, so timestamps (MP4 creation times, mtimes) don't depend on the local timezone
+EPOCH = datetime.datetime(2015, 1, 1, tzinfo=datetime.timezone.utc)
+
+# --- File builders ---
+
+def _jpeg_templates(rng, count=16):
+    # A few real encoded JPEGs; per-file variation is a patched EXIF date and
+    # trailing bytes after EOI, which decoders ignore
+    from PIL import Image
+    exif = Image.Exif()
+    exif.get_ifd(0x8769)[0x9003] = DATE_PLACEHOLDER.decode()
+    templates = {"jpeg_exif": [], "jpeg_plain": []}
+    for _ in range(count):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new("RGB", (64, 48), color)
+        image.putpixel((rng.randrange(64), rng.randrange(48)), (255, 255, 255))
+        for kind, extra in (("jpeg_exif", {"exif": exif}), ("jpeg_plain", {})):
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=80, **extra)
+            templates[kind].append(buffer.getvalue())
+    return templates
+
+def _box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def make_mp4(created, duration=10, width=1920, height=1080, payload=b""):
+    # Smallest container read_mp4_metadata understands: ftyp, moov with
+    # mvhd/trak/tkhd, then mdat
+    ftyp = _box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomiso2mp41")
+    mvhd = _box(b"mvhd", struct.pack(">B3xIIII", 0, created, created, 1000, duration * 1000) + bytes(80))
+    tkhd = _box(b"tkhd", struct.pack(">B3xIIIIII8x", 0, created, created, 1, 0, duration * 1000, 0)
+                + bytes(4 + 36) + struct.pack(">II", width << 16, height << 16))
+    moov = _box(b"moov", mvhd + _box(b"trak", tkhd))
+    return ftyp + moov + _box(b"mdat", payload)
+
+def _random_date(rng):
+    return EPOCH + datetime.timedelta(seconds=rng.randrange(10 * 365 * 86400))
+
+# --- Layout ---
+
+def _folder_for(rng, index):
+    if rng.random() < DEEP_TREE_RATIO:
+        depth = rng.randrange(8, 17)
+        return os.path.join(*[f"deep{level:02d}" for level in range(depth)])
+    bucket = index // FILES_PER_FOLDER
+    return os.path.join(f"y{bucket % 10}", f"batch{bucket:05d}")
+
+def _choose_kind(rng):
+    total = sum(weight for _, weight in KIND_WEIGHTS)
+    pick = rng.randrange(total)
+    for kind, weight in KIND_WEIGHTS:
+        if pick < weight:
+            return kind
+        pick -= weight
+    return KIND_WEIGHTS[-1][0]
+
+def _extension(rng, kind):
+    if kind.startswith("jpeg"):
+        return ".jpg"
+    if kind == "mp4":
+        return ".mp4"
+    if kind == "document":
+        return rng.choice(DOCUMENT_EXTENSIONS)
+    return rng.choice(OTHER_EXTENSIONS)
+
+def _content(rng, kind, index, templates):
+    tail = struct.pack(">Q", index)
+    date = _random_date(rng)
+    if kind == "jpeg_exif":
+        data = rng.choice(templates[kind]).replace(DATE_PLACEHOLDER, date.strftime("%Y:%m:%d %H:%M:%S").encode(), 1)
+        return data + tail, date
+    if kind == "jpeg_plain":
+        return rng.choice(templates[kind]) + tail, None
+    if kind == "mp4":
+        # One in four has no creation time and needs the mtime fallback
+        created = 0 if rng.random() < 0.25 else int(date.timestamp()) + MP4_EPOCH_OFFSET
+        size = rng.choice((512, 4096, 65536))
+        return make_mp4(created, payload=tail * (size // 8)), date if created else None
+    size = rng.choice((64, 512, 4096, 32768))
+    return (tail * (size // 8 + 1))[:size], None
+
+# --- Generation ---
+
+def generate(folder, files=10_000, seed=0, progress=True):
+    # Returns the corpus description; reuses an existing corpus built with
+    # the same parameters instead of writing it again
+    info_path = os.path.join(folder, CORPUS_INFO)
+    wanted = {"version": CORPUS_VERSION, "files": files, "seed": seed}
+    if os.path.exists(info_path):
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        if all(info.get(key) == value for key, value in wanted.items()):
+            return info
+
+    rng = random.Random(seed)
+    templates = _jpeg_templates(rng)
+    root = os.path.join(folder, "media")
+    counts = {kind: 0 for kind, _ in KIND_WEIGHTS}
+    counts.update(duplicates=0, shared_names=0, deep=0)
+    written = []  # (relative path, bytes) candidates for duplicate clusters
+    total_bytes = 0
+    created_dirs = set()
+    start = time.perf_counter()
+
+    for index in range(files):
+        subfolder = _folder_for(rng, index)
+        if subfolder.startswith("deep"):
+            counts["deep"] += 1
+        if written and rng.random() < DUPLICATE_RATIO:
+            source_name, data = rng.choice(written)
+            name = source_name
+            counts["duplicates"] += 1
+            mtime = EPOCH.timestamp() + rng.randrange(10 * 365 * 86400)
+        else:
+            kind = _choose_kind(rng)
+            counts[kind] += 1
+            ext = _extension(rng, kind)
+            if rng.random() < SHARED_NAME_RATIO:
+                name = f"IMG_{rng.randrange(SHARED_NAMES):04d}{ext}"
+                counts["shared_names"] += 1
+            else:
+                name = f"F{index:07d}{ext}"
+            data, date = _content(rng, kind, index, templates)
+            mtime = (date or _random_date(rng)).timestamp()
+            if len(written) < 4096 and rng.random() < 0.1:
+                written.append((name, data))
+
+        target_dir = os.path.join(root, subfolder)
+        if target_dir not in created_dirs:
+            os.makedirs(target_dir, exist_ok=True)
+            created_dirs.add(target_dir)
+        path = os.path.join(target_dir, name)
+        if os.path.exists(path):
+            stem, ext = os.path.splitext(name)
+            path = os.path.join(target_dir, f"{stem}_{index}{ext}")
+        with open(path, "wb") as f:
+            f.write(data)
+        os.utime(path, (mtime, mtime))
+        total_bytes += len(data)
+        if progress and index and index % 50_000 == 0:
+            print(f"   … {index:,} files", file=sys.stderr)
+
+    info = dict(wanted, root=root, bytes=total_bytes, counts=counts,
+                generated_seconds=round(time.perf_counter() - start, 2))
+    with open(info_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/corpus.py <folder> [file_count|10k|100k|1m] [seed]")
+        sys.exit(1)
+    count = sys.argv[2] if len(sys.argv) > 2 else "10k"
+    files = PRESETS.get(count.lower()) or int(count)
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    info = generate(sys.argv[1], files, seed)
+    print(json.dumps(info, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+
+# Progress bars would dominate the output and skew timings of small corpora
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.corpus import PRESETS, generate
+from utils.catalog import MediaCatalog
+from utils.metrics import metrics
+from utils.transfer import TRANSFER_MODES
+
+# End-to-end benchmark harness. Builds (or reuses) a deterministic corpus,
+# runs each operation against a fresh destination and catalog, and records
+# wall time plus per-stage totals and p50/p99 from utils.metrics.
+#
+#   python benchmarks/run_benchmarks.py --files 10k
+#   python benchmarks/run_benchmarks.py --files 100k --save-baseline benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --files 100k --baseline benchmarks/baseline.json
+#
+# With --baseline the run exits with status 1 when any operation is slower
+# than the baseline by more than --tolerance, so it can gate upgrades.
+# Baselines only compare like with like: same corpus size, seed and version.
+# Copies make the numbers depend on disk writeback; for a stable gate put
+# --corpus-dir and --work-dir on a tmpfs (e.g. /dev/shm) or use
+# --transfer-mode hardlink to time everything but the data copy.
+
+def run_organize_by_date(src, dest, catalog, workers, mode):
+    from operations.sort_by_date import organize_by_date
+    return organize_by_date(src, dest, catalog=catalog, workers=workers, transfer_mode=mode)
+
+def run_find_duplicates(src, dest, catalog, workers, mode):
+    from operations.duplicate_finder import find_duplicates
+    return find_duplicates(src, dest, catalog=catalog, transfer_mode=mode)
+
+def run_sort_by_size(src, dest, catalog, workers, mode):
+    from operations.sort_by_size import sort_by_size
+    return sort_by_size(src, dest, catalog=catalog, transfer_mode=mode)
+
+def run_separate_media(src, dest, catalog, workers, mode):
+    from operations.separate_media import separate_photos_videos
+    return separate_photos_videos(src, dest, transfer_mode=mode)
+
+def run_organize_documents(src, dest, catalog, workers, mode):
+    from operations.organize_documents import organize_documents
+    return organize_documents(src, dest, transfer_mode=mode)
+
+OPERATIONS = {
+    "organize_by_date": run_organize_by_date,
+    "find_duplicates": run_find_duplicates,
+    "sort_by_size": run_sort_by_size,
+    "separate_media": run_separate_media,
+    "organize_documents": run_organize_documents,
+}
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def stage_summary(snapshot):
+    # Totals across file kinds plus the worst per-kind p50/p99 of each stage
+    stages = {}
+    for stage, kinds in snapshot["stages"].items():
+        stages[stage] = {
+            "files": sum(h["count"] for h in kinds.values()),
+            "seconds": round(sum(h["sum_seconds"] for h in kinds.values()), 4),
+            "p50_seconds": max(h["p50_seconds"] for h in kinds.values()),
+            "p99_seconds": max(h["p99_seconds"] for h in kinds.values()),
+        }
+    return stages
+
+def run_operation(name, src, work, workers, mode, repeat, quiet):
+    runner = OPERATIONS[name]
+    timings = []
+    stages = {}
+    for _ in range(repeat):
+        dest = os.path.join(work, f"out_{name}")
+        db_path = os.path.join(work, f"{name}.db")
+        shutil.rmtree(dest, ignore_errors=True)
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(db_path + suffix)
+
+        catalog = MediaCatalog(db_path)
+        output = open(os.devnull, "w") if quiet else sys.stdout
+        try:
+            with contextlib.redirect_stdout(output):
+                start = time.perf_counter()
+                runner(src, dest, catalog, workers, mode)
+                elapsed = time.perf_counter() - start
+        finally:
+            catalog.close()
+            if quiet:
+                output.close()
+        timings.append(elapsed)
+        stages = stage_summary(metrics.snapshot())
+    best = min(timings)
+    return {"seconds": round(best, 4), "runs": [round(t, 4) for t in timings], "stages": stages}
+
+def compare(results, baseline, tolerance):
+    # Returns a list of (operation, baseline s, current s, ratio, regressed)
+    rows = []
+    for name, result in results["operations"].items():
+        base = baseline["operations"].get(name)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        rows.append((name, base["seconds"], result["seconds"], ratio, ratio > 1 + tolerance))
+    return rows
+
+def comparable(results, baseline):
+    keys = ("version", "files", "seed")
+    same_corpus = all(results["corpus"].get(k) == baseline.get("corpus", {}).get(k) for k in keys)
+    return same_corpus and results["transfer_mode"] == baseline.get("transfer_mode", "copy")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark media organizer operations on a synthetic corpus")
+    parser.add_argument("--files", default="10k", help="corpus size: a number or one of " + ", ".join(PRESETS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", help="where to build/reuse the corpus (default: a temporary folder)")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="comma-separated operations to run")
+    parser.add_argument("--workers", type=int, default=1, help="extract workers for organize_by_date")
+    parser.add_argument("--transfer-mode", default="copy", choices=TRANSFER_MODES)
+    parser.add_argument("--work-dir", help="where destinations and catalogs go (default: a temporary folder)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per operation; the fastest counts")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON and fail on regressions")
+    parser.add_argument("--save-baseline", help="write the results JSON as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown, 0.15 = 15%%")
+    parser.add_argument("--verbose", action="store_true", help="show the operations' own output")
+    args = parser.parse_args()
+
+    files = PRESETS.get(args.files.lower()) or int(args.files)
+    names = [n.strip() for n in args.operations.split(",") if n.strip()]
+    unknown = [n for n in names if n not in OPERATIONS]
+    if unknown:
+        parser.error(f"unknown operation(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as tmp:
+        corpus_dir = args.corpus_dir or os.path.join(tmp, "corpus")
+        print(f"🏗️  Corpus: {files:,} files (seed {args.seed}) in {corpus_dir}")
+        corpus = generate(corpus_dir, files, args.seed)
+
+        results = {"environment": environment(), "corpus": {k: v for k, v in corpus.items() if k != "root"},
+                   "transfer_mode": args.transfer_mode, "operations": {}}
+        for name in names:
+            result = run_operation(name, corpus["root"], tmp, args.workers, args.transfer_mode, args.repeat,
+                                   not args.verbose)
+            results["operations"][name] = result
+            rate = files / result["seconds"] if result["seconds"] else 0
+            print(f"⏱️  {name:<20} {result['seconds']:>9.3f}s  {rate:>10,.0f} files/s")
+            for stage, s in sorted(result["stages"].items(), key=lambda kv: -kv[1]["seconds"])[:4]:
+                print(f"      {stage:<16} {s['seconds']:>8.3f}s  p50 {s['p50_seconds'] * 1000:.2f} ms  "
+                      f"p99 {s['p99_seconds'] * 1000:.2f} ms")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Results saved to: {path}")
+
+    if not args.baseline:
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if not comparable(results, baseline):
+        print("⚠️ Baseline was recorded on a different corpus; not comparing.")
+        sys.exit(2)
+
+    regressed = False
+    print(f"\n📊 Against baseline {args.baseline} (tolerance {args.tolerance:.0%}):")
+    for name, base, current, ratio, slower in compare(results, baseline, args.tolerance):
+        mark = "❌" if slower else "✅"
+        print(f"   {mark} {name:<20} {base:>9.3f}s → {current:>9.3f}s ({ratio:.2f}x)")
+        regressed = regressed or slower
+    if regressed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import inspect
+from utils.catalog import DEFAULT_DB_PATH, MediaCatalog
+from utils.classifier import SNIFF_MODES
+from utils.hashing import HASH_METHODS
+from utils.journal import FSYNC_POLICIES
+from utils.metrics import metrics
+from utils.parallel import POOL_MODES
+from utils.scanner import source_roots
+from utils.transfer import TRANSFER_MODES
+
+# Non-interactive entry point for scripts and schedulers.
+#
+#   python cli.py by-date /photos/phone /photos/camera -d /archive --workers 8
+#   python cli.py duplicates /archive -d /archive_dups --mode near
+#   python cli.py apply-manifest /archive/plan_manifest.csv --order destination
+#   python cli.py watch /srv/drop -d /archive --organizer by-date --settle 3
+#   python cli.py query --type video --date 2021-03 --min-duration 5m --format paths
+#   python cli.py run nightly.json
+#
+# Every operation takes any number of source roots. Overlapping roots are
+# collapsed (see utils.scanner.source_roots) and all of them go through one
+# operation call, so they share a single scan, catalog and worker pool.
+#
+# A job spec (JSON, or YAML when PyYAML is installed) lists the sources, one
+# destination, shared settings and the operations to run in order:
+#
+#   {
+#     "sources": ["/mnt/phone", "/mnt/camera", "/mnt/camera/2023"],
+#     "destination": "/mnt/archive",
+#     "catalog": "db/media.db",
+#     "transfer_mode": "hardlink",
+#     "operations": [
+#       {"operation": "by-date", "workers": 8, "resume": true},
+#       {"operation": "duplicates", "destination": "/mnt/archive_dups"}
+#     ]
+#   }
+#
+# Keys at the top level are defaults for every operation; each operation
+# entry may override them. The operations share one catalog and, when
+# parallel_files is set, one transfer engine.
+#
+# `query` searches the catalog instead of the disk (see utils.query). With
+# --limit it stops after that many rows and prints a cursor; --after picks
+# up from there.
+#
+# Exit status: 0 on success, 1 on errors (including failed transfers), 2 when
+# files were skipped but every transfer that was attempted succeeded.
+# SIGTERM stops a run like Ctrl+C does, so `watch` shuts down cleanly.
+
+def _organize_by_date(*args, **kwargs):
+    from operations.sort_by_date import organize_by_date
+    return organize_by_date(*args, **kwargs)
+
+def _sort_by_size(*args, **kwargs):
+    from operations.sort_by_size import sort_by_size
+    return sort_by_size(*args, **kwargs)
+
+def _separate(*args, **kwargs):
+    from operations.separate_media import separate_photos_videos
+    return separate_photos_videos(*args, **kwargs)
+
+def _documents(*args, **kwargs):
+    from operations.organize_documents import organize_documents
+    return organize_documents(*args, **kwargs)
+
+def _duplicates(*args, **kwargs):
+    from operations.duplicate_finder import find_duplicates
+    return find_duplicates(*args, **kwargs)
+
+def _watch(*args, **kwargs):
+    from operations.watch_folder import watch_folder
+    return watch_folder(*args, **kwargs)
+
+def _apply_manifest(*args, **kwargs):
+    from operations.apply_manifest import apply_manifest
+    return apply_manifest(*args, **kwargs)
+
+# Operation modules are imported on first use so `cli.py --help` stays fast
+OPERATIONS = {
+    "by-date": ("operations.sort_by_date", "organize_by_date", _organize_by_date),
+    "by-size": ("operations.sort_by_size", "sort_by_size", _sort_by_size),
+    "separate": ("operations.separate_media", "separate_photos_videos", _separate),
+    "documents": ("operations.organize_documents", "organize_documents", _documents),
+    "duplicates": ("operations.duplicate_finder", "find_duplicates", _duplicates),
+    "watch": ("operations.watch_folder", "watch_folder", _watch),
+}
+
+# Job spec keys that describe the step rather than being operation options
+SPEC_KEYS = ("operation", "sources", "destination", "metrics_dir", "profile", "parallel_files", "rate_limit_mb")
+
+# --- Running ---
+
+def operation_parameters(name):
+    module_name, func_name, _ = OPERATIONS[name]
+    module = __import__(module_name, fromlist=[func_name])
+    return inspect.signature(getattr(module, func_name)).parameters
+
+def run_operation(name, sources, destination, options, catalog=None, engine=None):
+    # options holds keyword arguments by parameter name; anything the
+    # operation does not take is ignored, so specs can share one option set
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {name} (choose from {', '.join(OPERATIONS)})")
+    if not destination:
+        raise ValueError(f"{name}: a destination is required")
+    roots = source_roots(sources)
+    if not roots:
+        raise ValueError(f"{name}: at least one source is required")
+    missing = [root for root in roots if not os.path.isdir(root)]
+    if missing:
+        raise ValueError(f"{name}: source folder(s) not found: {', '.join(missing)}")
+
+    params = operation_parameters(name)
+    # Operations taking **options (watch) forward them and filter themselves
+    takes_all = any(param.kind is param.VAR_KEYWORD for param in params.values())
+    kwargs = {key: value for key, value in options.items()
+              if (key in params or takes_all and key not in SPEC_KEYS) and value is not None}
+    if "catalog" in params and catalog is not None:
+        kwargs["catalog"] = catalog
+    if engine is not None:
+        kwargs["engine"] = engine
+    source = roots[0] if len(roots) == 1 else roots
+    return OPERATIONS[name][2](source, destination, **kwargs)
+
+def make_engine(parallel_files, rate_limit_mb):
+    if not parallel_files:
+        return None
+    from utils.async_transfer import TransferEngine
+    rate = rate_limit_mb * 1024 * 1024 if rate_limit_mb else None
+    return TransferEngine(max_files=parallel_files, rate_limit=rate).start()
+
+def configure_metrics(report_dir, profile_path):
+    # Options win, but leaving them out keeps the environment variables
+    metrics.configure(report_dir or metrics.report_dir, profile_path or metrics.profile_path)
+
+def exit_status(results):
+    status = 0
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        if result.get("failed"):
+            return 1
+        if result.get("skipped") or result.get("cancelled"):
+            status = 2
+    return status
+
+def run_job(spec):
+    defaults = {key: value for key, value in spec.items() if key != "operations"}
+    steps = spec.get("operations") or ([{"operation": spec["operation"]}] if "operation" in spec else [])
+    if not steps:
+        raise ValueError("Job spec lists no operations")
+
+    configure_metrics(defaults.get("metrics_dir"), defaults.get("profile"))
+    catalog = MediaCatalog(defaults.get("catalog") or DEFAULT_DB_PATH)
+    engine = make_engine(defaults.get("parallel_files"), defaults.get("rate_limit_mb"))
+    results = []
+    try:
+        for step in steps:
+            options = dict(defaults, **step)
+            sources = options.get("sources") or []
+            if isinstance(sources, str):
+                sources = [sources]
+            print(f"\n🗂️  {options['operation']}: {len(source_roots(sources))} root(s) → {options.get('destination')}")
+            results.append(run_operation(options["operation"], sources, options.get("destination"),
+                                         options, catalog, engine))
+    finally:
+        if engine is not None:
+            engine.close()
+        catalog.close()
+    return results
+
+def load_spec(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("YAML job specs need PyYAML (pip install pyyaml); use JSON instead")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+# --- Argument parsing ---
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Media organizer batch CLI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--transfer-mode", default="copy", choices=TRANSFER_MODES)
+    common.add_argument("--transfer-workers", type=int, default=1, help="parallel copies in the pipeline")
+    common.add_argument("--parallel-files", type=int, help="use the async transfer engine with N files in flight")
+    common.add_argument("--rate-limit-mb", type=float, help="per-destination MB/s limit for the engine")
+    common.add_argument("--metrics-dir", help="write metrics.json and metrics.prom here")
+    common.add_argument("--profile", help="write a cProfile dump here")
+
+    sources = argparse.ArgumentParser(add_help=False)
+    sources.add_argument("sources", nargs="+", help="one or more source folders")
+    sources.add_argument("-d", "--dest", dest="destination", required=True, help="destination folder")
+    sources.add_argument("--catalog", default=DEFAULT_DB_PATH, help="metadata catalog database")
+
+    journal = argparse.ArgumentParser(add_help=False)
+    journal.add_argument("--resume", action="store_true", help="skip files a previous run already finished")
+    journal.add_argument("--journal", dest="journal_path", help="journal database (default: in the destination)")
+    journal.add_argument("--fsync", default="batch", choices=FSYNC_POLICIES)
+
+    plan = argparse.ArgumentParser(add_help=False)
+    plan.add_argument("--plan-only", action="store_true", help="write a manifest instead of transferring")
+    plan.add_argument("--manifest", dest="manifest_path", help="manifest path (.csv, .csv.gz or .parquet)")
+
+    existing = argparse.ArgumentParser(add_help=False)
+    existing.add_argument("--skip-existing", action="store_true",
+                          help="don't copy files whose content the destination already has")
+
+    integrity = argparse.ArgumentParser(add_help=False)
+    integrity.add_argument("--hash-copy", action="store_true",
+                           help="hash files while copying them and keep the hashes in the catalog")
+    integrity.add_argument("--verify", action="store_true", help="also read every copy back and compare")
+
+    sniff = argparse.ArgumentParser(add_help=False)
+    sniff.add_argument("--sniff", choices=SNIFF_MODES,
+                       help="also classify by content: files with unknown extensions, or all files")
+
+    p = sub.add_parser("by-date", parents=[sources, common, journal, plan, sniff, existing, integrity],
+                       help="organize photos/videos by date")
+    p.add_argument("--workers", type=int, default=1, help="metadata extraction workers")
+    p.add_argument("--pool", default="thread", choices=POOL_MODES)
+
+    sub.add_parser("by-size", parents=[sources, common, journal, existing, integrity],
+                   help="sort files into size buckets")
+    sub.add_parser("separate", parents=[sources, common, sniff, existing, integrity], help="split photos and videos")
+    sub.add_parser("documents", parents=[sources, common, plan, sniff, existing, integrity],
+                   help="sort documents by type")
+
+    p = sub.add_parser("duplicates", parents=[sources, common], help="copy duplicates into the destination")
+    p.add_argument("--mode", default="exact", choices=("exact", "near", "video"))
+    p.add_argument("--algorithm", help="hash algorithm (exact) or dhash/phash (near)")
+    p.add_argument("--threshold", type=int, default=6, help="max differing bits for near duplicates")
+    p.add_argument("--workers", type=int, help="hashing threads (exact) or fingerprinting workers (near/video)")
+    p.add_argument("--hash-method", default="read", choices=HASH_METHODS,
+                   help="full-file hashing with large reads or mmap (exact)")
+
+    p = sub.add_parser("watch", parents=[sources, common, sniff, existing, integrity],
+                       help="organize new files as they arrive")
+    p.add_argument("--organizer", default="by-date", choices=("by-date", "by-size", "documents"))
+    p.add_argument("--settle", type=float, default=2.0, help="seconds a file must stay unchanged")
+    p.add_argument("--batch-size", type=int, default=500, help="max files per micro-batch")
+    p.add_argument("--poll-interval", type=float, help="poll every N seconds instead of using inotify")
+    p.add_argument("--no-catch-up", dest="catch_up", action="store_false",
+                   help="ignore files already in the source when the watch starts")
+    p.add_argument("--workers", type=int, default=1, help="metadata extraction workers (by-date)")
+    p.add_argument("--journal", dest="journal_path", help="journal database (default: in the destination)")
+    p.add_argument("--fsync", default="batch", choices=FSYNC_POLICIES)
+
+    p = sub.add_parser("apply-manifest", parents=[common], help="execute a plan-only manifest")
+    p.add_argument("manifest", help="manifest written by --plan-only")
+    p.add_argument("--order", default="source", choices=("source", "destination", "none"))
+    p.add_argument("--use-extents", action="store_true", help="order reads by physical extent (FIEMAP)")
+
+    p = sub.add_parser("query", help="search the catalog")
+    p.add_argument("--catalog", default=DEFAULT_DB_PATH, help="metadata catalog database")
+    p.add_argument("--type", choices=("image", "video", "other"))
+    p.add_argument("--date", help="YYYY, YYYY-MM or YYYY-MM-DD")
+    p.add_argument("--from", dest="date_from", help="first date (inclusive)")
+    p.add_argument("--to", dest="date_to", help="last date (inclusive)")
+    p.add_argument("--min-size", help="e.g. 500KB, 1.5GB")
+    p.add_argument("--max-size")
+    p.add_argument("--min-duration", help="e.g. 90s, 5m, 1:30:00")
+    p.add_argument("--max-duration")
+    p.add_argument("--resolution", help="exact WIDTHxHEIGHT")
+    p.add_argument("--min-resolution", help="at least WIDTHxHEIGHT")
+    p.add_argument("--hash", help="content hash")
+    p.add_argument("--under", help="only files below this folder")
+    p.add_argument("--order", default="date", choices=("date", "size", "path"))
+    p.add_argument("--format", default="table", choices=("table", "paths", "csv", "jsonl"))
+    p.add_argument("--limit", type=int, help="stop after N rows and print a cursor for --after")
+    p.add_argument("--page-size", type=int, default=500)
+    p.add_argument("--after", help="cursor printed by a previous --limit run")
+    p.add_argument("--count", action="store_true", help="only print the number of matches")
+    p.add_argument("--explain", action="store_true", help="print the SQLite query plan")
+
+    p = sub.add_parser("run", help="run a JSON/YAML job spec")
+    p.add_argument("spec", help="job spec file")
+    return parser
+
+def _query(args):
+    from utils.query import CatalogQuery, open_catalog, parse_duration, parse_size
+    conn = open_catalog(args.catalog)
+    try:
+        query = CatalogQuery(
+            conn, media_type=args.type,
+            date_from=args.date_from or args.date, date_to=args.date_to or args.date,
+            min_size=parse_size(args.min_size) if args.min_size else None,
+            max_size=parse_size(args.max_size) if args.max_size else None,
+            min_duration=parse_duration(args.min_duration) if args.min_duration else None,
+            max_duration=parse_duration(args.max_duration) if args.max_duration else None,
+            resolution=args.resolution, min_resolution=args.min_resolution,
+            content_hash=args.hash, under=args.under, order=args.order)
+        if args.explain:
+            for line in query.explain():
+                print(line)
+            return 0
+        if args.count:
+            print(query.count())
+            return 0
+
+        writer = None
+        if args.format == "csv":
+            import csv
+            from utils.query import COLUMNS
+            writer = csv.writer(sys.stdout)
+            writer.writerow(COLUMNS)
+        def limited():
+            # Each page asks for at most the rows still wanted, so the last
+            # page's cursor resumes exactly after the last row printed
+            cursor, shown = args.after, 0
+            while shown < args.limit:
+                page = next(query.pages(min(args.page_size, args.limit - shown), after=cursor), None)
+                if page is None:
+                    return
+                yield page
+                shown += len(page.rows)
+                cursor = page.cursor
+                if cursor is None:
+                    return
+            print(f"… more: --after {cursor}", file=sys.stderr)
+
+        for page in limited() if args.limit else query.pages(args.page_size, after=args.after):
+            for row in page.rows:
+                if args.format == "paths":
+                    print(row["filepath"])
+                elif args.format == "jsonl":
+                    print(json.dumps(row, ensure_ascii=False))
+                elif writer is not None:
+                    writer.writerow(row.values())
+                else:
+                    size_mb = (row["size"] or 0) / (1024 * 1024)
+                    print(f"{row['date_taken'] or '-':<19}  {row['media_type'] or '-':<5}  "
+                          f"{size_mb:>9.1f} MB  {row['filepath']}")
+    finally:
+        conn.close()
+    return 0
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        if args.command == "query":
+            return _query(args)
+        if args.command == "run":
+            results = run_job(load_spec(args.spec))
+        elif args.command == "apply-manifest":
+            configure_metrics(args.metrics_dir, args.profile)
+            engine = make_engine(args.parallel_files, args.rate_limit_mb)
+            try:
+                results = [_apply_manifest(args.manifest, args.transfer_mode, args.order, args.use_extents,
+                                           args.transfer_workers, engine=engine)]
+            finally:
+                if engine is not None:
+                    engine.close()
+        else:
+            options = vars(args)
+            options["operation"] = args.command
+            results = run_job({key: value for key, value in options.items() if key != "command"})
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return exit_status(results)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,41 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+from contextlib import redirect_stdout
+from importlib import import_module
 from threading import Thread
-from operations.sort_by_date import organize_by_date
-from operations.duplicate_finder import find_duplicates
-from operations.separate_media import separate_photos_videos
-from operations.organize_documents import organize_documents
-from operations.sort_by_size import sort_by_size
+from utils.transfer import TRANSFER_MODES
+from utils.async_transfer import DEFAULT_MAX_FILES
+from utils.events import Cancelled, bus
+
+POLL_MS = 150
+MAX_LOG_LINES = 5000
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
 
 # --- GUI App ---
 class MediaOrganizerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("📦 Media Organizer")
-        self.root.geometry("650x450")
+        self.root.geometry("760x620")
 
         self.source_folder = tk.StringVar()
         self.dest_folder = tk.StringVar()
+        self.transfer_mode = tk.StringVar(value="copy")
+        self.parallel_files = tk.IntVar(value=DEFAULT_MAX_FILES)
+        self.rate_limit_mb = tk.DoubleVar(value=0)
+        self.status = tk.StringVar(value="Idle")
+        self.job = None
 
         self.build_ui()
+        bus.estimate_totals = True
+        # Worker threads never touch Tk; the main loop drains the event bus
+        self.root.after(POLL_MS, self.poll_events)
 
     def build_ui(self):
         tk.Label(self.root, text="📂 Source Folder").pack(pady=(10, 0))
@@ -28,15 +46,39 @@ class MediaOrganizerApp:
         tk.Entry(self.root, textvariable=self.dest_folder, width=60).pack()
         tk.Button(self.root, text="Browse", command=self.browse_dest).pack(pady=(0, 10))
 
+        mode_frame = tk.Frame(self.root)
+        mode_frame.pack()
+        tk.Label(mode_frame, text="🚚 Transfer Mode").pack(side=tk.LEFT)
+        tk.OptionMenu(mode_frame, self.transfer_mode, *TRANSFER_MODES).pack(side=tk.LEFT)
+        tk.Label(mode_frame, text="Parallel files").pack(side=tk.LEFT, padx=(10, 0))
+        tk.Spinbox(mode_frame, from_=1, to=128, width=4, textvariable=self.parallel_files).pack(side=tk.LEFT)
+        tk.Label(mode_frame, text="MB/s limit (0 = none)").pack(side=tk.LEFT, padx=(10, 0))
+        tk.Entry(mode_frame, width=6, textvariable=self.rate_limit_mb).pack(side=tk.LEFT)
+
         # Buttons for operations
         btn_frame = tk.Frame(self.root)
         btn_frame.pack(pady=10)
 
-        tk.Button(btn_frame, text="📅 Sort by Date", width=18, command=lambda: self.run_task(organize_by_date)).grid(row=0, column=0, padx=5, pady=5)
-        tk.Button(btn_frame, text="🧾 Find Duplicates", width=18, command=lambda: self.run_task(find_duplicates)).grid(row=0, column=1, padx=5, pady=5)
-        tk.Button(btn_frame, text="🖼️ Separate Media", width=18, command=lambda: self.run_task(separate_photos_videos)).grid(row=1, column=0, padx=5, pady=5)
-        tk.Button(btn_frame, text="📑 Organize Docs", width=18, command=lambda: self.run_task(organize_documents)).grid(row=1, column=1, padx=5, pady=5)
-        tk.Button(btn_frame, text="📏 Sort by Size", width=18, command=lambda: self.run_task(sort_by_size)).grid(row=2, column=0, padx=5, pady=5)
+        tk.Button(btn_frame, text="📅 Sort by Date", width=18, command=lambda: self.run_task("operations.sort_by_date", "organize_by_date")).grid(row=0, column=0, padx=5, pady=5)
+        tk.Button(btn_frame, text="🧾 Find Duplicates", width=18, command=lambda: self.run_task("operations.duplicate_finder", "find_duplicates")).grid(row=0, column=1, padx=5, pady=5)
+        tk.Button(btn_frame, text="🖼️ Separate Media", width=18, command=lambda: self.run_task("operations.separate_media", "separate_photos_videos")).grid(row=1, column=0, padx=5, pady=5)
+        tk.Button(btn_frame, text="📑 Organize Docs", width=18, command=lambda: self.run_task("operations.organize_documents", "organize_documents")).grid(row=1, column=1, padx=5, pady=5)
+        tk.Button(btn_frame, text="📏 Sort by Size", width=18, command=lambda: self.run_task("operations.sort_by_size", "sort_by_size")).grid(row=2, column=0, padx=5, pady=5)
+        tk.Button(btn_frame, text="🪞 Near Duplicates", width=18, command=lambda: self.run_task("operations.near_duplicates", "find_near_duplicates")).grid(row=2, column=1, padx=5, pady=5)
+        tk.Button(btn_frame, text="🎬 Video Duplicates", width=18, command=lambda: self.run_task("operations.video_duplicates", "find_video_duplicates")).grid(row=3, column=0, padx=5, pady=5)
+
+        # Progress and job control
+        progress_frame = tk.Frame(self.root)
+        progress_frame.pack(fill=tk.X, padx=20)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.pause_button = tk.Button(progress_frame, text="⏸ Pause", width=9, state=tk.DISABLED,
+                                      command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = tk.Button(progress_frame, text="⏹ Cancel", width=9, state=tk.DISABLED,
+                                       command=self.cancel_task)
+        self.cancel_button.pack(side=tk.LEFT)
+        tk.Label(self.root, textvariable=self.status, anchor="w").pack(fill=tk.X, padx=20)
 
         # Console Output Box
         tk.Label(self.root, text="📜 Output Log:").pack()
@@ -53,26 +95,110 @@ class MediaOrganizerApp:
         if folder:
             self.dest_folder.set(folder)
 
-    def run_task(self, task_func):
+    def run_task(self, module_name, func_name):
+        # Operations (and OpenCV, numpy, tqdm behind them) are imported when
+        # their button is first used, so the window opens right away
         src = self.source_folder.get().strip('"')
         dst = self.dest_folder.get().strip('"')
+        mode = self.transfer_mode.get()
+        try:
+            max_files = max(1, self.parallel_files.get())
+            rate_limit = self.rate_limit_mb.get() * 1024 * 1024 or None
+        except tk.TclError:
+            messagebox.showerror("Invalid Settings", "Parallel files and MB/s limit must be numbers.")
+            return
 
         if not src or not dst:
             messagebox.showerror("Missing Paths", "Please select both source and destination folders.")
             return
 
-        def task():
-            self.output_box.insert(tk.END, f"🔄 Running {task_func.__name__}...\n")
-            self.output_box.see(tk.END)
-            try:
-                task_func(src, dst)
-                self.output_box.insert(tk.END, f"✅ Done: {task_func.__name__}\n\n")
-            except Exception as e:
-                self.output_box.insert(tk.END, f"❌ Error: {e}\n\n")
+        if self.job is not None and self.job.is_alive():
+            messagebox.showinfo("Busy", "A task is already running. Cancel it or wait for it to finish.")
+            return
 
-            self.output_box.see(tk.END)
+        name = func_name
 
-        Thread(target=task).start()
+        def task():
+            # Everything the operation prints goes to the bus, not to Tk
+            with redirect_stdout(bus.writer()):
+                print(f"🔄 Running {name}...")
+                try:
+                    from utils.async_transfer import TransferEngine
+                    task_func = getattr(import_module(module_name), func_name)
+                    with TransferEngine(max_files=max_files, rate_limit=rate_limit) as engine:
+                        task_func(src, dst, transfer_mode=mode, engine=engine)
+                        engine.drain()
+                        engine.print_stats()
+                except Cancelled:
+                    bus.finish_job("cancelled")
+                except Exception as e:
+                    bus.finish_job("error", str(e))
+                else:
+                    bus.finish_job("cancelled" if bus.cancelled else "done")
+
+        bus.start_job(name)
+        self.pause_button.config(state=tk.NORMAL, text="⏸ Pause")
+        self.cancel_button.config(state=tk.NORMAL)
+        self.job = Thread(target=task, name=f"job-{name}", daemon=True)
+        self.job.start()
+
+    def toggle_pause(self):
+        if bus.paused:
+            bus.resume()
+            self.pause_button.config(text="⏸ Pause")
+        else:
+            bus.pause()
+            self.pause_button.config(text="▶ Resume")
+
+    def cancel_task(self):
+        bus.cancel()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED)
+
+    # --- Event bus draining (Tk main thread only) ---
+
+    def poll_events(self):
+        events, progress = bus.drain()
+        lines = []
+        for kind, data in events:
+            if kind == "log":
+                lines.append(data["message"])
+            elif kind == "stage" and data["name"]:
+                lines.append(f"▶ {data['name']}")
+            elif kind == "finished":
+                lines.append(self.finished_message(progress["job"], data) + "\n")
+                self.pause_button.config(state=tk.DISABLED, text="⏸ Pause")
+                self.cancel_button.config(state=tk.DISABLED)
+        if lines:
+            self.output_box.insert(tk.END, "\n".join(lines) + "\n")
+            excess = int(self.output_box.index("end-1c").split(".")[0]) - MAX_LOG_LINES
+            if excess > 0:
+                self.output_box.delete("1.0", f"{excess + 1}.0")
+            self.output_box.see(tk.END)
+        if progress["job"] is not None:
+            self.show_progress(progress)
+        self.root.after(POLL_MS, self.poll_events)
+
+    def finished_message(self, job, data):
+        if data["result"] == "cancelled":
+            return f"⏹ Cancelled: {job}"
+        if data["result"] == "error":
+            return f"❌ Error: {data['message']}"
+        return f"✅ Done: {job}"
+
+    def show_progress(self, p):
+        total = p["files_total"]
+        if total:
+            self.progress_bar["value"] = min(1.0, p["files_done"] / total)
+            count = f"{p['files_done']:,}/{total:,} files"
+        else:
+            self.progress_bar["value"] = 0
+            count = f"{p['files_done']:,} files ({p['files_found']:,} found)"
+        state = {"done": "Finished", "cancelled": "Cancelled", "error": "Failed"}.get(p["result"])
+        if state is None:
+            state = "Paused" if p["paused"] else (p["stage"] or "Starting")
+        self.status.set(f"{state} • {count} • {p['files_per_second']:,.1f} files/s • "
+                        f"{p['bytes_per_second'] / (1024 * 1024):,.1f} MB/s • ETA {format_eta(p['eta_seconds'])}")
 
 
 # Run GUI
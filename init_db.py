@@ -1,23 +1,12 @@
 import sqlite3
 import os
+from utils.catalog import DEFAULT_DB_PATH, ensure_schema
 
-db_path = "db/media.db"
+db_path = DEFAULT_DB_PATH
 os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
 conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS media (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    filename TEXT,
-    filepath TEXT,
-    media_type TEXT,
-    date_taken TEXT
-)
-""")
-
-conn.commit()
+ensure_schema(conn)
 conn.close()
 
 print("✅ Database schema initialized successfully.")
@@ -1,57 +1,27 @@
 import os
 import shutil
-import hashlib
 import datetime
-import subprocess
-from tqdm import tqdm
-from PIL import Image
-from PIL.ExifTags import TAGS
+from utils.progress import tqdm
+from utils import exif_reader, video_metadata
+from utils.classifier import classify, file_type
+from utils.hashing import hash_file
+from utils.metrics import metrics, instrumented
 
 # --------------------------------------
 # Utility Functions
 # --------------------------------------
 
 def is_image(file):
-    return file.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.heic'))
+    return classify(file) == "image"
 
 def is_video(file):
-    return file.lower().endswith(('.mp4', '.mov', '.avi', '.mkv', '.webm', '.3gp'))
-
-def is_document(file):
-    return file.lower().endswith((
-        '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-        '.txt', '.csv', '.odt', '.ods', '.odp'
-    ))
+    return classify(file) == "video"
 
 def get_exif_date(file_path):
-    try:
-        image = Image.open(file_path)
-        exif_data = image._getexif()
-        if exif_data is not None:
-            for tag_id, value in exif_data.items():
-                tag = TAGS.get(tag_id, tag_id)
-                if tag == 'DateTimeOriginal':
-                    return datetime.datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-    except Exception:
-        pass
-    return None
+    return exif_reader.get_exif_date(file_path)
 
 def get_video_date(file_path):
-    try:
-        command = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_entries', 'format_tags=creation_time',
-            file_path
-        ]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        import json
-        data = json.loads(result.stdout)
-        date_str = data.get('format', {}).get('tags', {}).get('creation_time', '')
-        if date_str:
-            return datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except Exception:
-        pass
-    return None
+    return video_metadata.get_video_metadata(file_path)["date_taken"]
 
 def safe_copy(src, dest_dir):
     os.makedirs(dest_dir, exist_ok=True)
@@ -62,12 +32,14 @@ def safe_copy(src, dest_dir):
         name, ext = os.path.splitext(base)
         dest = os.path.join(dest_dir, f"{name}_{count}{ext}")
         count += 1
-    shutil.copy2(src, dest)
+    with metrics.timer("copy", src, size=os.path.getsize(src)):
+        shutil.copy2(src, dest)
 
 # --------------------------------------
 # Option 1: Organize by Date
 # --------------------------------------
 
+@instrumented("organize_by_date")
 def organize_by_date(source_folder, output_folder):
     print(f"\n📂 Organizing from {source_folder}")
     all_files = []
@@ -102,15 +74,14 @@ def organize_by_date(source_folder, output_folder):
 # --------------------------------------
 
 def get_file_hash(file_path):
-    hash_md5 = hashlib.md5()
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception:
+        size = os.path.getsize(file_path)
+    except OSError:
         return None
+    with metrics.timer("hash", file_path, size=size):
+        return hash_file(file_path, "md5")
 
+@instrumented("find_duplicates")
 def find_duplicates(source_folder):
     print(f"\n🔍 Scanning for duplicates in {source_folder}")
     hash_dict = {}
@@ -119,7 +90,7 @@ def find_duplicates(source_folder):
     for root, _, files in os.walk(source_folder):
         for file in tqdm(files, desc=f"Scanning in {root}"):
             file_path = os.path.join(root, file)
-            if file.lower().endswith(('.jpg', '.jpeg', '.png', '.mp4', '.mov')):
+            if classify(file) in ("image", "video"):
                 file_hash = get_file_hash(file_path)
                 if file_hash:
                     if file_hash in hash_dict:
@@ -148,6 +119,7 @@ def find_duplicates(source_folder):
 # Option 3: Separate Images and Videos
 # --------------------------------------
 
+@instrumented("separate_media")
 def separate_media(source_folder, dest_folder):
     image_folder = os.path.join(dest_folder, 'Photos')
     video_folder = os.path.join(dest_folder, 'Videos')
@@ -168,10 +140,12 @@ def separate_media(source_folder, dest_folder):
         file = os.path.basename(file_path)
         try:
             if is_image(file):
-                shutil.copy2(file_path, os.path.join(image_folder, file))
+                with metrics.timer("copy", file_path, "image", os.path.getsize(file_path)):
+                    shutil.copy2(file_path, os.path.join(image_folder, file))
                 image_count += 1
             elif is_video(file):
-                shutil.copy2(file_path, os.path.join(video_folder, file))
+                with metrics.timer("copy", file_path, "video", os.path.getsize(file_path)):
+                    shutil.copy2(file_path, os.path.join(video_folder, file))
                 video_count += 1
             else:
                 skipped += 1
@@ -187,15 +161,8 @@ def separate_media(source_folder, dest_folder):
 # Option 4: Organize Document Files
 # --------------------------------------
 
+@instrumented("organize_documents")
 def organize_documents(source_folder, dest_folder):
-    doc_map = {
-        'PDF': ['.pdf'],
-        'Word': ['.doc', '.docx', '.odt'],
-        'Excel': ['.xls', '.xlsx', '.ods'],
-        'PowerPoint': ['.ppt', '.pptx', '.odp'],
-        'Text': ['.txt', '.csv']
-    }
-
     all_files = []
     for root, _, files in os.walk(source_folder):
         for file in files:
@@ -205,17 +172,15 @@ def organize_documents(source_folder, dest_folder):
     count = 0
     for file_path in tqdm(all_files):
         file = os.path.basename(file_path)
-        ext = os.path.splitext(file)[1].lower()
-
-        for category, extensions in doc_map.items():
-            if ext in extensions:
-                dest_dir = os.path.join(dest_folder, category)
-                try:
-                    safe_copy(file_path, dest_dir)
-                    count += 1
-                except Exception as e:
-                    print(f"❌ Failed to copy {file}: {e}")
-                break
+        kind, category = file_type(file)
+        if kind != "document":
+            continue
+        dest_dir = os.path.join(dest_folder, category)
+        try:
+            safe_copy(file_path, dest_dir)
+            count += 1
+        except Exception as e:
+            print(f"❌ Failed to copy {file}: {e}")
 
     print(f"\n✅ Documents sorted: {count}")
 
@@ -0,0 +1,73 @@
+from utils.events import bus
+from utils.manifest import read_manifest, sort_rows
+from utils.metrics import instrumented
+from utils.pipeline import Pipeline, Stage
+from utils.transfer import transfer_file
+import os
+import threading
+from utils.progress import tqdm
+
+@instrumented("apply_manifest")
+def apply_manifest(manifest_path, transfer_mode="copy", order="source", use_extents=False, transfer_workers=1,
+                   engine=None):
+    print(f"\n📜 Applying manifest {manifest_path} (order: {order})")
+    rows = sort_rows(read_manifest(manifest_path), order, use_extents)
+    stats = {"processed": 0, "skipped": 0, "skipped_files": [], "failed": 0, "total_bytes": 0}
+    lock = threading.Lock()
+    created = set()
+    progress = tqdm(total=len(rows), desc="Applying manifest", unit="file")
+    bus.stage("Applying manifest", len(rows), sum(row["size"] for row in rows))
+
+    def on_error(row, error):
+        with lock:
+            stats["skipped"] += 1
+            stats["failed"] += 1
+            stats["skipped_files"].append((row["source"], f"Copy failed: {error}"))
+
+    def transfer(row):
+        dest = row["destination"]
+        folder = os.path.dirname(dest)
+        if folder not in created:
+            os.makedirs(folder, exist_ok=True)
+            with lock:
+                created.add(folder)
+        # Names were reserved at plan time; never overwrite what is there now
+        if os.path.lexists(dest):
+            raise FileExistsError(f"destination already exists: {dest}")
+        if engine is not None:
+            engine.submit(row["source"], dest, transfer_mode, on_done=lambda future: transferred(row, future))
+            return row
+        transfer_file(row["source"], dest, transfer_mode)
+        record(row)
+        return row
+
+    def record(row):
+        with lock:
+            stats["processed"] += 1
+            stats["total_bytes"] += row["size"]
+        progress.update()
+        bus.advance(1, row["size"])
+
+    def transferred(row, future):
+        if future.exception() is not None:
+            on_error(row, future.exception())
+        else:
+            record(row)
+
+    pipeline = Pipeline(rows, [Stage("transfer", transfer, workers=transfer_workers, on_error=on_error)],
+                        source_name="manifest", describe=lambda row: (row["source"], None, row["size"]))
+    try:
+        pipeline.run()
+        if engine is not None:
+            engine.drain()
+    finally:
+        progress.close()
+    stats["stages"] = pipeline.stats()
+    stats["cancelled"] = bus.cancelled
+
+    for path, reason in stats["skipped_files"]:
+        print(f"❌ {path}: {reason}")
+    print(f"\n✅ Files transferred: {stats['processed']}")
+    print(f"📦 Total size: {round(stats['total_bytes'] / (1024 * 1024), 2)} MB")
+    print(f"❌ Skipped files: {stats['skipped']}")
+    return stats
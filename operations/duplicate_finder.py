@@ -1,43 +1,194 @@
-from utils.helpers import is_image, is_video, safe_copy
-import os
-import hashlib
-from tqdm import tqdm
+from utils.helpers import get_media_type
+from utils.scanner import scan, entry_for
+from operations.organizer import organize
+from utils.catalog import MediaCatalog
+from utils.events import bus
+from utils.metrics import metrics, instrumented
+from utils.hashing import hash_file, hash_sample, sample_covers_file, default_algorithm, SAMPLE_SIZE
+from utils.hash_engine import HashEngine
+from collections import defaultdict
+from utils.progress import tqdm
+
+def get_file_hash(file_path, algorithm="md5"):
+    return hash_file(file_path, algorithm)
+
+def _cached_hash(catalog, path, st, field, algorithm, compute):
+    row = catalog.lookup(path, st)
+    if row is not None and row[field] and row["hash_algo"] == algorithm:
+        return row[field], True
+    value = compute()
+    if value is not None:
+        fields = {field: value, "hash_algo": algorithm, "media_type": get_media_type(path)}
+        if row is not None and row["hash_algo"] != algorithm:
+            # Hashes from another algorithm can't be compared, drop them
+            fields.setdefault("content_hash", None)
+            fields.setdefault("sample_hash", None)
+        catalog.update(path, st, **fields)
+    return value, False
+
+def timed_hash(stage, path, size, func, *args):
+    with metrics.timer(stage, path, size=size):
+        return func(*args)
+
+def find_duplicate_groups(source_folder, algorithm=None, sample_size=SAMPLE_SIZE, catalog=None, skip_dirs=(),
+                          workers=None, hash_method="read"):
+    # workers / hash_method: full hashes run on a HashEngine (utils.hash_engine)
+    algorithm = algorithm or default_algorithm()
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+    catalog.preload(source_folder)
+    stats = {
+        "algorithm": algorithm,
+        "files_scanned": 0,
+        "bytes_scanned": 0,
+        "size_candidates": 0,
+        "sample_hashed": 0,
+        "cached_hashes": 0,
+        "sample_bytes_read": 0,
+        "sample_candidates": 0,
+        "full_hashed": 0,
+        "full_bytes_read": 0,
+    }
 
-def get_file_hash(file_path):
-    hash_md5 = hashlib.md5()
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception:
-        return None
-
-def find_duplicates(source_folder, dest_folder):
+        # Stage 1: group by size, only files sharing a size can be identical
+        by_size = defaultdict(list)
+        bus.stage("Scanning")
+        for entry in scan(source_folder, kinds=("image", "video"), skip_dirs=skip_dirs):
+            bus.checkpoint()
+            bus.found(1, entry.size)
+            by_size[entry.size].append((entry.path, entry.stat))
+            stats["files_scanned"] += 1
+            stats["bytes_scanned"] += entry.size
+
+        # Stage 2: head/tail sample hash for same-size candidates
+        groups = []
+        bus.stage("Sampling candidates", sum(len(paths) for paths in by_size.values() if len(paths) > 1))
+        for size, paths in by_size.items():
+            if len(paths) < 2:
+                continue
+            stats["size_candidates"] += len(paths)
+            by_sample = defaultdict(list)
+            for path, st in paths:
+                bus.checkpoint()
+                bus.advance()
+                sample, cached = _cached_hash(catalog, path, st, "sample_hash", algorithm,
+                                              lambda: timed_hash("sample_hash", path, min(size, 2 * sample_size),
+                                                                 hash_sample, path, size, algorithm, sample_size))
+                if sample is None:
+                    continue
+                if cached:
+                    stats["cached_hashes"] += 1
+                else:
+                    stats["sample_hashed"] += 1
+                    stats["sample_bytes_read"] += min(size, 2 * sample_size)
+                by_sample[sample].append((path, st))
+            for sample_paths in by_sample.values():
+                if len(sample_paths) > 1:
+                    groups.append((size, sample_paths))
+
+        # Stage 3: full hash only where samples collide; the uncached ones
+        # are hashed many at a time
+        duplicate_groups = []
+        bus.stage("Verifying candidates", sum(len(paths) for _, paths in groups),
+                  sum(size * len(paths) for size, paths in groups))
+        by_hash = [defaultdict(list) for _ in groups]
+        to_hash = []
+        for index, (size, paths) in enumerate(groups):
+            stats["sample_candidates"] += len(paths)
+            if sample_covers_file(size, sample_size):
+                duplicate_groups.append([path for path, _ in paths])
+                bus.advance(len(paths), size * len(paths))
+                continue
+            for order, (path, st) in enumerate(paths):
+                row = catalog.lookup(path, st)
+                if row is not None and row["content_hash"] and row["hash_algo"] == algorithm:
+                    stats["cached_hashes"] += 1
+                    by_hash[index][row["content_hash"]].append((order, path))
+                    bus.advance(1, size)
+                else:
+                    to_hash.append((path, size, st, index, order))
+
+        engine = HashEngine(workers, algorithm=algorithm, method=hash_method)
+        progress = tqdm(total=len(to_hash), desc="Verifying candidates", unit="file")
+        try:
+            for (path, size, st, index, order), file_hash in engine.hash_files(to_hash):
+                bus.checkpoint()
+                bus.advance(1, size)
+                progress.update()
+                if file_hash is None:
+                    continue
+                _cached_hash(catalog, path, st, "content_hash", algorithm, lambda: file_hash)
+                stats["full_hashed"] += 1
+                stats["full_bytes_read"] += size
+                by_hash[index][file_hash].append((order, path))
+        finally:
+            progress.close()
+        for hashes in by_hash:
+            # Back in scan order, whatever order the hashes finished in
+            duplicate_groups.extend([path for _, path in sorted(p)] for p in hashes.values() if len(p) > 1)
+    finally:
+        if owns_catalog:
+            catalog.close()
+        else:
+            catalog.flush()
+    return duplicate_groups, stats
+
+def print_stage_stats(stats):
+    read = stats["sample_bytes_read"] + stats["full_bytes_read"]
+    avoided = stats["bytes_scanned"] - read
+    mb = 1024 * 1024
+    print(f"\n📊 Duplicate scan stages ({stats['algorithm']}):")
+    print(f"   Files scanned: {stats['files_scanned']} ({round(stats['bytes_scanned'] / mb, 2)} MB)")
+    print(f"   Same-size candidates: {stats['size_candidates']}")
+    print(f"   Sample-hashed: {stats['sample_hashed']} ({round(stats['sample_bytes_read'] / mb, 2)} MB read)")
+    print(f"   Reused from catalog: {stats['cached_hashes']}")
+    print(f"   Sample collisions: {stats['sample_candidates']}")
+    print(f"   Fully hashed: {stats['full_hashed']} ({round(stats['full_bytes_read'] / mb, 2)} MB read)")
+    print(f"   Bytes avoided: {round(avoided / mb, 2)} MB")
+
+@instrumented("find_duplicates")
+def find_duplicates(source_folder, dest_folder, algorithm=None, catalog=None, transfer_mode="copy",
+                    mode="exact", threshold=6, engine=None, workers=None, hash_method="read"):
+    # workers: fingerprinting workers (near/video, default 1) or hashing
+    #   threads (exact, default: see utils.hash_engine)
+    if mode == "near":
+        # Imported lazily so exact mode does not pay for NumPy/PIL
+        from operations.near_duplicates import find_near_duplicates
+        return find_near_duplicates(source_folder, dest_folder, threshold, algorithm or "dhash", catalog,
+                                    workers or 1, transfer_mode=transfer_mode, engine=engine)
+    if mode == "video":
+        from operations.video_duplicates import find_video_duplicates
+        return find_video_duplicates(source_folder, dest_folder, catalog=catalog, workers=workers or 1,
+                                     transfer_mode=transfer_mode, engine=engine)
+
     print(f"\n🔍 Scanning for duplicates in {source_folder}")
-    hash_dict = {}
-    duplicates = []
-
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            if is_image(file) or is_video(file):
-                path = os.path.join(root, file)
-                file_hash = get_file_hash(path)
-                if file_hash:
-                    if file_hash in hash_dict:
-                        duplicates.append((path, hash_dict[file_hash]))
-                    else:
-                        hash_dict[file_hash] = path
+    duplicate_groups, stats = find_duplicate_groups(source_folder, algorithm, catalog=catalog, skip_dirs=[dest_folder],
+                                                    workers=workers, hash_method=hash_method)
+    print_stage_stats(stats)
+
+    # First path in walk order is kept as the original
+    duplicates = [(dup, paths[0]) for paths in duplicate_groups for dup in paths[1:]]
 
     if not duplicates:
         print("✅ No duplicates found.")
-        return
+        return stats
 
     print(f"\n✅ Found {len(duplicates)} duplicate file(s).")
-    os.makedirs(dest_folder, exist_ok=True)
+    copy_to_folder([dup for dup, _ in duplicates], dest_folder, transfer_mode, "Copying duplicates", engine)
+    return stats
 
-    for dup, _ in tqdm(duplicates, desc="Copying duplicates"):
-        try:
-            safe_copy(dup, dest_folder)
-        except Exception as e:
-            print(f"❌ Failed to copy {dup}: {e}")
+def copy_to_folder(paths, dest_folder, transfer_mode="copy", desc="Copying", engine=None):
+    # Runs a list of files through the shared pipeline's plan/transfer stages
+    def entries():
+        for path in paths:
+            try:
+                yield entry_for(path)
+            except OSError as e:
+                print(f"❌ Failed to copy {path}: {e}")
+
+    stats = organize(None, dest_folder, lambda task: dest_folder, entries=entries(),
+                     transfer_mode=transfer_mode, desc=desc, engine=engine)
+    for path, reason in stats["skipped_files"]:
+        print(f"❌ Failed to copy {path}: {reason}")
+    return stats
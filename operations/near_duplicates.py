@@ -0,0 +1,81 @@
+from operations.duplicate_finder import copy_to_folder
+from utils.catalog import MediaCatalog
+from utils.events import bus
+from utils.metrics import metrics, instrumented
+from utils.parallel import map_ahead
+from utils.perceptual import image_hash, near_pairs, group_pairs, HASH_ALGORITHMS
+from utils.scanner import scan
+import time
+import numpy as np
+from utils.progress import tqdm
+
+def _hash_task(item):
+    # Timed in the worker process and reported back with the hash
+    path, algorithm = item
+    start = time.perf_counter()
+    return image_hash(path, algorithm), time.perf_counter() - start
+
+def compute_image_hashes(entries, algorithm="dhash", catalog=None, workers=1):
+    # Returns (paths, uint64 array) in scan order. Hashes are cached in the
+    # catalog as "<algorithm>:<hex>" so reruns only decode new or changed images.
+    paths, hashes, missing = [], [], []
+    for entry in entries:
+        row = catalog.lookup(entry.path, entry.stat)
+        cached = row["perceptual_hash"] if row is not None else None
+        if cached and cached.startswith(algorithm + ":"):
+            hashes.append(int(cached.split(":", 1)[1], 16))
+        else:
+            hashes.append(None)
+            missing.append((len(paths), entry))
+        paths.append(entry.path)
+
+    bus.stage("Hashing images", len(missing), sum(entry.size for _, entry in missing))
+    items = ((entry.path, algorithm) for _, entry in missing)
+    results = map_ahead(_hash_task, items, workers, "process", batch_size=64)
+    for (slot, entry), (_, value) in tqdm(zip(missing, results), total=len(missing), desc="Hashing images"):
+        bus.checkpoint()
+        bus.advance(1, entry.size)
+        if isinstance(value, Exception):
+            continue
+        value, seconds = value
+        metrics.observe("perceptual_hash", seconds, entry.path, entry.kind, entry.size)
+        catalog.update(entry.path, entry.stat, perceptual_hash=f"{algorithm}:{value:016x}")
+        hashes[slot] = value
+
+    keep = [i for i, value in enumerate(hashes) if value is not None]
+    return [paths[i] for i in keep], np.array([hashes[i] for i in keep], dtype=np.uint64)
+
+def find_near_duplicate_groups(source_folder, threshold=6, algorithm="dhash", catalog=None, workers=1, skip_dirs=()):
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown perceptual hash: {algorithm}")
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+    catalog.preload(source_folder)
+
+    entries = scan(source_folder, kinds=("image",), skip_dirs=skip_dirs)
+    try:
+        paths, hashes = compute_image_hashes(entries, algorithm, catalog, workers)
+    finally:
+        if owns_catalog:
+            catalog.close()
+        else:
+            catalog.flush()
+
+    # Groups keep scan order, so the first path of each is treated as the original
+    groups = group_pairs(len(paths), near_pairs(hashes, threshold))
+    return [[paths[i] for i in group] for group in groups]
+
+@instrumented("find_near_duplicates")
+def find_near_duplicates(source_folder, dest_folder, threshold=6, algorithm="dhash", catalog=None,
+                         workers=1, transfer_mode="copy", engine=None):
+    print(f"\n🖼️ Scanning for near-duplicate images in {source_folder} ({algorithm}, ≤{threshold} bits)")
+    groups = find_near_duplicate_groups(source_folder, threshold, algorithm, catalog, workers, skip_dirs=[dest_folder])
+    duplicates = [dup for group in groups for dup in group[1:]]
+
+    if not duplicates:
+        print("✅ No near-duplicates found.")
+        return groups
+
+    print(f"\n✅ Found {len(duplicates)} near-duplicate image(s) in {len(groups)} group(s).")
+    copy_to_folder(duplicates, dest_folder, transfer_mode, "Copying near-duplicates", engine)
+    return groups
@@ -1,31 +1,41 @@
-from utils.helpers import safe_copy
+from operations.organizer import organize
+from utils.classifier import extension_of, file_type
+from utils.manifest import ManifestWriter
+from utils.metrics import instrumented
 import os
-from tqdm import tqdm
 
-def organize_documents(source_folder, dest_folder):
-    doc_map = {
-        'PDF': ['.pdf'],
-        'Word': ['.doc', '.docx', '.odt'],
-        'Excel': ['.xls', '.xlsx', '.ods'],
-        'PowerPoint': ['.ppt', '.pptx', '.odp'],
-        'Text': ['.txt', '.csv']
-    }
+@instrumented("organize_documents")
+def organize_documents(source_folder, dest_folder, transfer_mode="copy", transfer_workers=1,
+                       plan_only=False, manifest_path=None, engine=None, sniff=None, entries=None,
+                       journal=None, skip_existing=False, content_index=None, hash_copy=False,
+                       verify=False, quiet=False):
+    # Categories are the document groups of utils.classifier.EXTENSIONS
 
-    all_files = []
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            all_files.append(os.path.join(root, file))
+    def plan(task):
+        category = task.entry.group
+        if category is None:
+            return None
+        if file_type(task.entry.name).group == category:
+            task.reason = f"extension {extension_of(task.entry.name)}"
+        else:
+            task.reason = f"content ({category})"
+        return os.path.join(dest_folder, category)
 
-    print(f"\n📑 Organizing documents in {source_folder}:")
-    for file_path in tqdm(all_files, desc="Organizing"):
-        file = os.path.basename(file_path)
-        ext = os.path.splitext(file)[1].lower()
-
-        for category, extensions in doc_map.items():
-            if ext in extensions:
-                dest_dir = os.path.join(dest_folder, category)
-                try:
-                    safe_copy(file_path, dest_dir)
-                except Exception as e:
-                    print(f"❌ Failed to copy {file}: {e}")
-                break
+    if not quiet:
+        print(f"\n📑 Organizing documents in {source_folder}:")
+    manifest = None
+    if plan_only:
+        manifest = ManifestWriter(manifest_path or os.path.join(dest_folder, "plan_manifest.csv"))
+    try:
+        stats = organize(source_folder, dest_folder, plan, kinds=("document",), transfer_mode=transfer_mode,
+                         transfer_workers=transfer_workers, manifest=manifest, engine=engine, sniff=sniff,
+                         entries=entries, journal=journal, skip_existing=skip_existing,
+                         content_index=content_index, hash_copy=hash_copy, verify=verify,
+                         quiet=quiet)
+    finally:
+        if manifest is not None:
+            manifest.close()
+            print(f"📜 Manifest saved to: {manifest.path}")
+    for path, reason in stats["skipped_files"]:
+        print(f"❌ Failed to copy {os.path.basename(path)}: {reason}")
+    return stats
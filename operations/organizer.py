@@ -0,0 +1,269 @@
+from utils.events import bus
+from utils.catalog import METADATA_FIELDS
+from utils.classifier import media_type
+from utils.content_index import ContentIndex
+from utils.helpers import DestinationIndex
+from utils.journal import plan_transfer
+from utils.parallel import create_executor
+from utils.pipeline import Pipeline, Stage
+from utils.scanner import scan
+from utils.transfer import Checksum, transfer_file
+import os
+import threading
+from utils.progress import tqdm
+
+# Shared scan -> classify -> extract -> plan -> transfer pipeline.
+#
+# An operation supplies only a plan(task) function returning the destination
+# folder (or None to leave the file alone), plus optionally:
+#   extract(path, st, kind) -> dict of metadata, run in the extract stage's pool
+#   from_cache(row)   -> the same dict rebuilt from a fresh catalog row, or None
+#
+# Extraction runs ahead in its own pool, the single plan worker sees files in
+# scan order (so collision names are deterministic), and transfers overlap
+# with reads of the next files.
+#
+# With a TransferEngine the transfer stage only hands copies to the engine,
+# which keeps many of them in flight against slow network destinations;
+# completion (journal, stats) is recorded as each copy finishes.
+#
+# With skip_existing (or a shared ContentIndex) files whose content the
+# destination library already holds are dropped before their metadata is read
+# or any byte is copied; see utils.content_index.
+#
+# With hash_copy each copied file is hashed on its way through (one read per
+# byte, see utils.transfer.hash_copy) and the hashes go to the catalog for the
+# source and the copy, so duplicate scans and the content index reuse them;
+# verify also reads every copy back and fails files that don't match.
+#
+# With a manifest writer the run is plan-only: metadata comes from the
+# catalog alone (plan functions must cope with an empty task.metadata), no
+# file is opened, and the transfer stage records rows instead of copying.
+
+class FileTask:
+    __slots__ = ("entry", "row", "metadata", "dest", "done", "reason", "checksum")
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.row = None
+        self.metadata = {}
+        self.dest = None
+        self.done = False
+        self.reason = ""
+        self.checksum = None
+
+    @property
+    def path(self):
+        return self.entry.path
+
+    @property
+    def kind(self):
+        return self.entry.kind
+
+    @property
+    def size(self):
+        return self.entry.size
+
+def new_stats():
+    return {
+        "processed": 0,
+        "skipped": 0,
+        "skipped_files": [],
+        "failed": 0,  # of the skipped files, those whose transfer failed
+        "total_bytes": 0,
+        "resumed": 0,
+        "existing": 0,
+        "stages": [],
+        "cancelled": False,
+    }
+
+def count_ahead(source_folder, kinds, skip_dirs, stage_serial, sniff=None):
+    # Second, cheap walk so a watching front end gets totals for its ETA
+    # long before backpressure lets the real scan finish
+    files = size = 0
+    for entry in scan(source_folder, kinds=kinds, skip_dirs=skip_dirs, sniff=sniff):
+        if bus.cancelled:
+            return
+        files += 1
+        size += entry.size
+    bus.set_totals(stage_serial, files, size)
+
+def organize(source_folder, dest_folder, plan, extract=None, from_cache=None, kinds=None, entries=None,
+             catalog=None, journal=None, transfer_mode="copy", extract_workers=1, pool="thread",
+             transfer_workers=1, queue_size=256, desc="Organizing", manifest=None, engine=None, sniff=None,
+             skip_existing=False, content_index=None, hash_copy=False, verify=False, quiet=False):
+    # sniff: classify by file content as well as extension (see utils.classifier)
+    # skip_existing: leave files the destination already has where they are;
+    #   content_index: an open ContentIndex to use for it (watch mode)
+    # hash_copy: hash files while copying them; verify: and check each copy
+    # quiet: no per-run stage report (watch micro-batches)
+    stats = new_stats()
+    lock = threading.Lock()
+    plan_only = manifest is not None
+    index = DestinationIndex(create_dirs=not plan_only)
+    if plan_only:
+        journal = None
+    use_pool = pool == "process" and extract and not plan_only
+    executor = create_executor(extract_workers, "process") if use_pool else None
+    owns_index = skip_existing and content_index is None
+    if owns_index:
+        content_index = ContentIndex(dest_folder)
+    progress = tqdm(desc=desc, unit="file")
+
+    bus.stage(desc)
+    if entries is None:
+        entries = scan(source_folder, kinds=kinds, skip_dirs=[dest_folder], sniff=sniff)
+        if bus.estimate_totals:
+            threading.Thread(target=count_ahead, args=(source_folder, kinds, [dest_folder], bus.stage_serial, sniff),
+                             name="count-ahead", daemon=True).start()
+        if catalog is not None and source_folder:
+            catalog.preload(source_folder)
+    elif kinds:
+        # Given entries (a watch micro-batch) are few; per-file lookups beat a preload
+        entries = (entry for entry in entries if entry.kind in kinds)
+
+    def skip(reason, failed=False):
+        def on_error(task, error):
+            with lock:
+                stats["skipped"] += 1
+                stats["failed"] += failed
+                stats["skipped_files"].append((task.path, f"{reason}: {error}"))
+        return on_error
+
+    def classify(entry):
+        task = FileTask(entry)
+        if catalog is not None:
+            task.row = catalog.lookup(entry.path, entry.stat)
+        return task
+
+    def run_dedup(task):
+        if journal is not None:
+            entry = journal.lookup(task.path, task.entry.stat)
+            if entry is not None and entry[3] == "done":
+                return task  # counted as resumed by the plan stage
+        if content_index.find(task.path, task.entry.stat, catalog) is None:
+            return task
+        with lock:
+            stats["existing"] += 1
+        progress.update()
+        bus.advance(1, task.entry.size)
+        return None
+
+    def run_extract(task):
+        cached = from_cache(task.row) if task.row is not None and from_cache else None
+        if cached is not None:
+            task.metadata = cached
+            return task
+        if plan_only:
+            return task
+        if executor is not None:
+            task.metadata = executor.submit(extract, task.path, task.entry.stat, task.kind).result()
+        else:
+            task.metadata = extract(task.path, task.entry.stat, task.kind)
+        if catalog is not None:
+            catalog.update(task.path, task.entry.stat, media_type=media_type(task.kind), **task.metadata)
+        return task
+
+    def run_plan(task):
+        dest_folder_for_task = plan(task)
+        if dest_folder_for_task is None:
+            return None
+        task.dest, task.done = plan_transfer(journal, index, task.path, dest_folder_for_task, task.entry.stat)
+        return task
+
+    failed_transfer = skip("Copy failed", failed=True)
+
+    def remember_hashes(task):
+        checksum = task.checksum
+        fields = {"content_hash": checksum.content_hash, "sample_hash": checksum.sample_hash,
+                  "hash_algo": checksum.algorithm}
+        source = catalog.lookup(task.path, task.entry.stat)
+        if source is not None:
+            fields = dict({field: source[field] for field in METADATA_FIELDS}, **fields)
+        else:
+            fields["media_type"] = media_type(task.kind)
+        # The copy gets the source's metadata too
+        catalog.update(task.dest, os.stat(task.dest), **fields)
+        if transfer_mode != "move":
+            catalog.update(task.path, task.entry.stat, **fields)
+
+    def record(task):
+        if journal is not None and not task.done and not plan_only:
+            journal.complete(task.path)
+        if task.checksum is not None and task.checksum.content_hash is not None and catalog is not None:
+            try:
+                remember_hashes(task)
+            except OSError:
+                pass  # the copy vanished already; nothing to remember
+        if content_index is not None and not task.done and not plan_only:
+            checksum = task.checksum
+            try:
+                if checksum is not None and checksum.sample_hash and checksum.algorithm == content_index.algorithm:
+                    content_index.add(task.dest, checksum.sample_hash, checksum.content_hash)
+                else:
+                    content_index.record(task.dest, task.path, task.entry.stat, catalog)
+            except OSError:
+                pass  # indexed by the next refresh
+        with lock:
+            if task.done:
+                stats["resumed"] += 1
+            else:
+                stats["processed"] += 1
+                stats["total_bytes"] += task.entry.size
+        progress.update()
+        bus.advance(1, task.entry.size)
+
+    def transferred(task, future):
+        error = future.exception()
+        if error is not None:
+            index.release(task.dest)
+            failed_transfer(task, error)
+        else:
+            record(task)
+
+    def run_transfer(task):
+        if plan_only:
+            manifest.write(task.path, task.dest, task.entry.stat, task.reason)
+        elif not task.done:
+            if hash_copy or verify:
+                task.checksum = Checksum(verify=verify)
+            if engine is not None:
+                engine.submit(task.path, task.dest, transfer_mode, task.entry.stat,
+                              on_done=lambda future: transferred(task, future), checksum=task.checksum)
+                return task
+            try:
+                transfer_file(task.path, task.dest, transfer_mode, task.entry.stat, task.checksum)
+            except Exception:
+                index.release(task.dest)
+                raise
+        record(task)
+        return task
+
+    stages = [Stage("classify", classify, queue_size=queue_size)]
+    if content_index is not None:
+        stages.append(Stage("dedup", run_dedup, workers=extract_workers, queue_size=queue_size,
+                            ordered=True, on_error=skip("Failed to check the library")))
+    if extract is not None:
+        stages.append(Stage("extract", run_extract, workers=extract_workers, queue_size=queue_size,
+                            ordered=True, on_error=skip("Failed to get metadata")))
+    stages.append(Stage("plan", run_plan, queue_size=queue_size, on_error=skip("Failed to plan")))
+    stages.append(Stage("transfer", run_transfer, workers=transfer_workers, queue_size=queue_size,
+                        on_error=failed_transfer))
+
+    pipeline = Pipeline(entries, stages, queue_size=queue_size)
+    try:
+        pipeline.run()
+        if engine is not None:
+            engine.drain()
+    finally:
+        progress.close()
+        if executor is not None:
+            executor.shutdown()
+        if owns_index:
+            content_index.print_stats()
+            content_index.close()
+    stats["stages"] = pipeline.stats()
+    stats["cancelled"] = bus.cancelled
+    if not quiet:
+        pipeline.print_stats()
+    return stats
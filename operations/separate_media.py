@@ -1,18 +1,16 @@
-from utils.helpers import is_image, is_video, safe_copy
+from operations.organizer import organize
+from utils.metrics import instrumented
 import os
-from tqdm import tqdm
 
-def separate_photos_videos(source_folder, dest_folder):
+@instrumented("separate_photos_videos")
+def separate_photos_videos(source_folder, dest_folder, transfer_mode="copy", transfer_workers=1, engine=None,
+                           sniff=None, skip_existing=False, hash_copy=False, verify=False):
     print(f"\n🎞️ Separating media from {source_folder}")
-    all_files = []
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            all_files.append(os.path.join(root, file))
+    folders = {"image": "Photos", "video": "Videos"}
 
-    for file_path in tqdm(all_files, desc="Separating"):
-        file = os.path.basename(file_path)
+    def plan(task):
+        return os.path.join(dest_folder, folders[task.entry.kind])
 
-        if is_image(file):
-            safe_copy(file_path, os.path.join(dest_folder, "Photos"))
-        elif is_video(file):
-            safe_copy(file_path, os.path.join(dest_folder, "Videos"))
+    return organize(source_folder, dest_folder, plan, kinds=folders, transfer_mode=transfer_mode,
+                    transfer_workers=transfer_workers, desc="Separating", engine=engine, sniff=sniff,
+                    skip_existing=skip_existing, hash_copy=hash_copy, verify=verify)
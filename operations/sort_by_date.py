@@ -1,61 +1,113 @@
-from utils.helpers import is_image, is_video, get_exif_date, get_video_date, safe_copy
+from utils.classifier import classify
+from utils.helpers import get_exif_date
+from utils.video_metadata import get_video_metadata
+from utils.catalog import MediaCatalog, to_datetime
+from utils.journal import JobJournal, default_journal_path
+from utils.manifest import ManifestWriter
+from operations.organizer import organize
 import os
 import datetime
-from tqdm import tqdm
+from utils.metrics import instrumented
 
-def organize_by_date(source_folder, output_folder):
-    print(f"\n📂 Organizing from {source_folder}")
-    all_files = []
-    stats = {
-        "processed": 0,
-        "skipped": 0,
-        "skipped_files": [],
-        "total_bytes": 0
-    }
+def extract_metadata(file_path, st, kind=None):
+    # Runs inside the worker pool, so it must stay a picklable top-level function.
+    # kind comes from the scan, which may have sniffed the content
+    kind = kind or classify(file_path)
+    metadata = {"date_taken": None}
+    if kind == "image":
+        metadata["date_taken"] = get_exif_date(file_path)
+    elif kind == "video":
+        # One probe fills date, duration and resolution for the catalog
+        metadata = get_video_metadata(file_path)
+    if metadata["date_taken"] is None:
+        metadata["date_taken"] = datetime.datetime.fromtimestamp(st.st_mtime)
+    return metadata
 
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            all_files.append(os.path.join(root, file))
+def cached_metadata(row):
+    date_taken = to_datetime(row["date_taken"])
+    return {"date_taken": date_taken} if date_taken is not None else None
 
-    for file_path in tqdm(all_files, desc="Organizing"):
-        file = os.path.basename(file_path)
+def default_manifest_path(output_folder):
+    return os.path.join(output_folder, "plan_manifest.csv")
 
-        # Get creation date
-        date_taken = None
-        if is_image(file):
-            date_taken = get_exif_date(file_path)
-        elif is_video(file):
-            date_taken = get_video_date(file_path)
+def date_folder(output_folder, date_taken):
+    year = str(date_taken.year)
+    month = f"{date_taken.strftime('%m')}-{date_taken.strftime('%B')}"
+    day = f"{date_taken.strftime('%d')}-{date_taken.strftime('%A')}"
+    return os.path.join(output_folder, year, month, day)
 
+@instrumented("organize_by_date")
+def organize_by_date(source_folder, output_folder, catalog=None, workers=1, pool="thread", batch_size=256, transfer_mode="copy",
+                     resume=False, journal_path=None, fsync="batch", transfer_workers=1,
+                     plan_only=False, manifest_path=None, engine=None, sniff=None, entries=None, journal=None,
+                     skip_existing=False, content_index=None, hash_copy=False, verify=False, quiet=False):
+    # entries: organize just these ScanEntry objects instead of scanning
+    # journal: an open JobJournal to use instead of opening one (watch mode)
+    # skip_existing: don't copy files the output folder already holds, even
+    #   under another name (see utils.content_index)
+    # hash_copy: hash while copying and keep the hashes in the catalog;
+    #   verify: also read each copy back and compare
+    # quiet: no summary logs or report (watch mode reports once per session)
+    if not quiet:
+        print(f"\n📂 Organizing from {source_folder}")
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+    manifest = ManifestWriter(manifest_path or default_manifest_path(output_folder)) if plan_only else None
+    owns_journal = journal is None and not plan_only
+    if owns_journal:
+        journal = JobJournal(journal_path or default_journal_path(output_folder), fsync, resume)
+
+    def plan(task):
+        date_taken = task.metadata.get("date_taken")
         if date_taken is None:
-            try:
-                date_taken = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
-            except Exception as e:
-                stats["skipped"] += 1
-                stats["skipped_files"].append((file_path, f"Failed to get date: {e}"))
-                continue
+            # Plan-only runs never open uncataloged files
+            date_taken = datetime.datetime.fromtimestamp(task.entry.mtime)
+            task.reason = "mtime (not in catalog)"
+        else:
+            task.reason = f"date_taken {date_taken:%Y-%m-%d}"
+        return date_folder(output_folder, date_taken)
 
-        year = str(date_taken.year)
-        month = f"{date_taken.strftime('%m')}-{date_taken.strftime('%B')}"
-        day = f"{date_taken.strftime('%d')}-{date_taken.strftime('%A')}"
-        dest_dir = os.path.join(output_folder, year, month, day)
+    # Dates are extracted by the pool ahead of the copy stage; the plan stage
+    # sees files in scan order so collision suffixes are stable regardless of
+    # the worker count.
+    try:
+        stats = organize(source_folder, output_folder, plan, extract_metadata, cached_metadata,
+                         catalog=catalog, journal=journal, transfer_mode=transfer_mode,
+                         extract_workers=workers, pool=pool, transfer_workers=transfer_workers,
+                         queue_size=batch_size, manifest=manifest, engine=engine, sniff=sniff, entries=entries,
+                         skip_existing=skip_existing, content_index=content_index, hash_copy=hash_copy,
+                         verify=verify, quiet=quiet)
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if owns_journal:
+            journal.close()
+        if owns_catalog:
+            catalog.close()
+        else:
+            catalog.flush()
 
-        try:
-            safe_copy(file_path, dest_dir)
-            stats["processed"] += 1
-            stats["total_bytes"] += os.path.getsize(file_path)
-        except Exception as e:
-            stats["skipped"] += 1
-            stats["skipped_files"].append((file_path, f"Copy failed: {e}"))
+    if plan_only:
+        print(f"\n📝 Planned {stats['processed']} file(s), {round(stats['total_bytes'] / (1024 * 1024), 2)} MB")
+        print(f"📜 Manifest saved to: {manifest.path}")
+        return stats
+    if quiet:
+        for path, reason in stats["skipped_files"]:
+            print(f"❌ Failed to process {path}: {reason}")
+        return stats
 
     # Save summary logs
     summary_path = os.path.join(output_folder, "summary.log")
     skipped_path = os.path.join(output_folder, "skipped_files.log")
+    os.makedirs(output_folder, exist_ok=True)
 
     with open(summary_path, "w", encoding="utf-8") as s:
         s.write(f"✅ Total files processed: {stats['processed']}\n")
         s.write(f"📦 Total size moved: {round(stats['total_bytes'] / (1024 * 1024), 2)} MB\n")
         s.write(f"❌ Total files skipped: {stats['skipped']}\n")
+        s.write(f"⏩ Already done (resumed): {stats['resumed']}\n")
+        if skip_existing or content_index is not None:
+            s.write(f"♻️ Already in the library: {stats['existing']}\n")
 
     if stats["skipped_files"]:
         with open(skipped_path, "w", encoding="utf-8") as skip_log:
@@ -66,4 +118,8 @@ def organize_by_date(source_folder, output_folder):
     print(f"✅ Files processed: {stats['processed']}")
     print(f"📦 Total size moved: {round(stats['total_bytes'] / (1024 * 1024), 2)} MB")
     print(f"❌ Skipped files: {stats['skipped']}")
+    print(f"⏩ Already done (resumed): {stats['resumed']}")
+    if skip_existing or content_index is not None:
+        print(f"♻️ Already in the library: {stats['existing']}")
     print(f"📝 Summary saved to: {summary_path}")
+    return stats
@@ -1,6 +1,9 @@
 import os
-from tqdm import tqdm
-from utils.helpers import safe_copy
+from utils.classifier import media_type
+from utils.catalog import MediaCatalog
+from utils.journal import JobJournal, default_journal_path
+from operations.organizer import organize
+from utils.metrics import instrumented
 
 def get_size_category(size_bytes):
     if size_bytes < 100 * 1024 * 1024:
@@ -18,19 +21,38 @@ def get_size_category(size_bytes):
     else:
         return "5GB+"
 
-def sort_by_size(source_folder, dest_folder):
-    print(f"\n📏 Sorting by file size in: {source_folder}")
-    all_files = []
+@instrumented("sort_by_size")
+def sort_by_size(source_folder, dest_folder, catalog=None, transfer_mode="copy",
+                 resume=False, journal_path=None, fsync="batch", transfer_workers=1,
+                 engine=None, entries=None, journal=None, skip_existing=False, content_index=None,
+                 hash_copy=False, verify=False, quiet=False):
+    if not quiet:
+        print(f"\n📏 Sorting by file size in: {source_folder}")
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+    owns_journal = journal is None
+    if owns_journal:
+        journal = JobJournal(journal_path or default_journal_path(dest_folder), fsync, resume)
 
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            all_files.append(os.path.join(root, file))
+    def plan(task):
+        if task.row is None:
+            catalog.update(task.path, task.entry.stat, media_type=media_type(task.kind))
+        return os.path.join(dest_folder, get_size_category(task.entry.size))
 
-    for file_path in tqdm(all_files, desc="Sorting by size"):
-        try:
-            size = os.path.getsize(file_path)
-            category = get_size_category(size)
-            size_folder = os.path.join(dest_folder, category)
-            safe_copy(file_path, size_folder)
-        except Exception as e:
-            print(f"❌ Failed to process {file_path}: {e}")
+    try:
+        stats = organize(source_folder, dest_folder, plan, catalog=catalog, journal=journal,
+                         transfer_mode=transfer_mode, transfer_workers=transfer_workers,
+                         desc="Sorting by size", engine=engine, entries=entries,
+                         skip_existing=skip_existing, content_index=content_index, hash_copy=hash_copy,
+                         verify=verify, quiet=quiet)
+    finally:
+        if owns_journal:
+            journal.close()
+        if owns_catalog:
+            catalog.close()
+        else:
+            catalog.flush()
+
+    for path, reason in stats["skipped_files"]:
+        print(f"❌ Failed to process {path}: {reason}")
+    return stats
@@ -0,0 +1,74 @@
+from operations.duplicate_finder import copy_to_folder
+from utils.catalog import MediaCatalog
+from utils.events import bus
+from utils.metrics import metrics, instrumented
+from utils.parallel import map_ahead
+from utils.perceptual import group_pairs
+from utils.scanner import scan
+from utils.video_fingerprint import video_fingerprint, match_videos, to_blob, from_blob, DEFAULT_SAMPLES
+from utils.progress import tqdm
+
+def compute_video_fingerprints(entries, samples=DEFAULT_SAMPLES, catalog=None, workers=1):
+    # Fingerprints are cached by (path, size, mtime) so only new or changed
+    # videos are opened again. A video that could not be decoded at all
+    # (empty fingerprint) is not cached, so the next run tries again; static
+    # or partly unseekable videos are cached like any other.
+    paths, fingerprints, missing = [], [], []
+    for entry in entries:
+        blob = catalog.get_fingerprint(entry.path, entry.stat, samples)
+        fingerprint = from_blob(blob) if blob is not None else None
+        if fingerprint is None or not len(fingerprint):
+            fingerprint = None
+            missing.append((len(paths), entry))
+        fingerprints.append(fingerprint)
+        paths.append(entry.path)
+
+    # OpenCV releases the GIL while seeking and decoding, so threads suffice
+    def fingerprint(entry):
+        with metrics.timer("video_fingerprint", entry.path, entry.kind, entry.size):
+            return video_fingerprint(entry.path, samples)
+
+    bus.stage("Fingerprinting videos", len(missing), sum(entry.size for _, entry in missing))
+    results = map_ahead(fingerprint, (e for _, e in missing), workers, "thread", batch_size=16)
+    for (slot, entry), (_, fingerprint) in tqdm(zip(missing, results), total=len(missing), desc="Fingerprinting videos"):
+        bus.checkpoint()
+        bus.advance(1, entry.size)
+        if isinstance(fingerprint, Exception):
+            continue
+        if len(fingerprint):
+            catalog.put_fingerprint(entry.path, entry.stat, samples, to_blob(fingerprint))
+        fingerprints[slot] = fingerprint
+
+    keep = [i for i, fp in enumerate(fingerprints) if fp is not None and len(fp)]
+    return [paths[i] for i in keep], [fingerprints[i] for i in keep]
+
+def find_video_duplicate_groups(source_folder, samples=DEFAULT_SAMPLES, frame_threshold=10, min_ratio=0.5,
+                                catalog=None, workers=1, skip_dirs=()):
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+
+    entries = scan(source_folder, kinds=("video",), skip_dirs=skip_dirs)
+    try:
+        paths, fingerprints = compute_video_fingerprints(entries, samples, catalog, workers)
+    finally:
+        if owns_catalog:
+            catalog.close()
+
+    groups = group_pairs(len(paths), match_videos(fingerprints, frame_threshold, min_ratio))
+    return [[paths[i] for i in group] for group in groups]
+
+@instrumented("find_video_duplicates")
+def find_video_duplicates(source_folder, dest_folder, samples=DEFAULT_SAMPLES, frame_threshold=10, min_ratio=0.5,
+                          catalog=None, workers=1, transfer_mode="copy", engine=None):
+    print(f"\n🎬 Fingerprinting videos in {source_folder} ({samples} frames each)")
+    groups = find_video_duplicate_groups(source_folder, samples, frame_threshold, min_ratio, catalog, workers,
+                                         skip_dirs=[dest_folder])
+    duplicates = [dup for group in groups for dup in group[1:]]
+
+    if not duplicates:
+        print("✅ No duplicate videos found.")
+        return groups
+
+    print(f"\n✅ Found {len(duplicates)} duplicate video(s) in {len(groups)} group(s).")
+    copy_to_folder(duplicates, dest_folder, transfer_mode, "Copying duplicate videos", engine)
+    return groups
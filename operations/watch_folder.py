@@ -0,0 +1,121 @@
+from utils.catalog import MediaCatalog
+from utils.content_index import ContentIndex
+from utils.journal import JobJournal, default_journal_path
+from utils.metrics import instrumented
+from utils.scanner import entry_for, scan, source_roots
+from utils.watcher import DEFAULT_IGNORE, DEFAULT_SETTLE, Debouncer, InotifyWatcher, open_watcher
+import inspect
+import time
+
+# Continuous organizing of drop folders.
+#
+# Instead of cron re-walking the source every few minutes, the watcher waits
+# for filesystem events (see utils.watcher), the debouncer holds each new
+# file until its writer is done, and settled files go through the regular
+# organizer in micro-batches as ScanEntry lists, so only new files are ever
+# looked at. One catalog and one journal stay open for the whole session;
+# the journal (resume mode) also keeps files from being redone after a
+# restart, when the initial catch-up scan hands every existing file over.
+# The journal is also what keeps a settled file that was already organized
+# (an attribute change, a copy-mode source touched again) out of the next
+# batch, so the session holds no per-file state of its own. Batches run
+# quietly (no summary.log rewrite, no stage report); the timing report comes
+# once, when the watch stops.
+# With skip_existing the destination's content index is likewise opened once,
+# so its Bloom filter is loaded a single time per session.
+
+WATCH_ORGANIZERS = ("by-date", "by-size", "documents")
+DEFAULT_BATCH_SIZE = 500
+STOP_CHECK_SECONDS = 1.0
+
+def _organizer(name):
+    if name == "by-date":
+        from operations.sort_by_date import organize_by_date
+        return organize_by_date
+    if name == "by-size":
+        from operations.sort_by_size import sort_by_size
+        return sort_by_size
+    if name == "documents":
+        from operations.organize_documents import organize_documents
+        return organize_documents
+    raise ValueError(f"Unknown organizer: {name} (choose from {', '.join(WATCH_ORGANIZERS)})")
+
+@instrumented("watch_folder")
+def watch_folder(source_folder, dest_folder, organizer="by-date", settle=DEFAULT_SETTLE,
+                 batch_size=DEFAULT_BATCH_SIZE, poll_interval=None, catch_up=True, ignore=DEFAULT_IGNORE,
+                 catalog=None, journal_path=None, fsync="batch", engine=None, sniff=None, stop=None,
+                 skip_existing=False, **options):
+    # Runs until interrupted (Ctrl+C / SIGTERM) or until `stop` (a
+    # threading.Event) is set. Extra options (transfer_mode, workers, ...)
+    # go to the organizer when it takes them.
+    #   settle: seconds a file must stay quiet before it is organized
+    #   poll_interval: poll instead of using inotify, every this many seconds
+    #   catch_up: also organize files that were there before the watch started
+    #   skip_existing: leave files the destination already holds in place
+    func = _organizer(organizer)
+    accepted = inspect.signature(func).parameters
+    options = {key: value for key, value in options.items() if key in accepted and value is not None}
+    roots = source_roots(source_folder)
+    source = roots[0] if len(roots) == 1 else roots
+
+    owns_catalog = catalog is None
+    catalog = catalog or MediaCatalog()
+    journal = JobJournal(journal_path or default_journal_path(dest_folder), fsync, resume=True)
+    content_index = ContentIndex(dest_folder) if skip_existing else None
+    watcher = open_watcher(roots, skip_dirs=[dest_folder], ignore=ignore, poll_interval=poll_interval)
+    debouncer = Debouncer(settle)
+    totals = {"batches": 0, "processed": 0, "skipped": 0, "failed": 0, "resumed": 0, "existing": 0}
+
+    def run_batch(ready):
+        started = time.perf_counter()
+        entries = [entry_for(path, st, sniff) for path, st in ready]
+        kwargs = dict(options, entries=entries, catalog=catalog, journal=journal, engine=engine, sniff=sniff,
+                      content_index=content_index, quiet=True)
+        stats = func(source, dest_folder, **{key: value for key, value in kwargs.items() if key in accepted})
+        totals["batches"] += 1
+        for key in ("processed", "skipped", "failed", "resumed", "existing"):
+            totals[key] += stats.get(key, 0)
+        print(f"📥 Batch {totals['batches']}: {len(entries)} new file(s), {stats.get('processed', 0)} organized, "
+              f"{stats.get('skipped', 0)} skipped in {time.perf_counter() - started:.2f}s")
+
+    def organized(path, st):
+        entry = journal.lookup(path, st)
+        return entry is not None and entry[3] == "done"
+
+    if catch_up:
+        # The watcher is already running, so nothing created meanwhile is lost
+        for entry in scan(roots, exclude=ignore, skip_dirs=[dest_folder]):
+            debouncer.touch(entry.path)
+
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else f"polling every {watcher.interval:g}s"
+    print(f"👀 Watching {', '.join(roots)} ({mode}) → {dest_folder} [{organizer}]; Ctrl+C to stop")
+    try:
+        while stop is None or not stop.is_set():
+            timeout = debouncer.next_check()
+            if stop is not None:
+                timeout = STOP_CHECK_SECONDS if timeout is None else min(timeout, STOP_CHECK_SECONDS)
+            changed, removed = watcher.changes(timeout)
+            now = time.monotonic()
+            for path in removed:
+                debouncer.discard(path)
+            for path in changed:
+                debouncer.touch(path, now)
+
+            ready = [(path, st) for path, st in debouncer.ready() if not organized(path, st)]
+            for start in range(0, len(ready), batch_size):
+                run_batch(ready[start:start + batch_size])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        journal.close()
+        if content_index is not None:
+            content_index.print_stats()
+            content_index.close()
+        if owns_catalog:
+            catalog.close()
+        else:
+            catalog.flush()
+    print(f"\n🛑 Watch stopped: {totals['processed']} file(s) organized in {totals['batches']} batch(es), "
+          f"{totals['skipped']} skipped" + (f", {totals['existing']} already present" if skip_existing else ""))
+    return totals
@@ -1,14 +1,91 @@
-import os
+import sys
+import json
+import time
+import argparse
 from collections import Counter
+from utils.classifier import EXTENSIONS, KINDS, OTHER, SNIFF_MODES, extension_of, file_type
+from utils.scanner import scan
 
-folder = r"D:\Airbnb Data"  # ⬅️ Replace with your actual input folder
-ext_counter = Counter()
+# File census of a folder tree: counts and sizes per kind and extension,
+# built on the same scanner and classifier the operations use, so the
+# buckets shown are the buckets files will land in.
+#
+#   python scan_extensions.py "D:\Airbnb Data"
+#   python scan_extensions.py /mnt/photos --sniff all --json census.json
+#
+# Without --sniff no file is opened (names and scandir stats only). With
+# --sniff the report also lists files whose content disagrees with their
+# extension, or that have no known extension but a recognisable header.
 
-for root, _, files in os.walk(folder):
-    for f in files:
-        ext = os.path.splitext(f)[1].lower()
-        ext_counter[ext] += 1
+def census(folder, sniff=None):
+    kinds = Counter()
+    kind_bytes = Counter()
+    extensions = Counter()
+    extension_bytes = Counter()
+    relabeled = Counter()  # (extension, detected group) -> files
+    start = time.perf_counter()
+    for entry in scan(folder, sniff=sniff):
+        ext = extension_of(entry.name) or "(none)"
+        kinds[entry.kind] += 1
+        kind_bytes[entry.kind] += entry.size
+        extensions[ext] += 1
+        extension_bytes[ext] += entry.size
+        if sniff and (entry.kind, entry.group) != file_type(entry.name):
+            relabeled[(ext, entry.group)] += 1
+    return {
+        "folder": folder,
+        "sniff": sniff,
+        "seconds": round(time.perf_counter() - start, 3),
+        "files": sum(kinds.values()),
+        "bytes": sum(kind_bytes.values()),
+        "kinds": {kind: {"files": kinds[kind], "bytes": kind_bytes[kind]} for kind in KINDS if kinds[kind]},
+        "extensions": [
+            {"extension": ext, "files": count, "bytes": extension_bytes[ext],
+             "kind": EXTENSIONS.get(ext, OTHER).kind}
+            for ext, count in extensions.most_common()
+        ],
+        "relabeled": [
+            {"extension": ext, "detected": group, "files": count}
+            for (ext, group), count in relabeled.most_common()
+        ],
+    }
 
-print("📊 File extension counts:")
-for ext, count in ext_counter.most_common():
-    print(f"{ext}: {count}")
+def print_report(report, top):
+    mb = report["bytes"] / (1024 * 1024)
+    print(f"📊 {report['files']:,} files, {mb:,.1f} MB in {report['folder']} ({report['seconds']:.2f}s)")
+    for kind, totals in report["kinds"].items():
+        print(f"   {kind:<9} {totals['files']:>10,} files  {totals['bytes'] / (1024 * 1024):>12,.1f} MB")
+
+    print("\n📁 File extension counts:")
+    for row in report["extensions"][:top]:
+        print(f"   {row['extension']:<12} {row['files']:>10,}  {row['bytes'] / (1024 * 1024):>12,.1f} MB  {row['kind']}")
+    hidden = len(report["extensions"]) - top
+    if hidden > 0:
+        print(f"   … {hidden} more (use --top)")
+
+    if report["sniff"]:
+        if report["relabeled"]:
+            print("\n🔎 Content differs from extension:")
+            for row in report["relabeled"]:
+                print(f"   {row['extension']:<12} → {row['detected'] or 'unknown'}: {row['files']:,}")
+        else:
+            print("\n🔎 Every sniffed file matches its extension.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Count files per kind and extension")
+    parser.add_argument("folder", nargs="+", help="one or more folders")
+    parser.add_argument("--sniff", choices=SNIFF_MODES, help="also read file headers (unknown extensions, or all)")
+    parser.add_argument("--top", type=int, default=50, help="extensions to list")
+    parser.add_argument("--json", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    folder = args.folder[0] if len(args.folder) == 1 else args.folder
+    report = census(folder, args.sniff)
+    print_report(report, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {args.json}")
+
+if __name__ == "__main__":
+    sys.exit(main())
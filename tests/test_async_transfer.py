@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import async_transfer
+from utils.async_transfer import TransferEngine
+
+# Runs on local files with latency injected into every copy, standing in for
+# a network share.
+
+def make_files(folder, count, size):
+    folder.mkdir()
+    paths = []
+    for i in range(count):
+        path = folder / f"IMG_{i:03d}.jpg"
+        path.write_bytes(os.urandom(size))
+        paths.append(str(path))
+    return paths
+
+class InFlight:
+    # Wraps transfer_file to record the peak number of files and bytes copied at once
+    def __init__(self, monkeypatch, latency):
+        self.lock = threading.Lock()
+        self.files = self.bytes = self.peak_files = self.peak_bytes = 0
+        real = async_transfer.transfer_file
+
+        def transfer_file(src, dest, mode="copy", src_stat=None, checksum=None):
+            size = os.path.getsize(src)
+            with self.lock:
+                self.files += 1
+                self.bytes += size
+                self.peak_files = max(self.peak_files, self.files)
+                self.peak_bytes = max(self.peak_bytes, self.bytes)
+            try:
+                time.sleep(latency)
+                return real(src, dest, mode, src_stat, checksum)
+            finally:
+                with self.lock:
+                    self.files -= 1
+                    self.bytes -= size
+
+        monkeypatch.setattr(async_transfer, "transfer_file", transfer_file)
+
+def run(engine, paths, dest):
+    dest.mkdir()
+    with engine:
+        for path in paths:
+            engine.submit(path, str(dest / os.path.basename(path)), src_stat=os.stat(path))
+    return sorted(os.listdir(dest))
+
+def test_file_budget(tmp_path, monkeypatch):
+    paths = make_files(tmp_path / "src", 24, 1024)
+    in_flight = InFlight(monkeypatch, latency=0.02)
+    copied = run(TransferEngine(max_files=4), paths, tmp_path / "dest")
+    assert copied == sorted(os.path.basename(path) for path in paths)
+    assert in_flight.peak_files == 4
+
+def test_byte_budget(tmp_path, monkeypatch):
+    paths = make_files(tmp_path / "src", 12, 100 * 1024)
+    in_flight = InFlight(monkeypatch, latency=0.02)
+    run(TransferEngine(max_files=8, max_bytes=250 * 1024), paths, tmp_path / "dest")
+    assert in_flight.peak_bytes <= 250 * 1024
+    assert in_flight.peak_files == 2
+
+def test_file_larger_than_byte_budget_runs_alone(tmp_path, monkeypatch):
+    paths = make_files(tmp_path / "src", 3, 300 * 1024)
+    in_flight = InFlight(monkeypatch, latency=0.02)
+    copied = run(TransferEngine(max_files=8, max_bytes=250 * 1024), paths, tmp_path / "dest")
+    assert len(copied) == 3
+    assert in_flight.peak_files == 1
+
+def test_rate_limit_per_device(tmp_path):
+    # 4 x 256 KB at 1 MB/s: the first starts at once, the last after ~0.75s
+    paths = make_files(tmp_path / "src", 4, 256 * 1024)
+    start = time.perf_counter()
+    run(TransferEngine(max_files=4, rate_limit=1024 * 1024), paths, tmp_path / "limited")
+    assert time.perf_counter() - start >= 0.7
+
+    # An override for the destination's device replaces the default rate
+    (tmp_path / "fast").mkdir()
+    engine = TransferEngine(max_files=4, rate_limit=1024 * 1024, rate_limits={str(tmp_path / "fast"): 1024 ** 3})
+    start = time.perf_counter()
+    with engine:
+        for path in paths:
+            engine.submit(path, str(tmp_path / "fast" / os.path.basename(path)))
+    assert time.perf_counter() - start < 0.5
+
+def test_errors_reach_on_done(tmp_path):
+    paths = make_files(tmp_path / "src", 2, 1024)
+    (tmp_path / "dest").mkdir()
+    results = {}
+
+    def on_done(src):
+        return lambda future: results.__setitem__(src, future.exception())
+
+    missing = str(tmp_path / "src" / "missing.jpg")
+    with TransferEngine(max_files=2) as engine:
+        for path in paths + [missing]:
+            engine.submit(path, str(tmp_path / "dest" / os.path.basename(path)), on_done=on_done(path))
+        engine.drain()
+        assert engine.stats["errors"] == 1
+    assert isinstance(results[missing], FileNotFoundError)
+    assert all(results[path] is None for path in paths)
@@ -0,0 +1,77 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.catalog import DATES_ISO_VERSION, MediaCatalog, ensure_schema
+
+# A catalog written by the original init_db.py / organizer: no extra
+# columns, no indexes, one row per run for the same file and str(datetime)
+# dates.
+
+def legacy_catalog(path):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE media (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT,
+        filepath TEXT,
+        media_type TEXT,
+        date_taken TEXT
+    )
+    """)
+    conn.executemany("INSERT INTO media (filename, filepath, media_type, date_taken) VALUES (?, ?, ?, ?)", [
+        ("a.jpg", "/photos/a.jpg", "image", "2020-11-06 13:41:43"),
+        ("b.mp4", "/photos/b.mp4", "video", "2021-01-02 08:00:00"),
+        ("a.jpg", "/photos/a.jpg", "image", "2020-11-07 09:00:00"),
+        ("c.jpg", "/photos/c.jpg", "image", None),
+        ("d.jpg", "/photos/d.jpg", "image", "2019-05-01T10:00:00"),
+    ])
+    conn.commit()
+    return conn
+
+def rows(conn):
+    return conn.execute("SELECT id, filepath, date_taken FROM media ORDER BY id").fetchall()
+
+def test_legacy_catalog_is_migrated(tmp_path):
+    conn = legacy_catalog(str(tmp_path / "media.db"))
+    ensure_schema(conn)
+    # The newest row per file is kept and dates are stored as ISO
+    assert rows(conn) == [
+        (2, "/photos/b.mp4", "2021-01-02T08:00:00"),
+        (3, "/photos/a.jpg", "2020-11-07T09:00:00"),
+        (4, "/photos/c.jpg", None),
+        (5, "/photos/d.jpg", "2019-05-01T10:00:00"),
+    ]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == DATES_ISO_VERSION
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(media)")}
+    assert {"size", "mtime_ns", "content_hash", "perceptual_hash"} <= columns
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_media_filepath", "idx_media_type_date", "idx_media_hash"} <= indexes
+
+def test_migration_runs_once(tmp_path):
+    conn = legacy_catalog(str(tmp_path / "media.db"))
+    ensure_schema(conn)
+    migrated = rows(conn)
+    # A value in the old format written after the migration is left alone,
+    # and the same file cannot be inserted twice any more
+    conn.execute("UPDATE media SET date_taken = '2022-02-02 02:02:02' WHERE id = 4")
+    conn.commit()
+    ensure_schema(conn)
+    assert rows(conn) == migrated[:2] + [(4, "/photos/c.jpg", "2022-02-02 02:02:02")] + migrated[3:]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO media (filepath) VALUES ('/photos/a.jpg')")
+
+def test_catalog_opens_a_legacy_database(tmp_path):
+    path = str(tmp_path / "media.db")
+    legacy_catalog(path).close()
+    photo = tmp_path / "a.jpg"
+    photo.write_bytes(b"x")
+    st = os.stat(photo)
+    with MediaCatalog(path) as catalog:
+        catalog.update(str(photo), st, media_type="image")
+    with MediaCatalog(path) as catalog:
+        assert catalog.lookup(str(photo), st)["media_type"] == "image"
+        assert catalog.conn.execute("SELECT COUNT(*) FROM media").fetchone()[0] == 5
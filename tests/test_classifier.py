@@ -0,0 +1,26 @@
+import os
+import sys
+import struct
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.classifier import sniff
+
+def ftyp(brand):
+    return struct.pack(">I4s4sI", 20, b"ftyp", brand, 0) + b"isom"
+
+@pytest.mark.parametrize("brand, kind, group", [
+    (b"isom", "video", "MP4"),
+    (b"mp42", "video", "MP4"),
+    (b"3gp5", "video", "MP4"),
+    (b"qt  ", "video", "QuickTime"),
+    (b"heic", "image", "HEIC"),
+])
+def test_known_brands(brand, kind, group):
+    assert sniff(ftyp(brand)) == (kind, group)
+
+@pytest.mark.parametrize("brand", [b"crx ", b"jp2 ", b"M4A ", b"abcd"])
+def test_other_brands_are_not_video(brand):
+    # Canon CR3 raw photos, JPEG 2000, audio and unknown brands
+    assert sniff(ftyp(brand)) is None
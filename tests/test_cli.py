@@ -0,0 +1,30 @@
+import os
+import sys
+import errno
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cli
+from operations import organizer
+
+def drop_folder(tmp_path, count=3):
+    source = tmp_path / "drop"
+    source.mkdir()
+    for i in range(count):
+        (source / f"IMG_{i:04d}.jpg").write_bytes(os.urandom(1024))
+    return ["by-size", str(source), "-d", str(tmp_path / "out"), "--catalog", str(tmp_path / "catalog.db")]
+
+def test_success_exits_0(tmp_path):
+    assert cli.main(drop_folder(tmp_path)) == 0
+
+def test_failed_transfers_exit_1(tmp_path, monkeypatch):
+    def full_disk(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(organizer, "transfer_file", full_disk)
+    assert cli.main(drop_folder(tmp_path)) == 1
+
+def test_exit_status():
+    assert cli.exit_status([{"skipped": 0}, None]) == 0
+    assert cli.exit_status([{"skipped": 2, "failed": 0}]) == 2
+    assert cli.exit_status([{"cancelled": True}]) == 2
+    assert cli.exit_status([{"skipped": 2}, {"skipped": 1, "failed": 1}]) == 1
@@ -0,0 +1,85 @@
+import os
+import sys
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations.sort_by_size import sort_by_size
+from utils.catalog import MediaCatalog
+from utils.content_index import ContentIndex, default_index_path
+from utils.hashing import SAMPLE_SIZE, hash_sample
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+def find(index, path, catalog=None):
+    return index.find(path, os.stat(path), catalog)
+
+def test_organize_skips_content_the_library_has(tmp_path):
+    library, drop = str(tmp_path / "library"), str(tmp_path / "drop")
+    old = os.urandom(3 * SAMPLE_SIZE)
+    write(os.path.join(library, "2020", "kept.jpg"), old)
+    write(os.path.join(drop, "IMG_1.jpg"), old)
+    write(os.path.join(drop, "IMG_2.jpg"), os.urandom(1024))
+
+    stats = sort_by_size(drop, library, catalog=MediaCatalog(":memory:"), skip_existing=True)
+    assert (stats["processed"], stats["existing"]) == (1, 1)
+    assert os.listdir(os.path.join(library, "Below_100MB")) == ["IMG_2.jpg"]
+
+    # The copy was recorded, so a second import of the same folder copies nothing
+    stats = sort_by_size(drop, library, catalog=MediaCatalog(":memory:"), skip_existing=True)
+    assert (stats["processed"], stats["existing"]) == (0, 2)
+
+def test_same_sample_different_content_is_not_a_match(tmp_path):
+    # Equal size, head and tail; only the middle differs
+    head, tail = os.urandom(SAMPLE_SIZE), os.urandom(SAMPLE_SIZE)
+    write(str(tmp_path / "library" / "a.mp4"), head + b"a" * SAMPLE_SIZE + tail)
+    incoming = write(str(tmp_path / "b.mp4"), head + b"b" * SAMPLE_SIZE + tail)
+    same = write(str(tmp_path / "c.mp4"), head + b"a" * SAMPLE_SIZE + tail)
+    with ContentIndex(str(tmp_path / "library")) as index:
+        assert find(index, incoming) is None
+        assert find(index, same) == str(tmp_path / "library" / "a.mp4")
+        # Both incoming files and, once, the library file
+        assert index.stats["full_hashed"] == 3
+
+def test_refresh_picks_up_new_changed_and_removed_files(tmp_path):
+    library = str(tmp_path / "library")
+    first = write(os.path.join(library, "a", "one.jpg"), os.urandom(4096))
+    gone = write(os.path.join(library, "b", "two.jpg"), os.urandom(4096))
+    changed = write(os.path.join(library, "a", "three.jpg"), os.urandom(4096))
+    with ContentIndex(library) as index:
+        assert index.stats["indexed"] == 3
+
+    added = write(os.path.join(library, "c", "four.jpg"), os.urandom(4096))
+    probes = {path: write(str(tmp_path / "in" / os.path.basename(path)), open(path, "rb").read())
+              for path in (first, gone, added)}
+    os.remove(gone)
+    os.rmdir(os.path.dirname(gone))
+    write(changed, os.urandom(4096))
+    os.utime(changed, ns=(0, 10 ** 18))
+    with ContentIndex(library) as index:
+        # Only the new and the changed file are read
+        assert (index.stats["indexed"], index.stats["removed"]) == (2, 1)
+        assert find(index, probes[first]) == first
+        assert find(index, probes[gone]) is None
+        assert find(index, probes[added]) == added
+
+def test_saved_filter_catches_up_with_rows_written_since(tmp_path):
+    library = str(tmp_path / "library")
+    kept = write(os.path.join(library, "kept.jpg"), os.urandom(4096))
+    ContentIndex(library).close()
+
+    # A row written after the filter was saved (another run that died)
+    later = write(os.path.join(library, "later.jpg"), os.urandom(5000))
+    st = os.stat(later)
+    with sqlite3.connect(default_index_path(library)) as conn:
+        conn.execute("INSERT INTO files (folder, name, size, mtime_ns, sample_hash) VALUES ('', ?, ?, ?, ?)",
+                     ("later.jpg", st.st_size, st.st_mtime_ns, hash_sample(later)))
+
+    with ContentIndex(library, refresh=False) as index:
+        assert find(index, kept) == kept
+        assert find(index, later) == later
+        assert find(index, write(str(tmp_path / "new.jpg"), os.urandom(6000))) is None
+        assert index.stats["size_misses"] == 1
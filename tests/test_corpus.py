@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import datetime
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+pytest.importorskip("PIL")
+from corpus import generate
+from utils.exif_reader import get_exif_date
+from utils.video_metadata import read_mp4_metadata
+
+FILES = 400
+
+def fingerprint(folder, timezone):
+    # Generates a corpus in a fresh interpreter under TZ and returns a digest
+    # of every path, content and mtime
+    script = f"""
+import corpus, hashlib, os, json
+info = corpus.generate({folder!r}, files={FILES}, seed=7, progress=False)
+digest = hashlib.sha256()
+for parent, dirs, names in sorted(os.walk(info["root"])):
+    dirs.sort()
+    for name in sorted(names):
+        path = os.path.join(parent, name)
+        with open(path, "rb") as f:
+            digest.update(os.path.relpath(path, info["root"]).encode() + f.read())
+        digest.update(str(os.stat(path).st_mtime_ns).encode())
+print(json.dumps(digest.hexdigest()))
+"""
+    env = dict(os.environ, TZ=timezone)
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.join(ROOT, "benchmarks"), env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def test_same_seed_same_corpus_in_any_timezone(tmp_path):
+    assert fingerprint(str(tmp_path / "utc"), "UTC") == fingerprint(str(tmp_path / "tokyo"), "Asia/Tokyo")
+
+def test_embedded_dates_are_readable(tmp_path):
+    info = generate(str(tmp_path), files=FILES, seed=7, progress=False)
+    assert sum(info["counts"][kind] for kind in ("jpeg_exif", "jpeg_plain", "mp4", "document", "other")) + \
+        info["counts"]["duplicates"] == FILES
+    # Dated files carry their mtime: EXIF as UTC wall time, mvhd as a timestamp
+    dated = 0
+    for parent, _, names in os.walk(info["root"]):
+        for name in names:
+            path = os.path.join(parent, name)
+            mtime = os.stat(path).st_mtime
+            if name.endswith(".jpg"):
+                date = get_exif_date(path)
+                expected = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).replace(tzinfo=None)
+            elif name.endswith(".mp4"):
+                date = read_mp4_metadata(path)["date_taken"]
+                expected = datetime.datetime.fromtimestamp(mtime)
+            else:
+                continue
+            dated += date == expected
+    # Duplicates get a new mtime, so only originals are sure to match
+    assert dated >= info["counts"]["jpeg_exif"]
+    # An existing corpus with the same parameters is reused
+    assert generate(str(tmp_path), files=FILES, seed=7, progress=False) == info
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import helpers
+from utils.helpers import DestinationIndex, next_free_path
+
+def test_picks_the_same_names_as_probing(tmp_path):
+    (tmp_path / "IMG.jpg").write_bytes(b"")
+    (tmp_path / "IMG_1.jpg").write_bytes(b"")
+    assert DestinationIndex().reserve(str(tmp_path), "IMG.jpg") == next_free_path(str(tmp_path), "IMG.jpg")
+
+def test_release_rewinds_the_suffix(tmp_path):
+    (tmp_path / "IMG.jpg").write_bytes(b"")
+    index = DestinationIndex()
+    first = index.reserve(str(tmp_path), "IMG.jpg")
+    second = index.reserve(str(tmp_path), "IMG.jpg")
+    assert [os.path.basename(p) for p in (first, second)] == ["IMG_1.jpg", "IMG_2.jpg"]
+
+    index.release(first)  # e.g. the copy failed
+    assert index.reserve(str(tmp_path), "IMG.jpg") == first
+    assert os.path.basename(index.reserve(str(tmp_path), "IMG.jpg")) == "IMG_3.jpg"
+
+def test_case_insensitive_destination(tmp_path, monkeypatch):
+    (tmp_path / "img.jpg").write_bytes(b"")
+    monkeypatch.setattr(helpers, "_case_insensitive", lambda *args, **kwargs: True)
+    index = DestinationIndex()
+    assert os.path.basename(index.reserve(str(tmp_path), "IMG.JPG")) == "IMG_1.JPG"
+    assert os.path.basename(index.reserve(str(tmp_path), "Img_1.jpg")) == "Img_1_1.jpg"
+
+def test_case_sensitivity_is_probed_once_per_device(tmp_path, monkeypatch):
+    calls = []
+    case_insensitive = helpers._case_insensitive
+
+    def counting(folder, names, probe=True):
+        calls.append(folder)
+        return case_insensitive(folder, names, probe)
+
+    monkeypatch.setattr(helpers, "_case_insensitive", counting)
+    index = DestinationIndex()
+    for folder in ("a", "b", "c"):
+        index.reserve(str(tmp_path / folder), "IMG.jpg")
+    assert len(calls) == 1
+    assert not any(name.startswith(".case_probe_") for folder in ("a", "b", "c")
+                   for name in os.listdir(tmp_path / folder))
@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations.duplicate_finder import find_duplicate_groups
+from utils.catalog import MediaCatalog
+from utils.hashing import SAMPLE_SIZE
+
+def write(folder, name, data):
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / name).write_bytes(data)
+    return str(folder / name)
+
+def library(tmp_path):
+    # Small and large duplicates, a unique size, and a large file sharing
+    # size, head and tail with a duplicate but not its middle
+    root = tmp_path / "photos"
+    small, head, tail = os.urandom(1000), os.urandom(SAMPLE_SIZE), os.urandom(SAMPLE_SIZE)
+    large = head + b"a" * SAMPLE_SIZE + tail
+    paths = {
+        "small": [write(root / "a", "IMG_1.jpg", small), write(root / "b", "IMG_1.jpg", small)],
+        "large": [write(root / "a", "MVI_1.mp4", large), write(root / "c", "copy.mp4", large),
+                  write(root / "d", "again.mp4", large)],
+    }
+    write(root / "a", "unique.jpg", os.urandom(2000))
+    write(root / "a", "lookalike.mp4", head + b"b" * SAMPLE_SIZE + tail)
+    return str(root), paths
+
+def test_groups_and_stages(tmp_path):
+    root, paths = library(tmp_path)
+    groups, stats = find_duplicate_groups(root, catalog=MediaCatalog(":memory:"))
+    assert sorted(groups) == sorted(paths.values())
+    assert stats["files_scanned"] == 7
+    # The unique size is never read; only same-sample large files are hashed whole
+    assert stats["size_candidates"] == 6
+    assert stats["sample_hashed"] == 6
+    assert stats["full_hashed"] == 4
+    assert stats["full_bytes_read"] == 4 * 3 * SAMPLE_SIZE
+
+def test_rescan_reuses_catalog_hashes(tmp_path):
+    root, paths = library(tmp_path)
+    catalog = MediaCatalog(str(tmp_path / "media.db"))
+    first, _ = find_duplicate_groups(root, catalog=catalog)
+    catalog.close()
+    with MediaCatalog(str(tmp_path / "media.db")) as catalog:
+        again, stats = find_duplicate_groups(root, catalog=catalog)
+    assert sorted(again) == sorted(first)
+    assert (stats["sample_hashed"], stats["full_hashed"]) == (0, 0)
+    assert stats["cached_hashes"] == 6 + 4
+
+def test_groups_keep_scan_order_with_many_workers(tmp_path):
+    root, paths = library(tmp_path)
+    for workers in (1, 4):
+        groups, _ = find_duplicate_groups(root, catalog=MediaCatalog(":memory:"), workers=workers)
+        assert paths["large"] in groups
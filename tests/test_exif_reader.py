@@ -0,0 +1,77 @@
+import os
+import sys
+import struct
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import exif_reader
+from utils.exif_reader import MISSING, get_exif_date, read_date_original
+
+DATE = b"2021:03:04 05:06:07\x00"
+
+def tiff(byte_order="II", date=DATE):
+    # IFD0 with only the Exif IFD pointer, then the Exif IFD with only
+    # DateTimeOriginal, whose value follows it
+    e = "<" if byte_order == "II" else ">"
+    header = byte_order.encode() + struct.pack(e + "HI", 42, 8)
+    ifd0 = struct.pack(e + "HHHII", 1, 0x8769, 4, 1, 26) + struct.pack(e + "I", 0)
+    exif = struct.pack(e + "HHHII", 1, 0x9003 if date else 0x9004, 2, len(DATE), 44) + struct.pack(e + "I", 0)
+    return header + ifd0 + exif + DATE
+
+def jpeg(payload):
+    app1 = b"Exif\x00\x00" + payload
+    return b"\xff\xd8" + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9) + \
+        b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + b"\xff\xda" + os.urandom(1000)
+
+def png(payload):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + bytes(4)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", bytes(13)) + chunk(b"eXIf", payload) + chunk(b"IDAT", bytes(100))
+
+def webp(payload):
+    body = b"WEBP" + b"VP8X" + struct.pack("<I", 10) + bytes(10) + b"EXIF" + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+def heic(payload):
+    return struct.pack(">I", 24) + b"ftypheic" + bytes(12) + b"meta" + bytes(40) + b"Exif\x00\x00" + payload
+
+CONTAINERS = {"tiff": lambda payload: payload, "jpeg": jpeg, "png": png, "webp": webp, "heic": heic}
+
+@pytest.fixture
+def no_pil(monkeypatch):
+    def fail(path):
+        raise AssertionError("fell back to PIL")
+    monkeypatch.setattr(exif_reader, "_read_date_original_pil", fail)
+
+@pytest.mark.parametrize("byte_order", ["II", "MM"])
+@pytest.mark.parametrize("container", sorted(CONTAINERS))
+def test_date_from_the_header(tmp_path, no_pil, container, byte_order):
+    path = tmp_path / "photo"
+    path.write_bytes(CONTAINERS[container](tiff(byte_order)))
+    assert get_exif_date(str(path)) == datetime.datetime(2021, 3, 4, 5, 6, 7)
+
+@pytest.mark.parametrize("container", ["jpeg", "png"])
+def test_no_date_is_not_retried(tmp_path, no_pil, container):
+    path = tmp_path / "photo"
+    path.write_bytes(CONTAINERS[container](tiff(date=False)))
+    assert read_date_original(str(path)) is MISSING
+    assert get_exif_date(str(path)) is None
+
+def test_unparsed_header_falls_back(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(exif_reader, "_read_date_original_pil", lambda path: calls.append(path) or "2020:01:02 03:04:05")
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(jpeg(tiff())[:40])  # cut inside the Exif segment
+    assert read_date_original(str(path)) is None
+    assert get_exif_date(str(path)) == datetime.datetime(2020, 1, 2, 3, 4, 5)
+    assert calls == [str(path)]
+
+def test_matches_pil(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    path = str(tmp_path / "photo.jpg")
+    exif = Image.Exif()
+    exif.get_ifd(0x8769)[0x9003] = "2019:12:31 23:59:58"
+    Image.new("RGB", (64, 48)).save(path, exif=exif)
+    assert read_date_original(path) == exif_reader._read_date_original_pil(path) == "2019:12:31 23:59:58"
@@ -0,0 +1,58 @@
+import os
+import sys
+import errno
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import transfer
+from utils.hashing import hash_file, hash_sample
+from utils.transfer import Checksum, hash_copy, transfer_file
+
+def write(path, size):
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+def test_hashes_match_a_separate_pass(tmp_path):
+    src = write(tmp_path / "src.bin", 3 * 1024 * 1024 + 17)
+    checksum = Checksum(verify=True)
+    hash_copy(src, str(tmp_path / "dest.bin"), checksum)
+    assert checksum.content_hash == hash_file(src)
+    assert checksum.sample_hash == hash_sample(src)
+
+def test_source_changing_size_removes_the_copy(tmp_path):
+    src = write(tmp_path / "src.bin", 1024 * 1024)
+    st = os.stat(src)
+    with open(src, "ab") as f:
+        f.write(b"grown since the stat")
+    checksum = Checksum()
+    with pytest.raises(OSError):
+        hash_copy(src, str(tmp_path / "dest.bin"), checksum, st)
+    assert not os.path.exists(tmp_path / "dest.bin")
+    assert checksum.content_hash is None
+
+def test_failed_write_removes_the_partial_copy(tmp_path, monkeypatch):
+    src = write(tmp_path / "src.bin", 3 * 1024 * 1024)
+    writes = []
+
+    def full_disk(f, view):
+        writes.append(len(view))
+        if len(writes) == 2:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        f.write(view)
+
+    monkeypatch.setattr(transfer, "_write_all", full_disk)
+    with pytest.raises(OSError):
+        hash_copy(src, str(tmp_path / "dest.bin"), Checksum(), buffer_size=1024 * 1024)
+    assert not os.path.exists(tmp_path / "dest.bin")
+
+def test_cross_device_move_keeps_the_source_on_failure(tmp_path, monkeypatch):
+    src = write(tmp_path / "src.bin", 1024 * 1024)
+    st = os.stat(src)
+    with open(src, "ab") as f:
+        f.write(b"grown since the stat")
+    monkeypatch.setattr(transfer, "same_device", lambda *args: False)
+    with pytest.raises(OSError):
+        transfer_file(src, str(tmp_path / "dest.bin"), "move", st, Checksum())
+    assert os.path.exists(src)
+    assert not os.path.exists(tmp_path / "dest.bin")
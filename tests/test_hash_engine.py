@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import hash_engine
+from utils.hash_engine import DROP_CACHE_MIN_SIZE, HashEngine
+from utils.hashing import HASH_METHODS, hash_file
+
+def make_files(folder, sizes):
+    folder.mkdir()
+    items = []
+    for i, size in enumerate(sizes):
+        path = folder / f"IMG_{i:03d}.jpg"
+        path.write_bytes(os.urandom(size))
+        items.append((str(path), size, i))
+    return items
+
+@pytest.mark.parametrize("method", HASH_METHODS)
+@pytest.mark.parametrize("workers", [1, 4])
+def test_digests_match_hash_file(tmp_path, workers, method):
+    items = make_files(tmp_path / "src", [0, 1, 4096, 300 * 1024, 3 * 1024 * 1024 + 5] * 3)
+    missing = (str(tmp_path / "src" / "missing.jpg"), 100, len(items))
+    engine = HashEngine(workers, algorithm="md5", method=method)
+    results = dict(engine.hash_files(items + [missing]))
+    assert results.pop(missing) is None
+    assert results == {item: hash_file(item[0], "md5") for item in items}
+    assert engine.stats == {"files": len(items) + 1, "bytes": sum(item[1] for item in items) + 100, "errors": 1}
+
+class InFlight:
+    # Stands in for HashEngine._hash, recording the peak files and bytes being hashed at once
+    def __init__(self, monkeypatch):
+        self.lock = threading.Lock()
+        self.files = self.bytes = self.peak_files = self.peak_bytes = 0
+        self.drop_cache = {}
+
+        def hash_file(path, algorithm, method, drop_cache):
+            size = os.path.getsize(path)
+            with self.lock:
+                self.files += 1
+                self.bytes += size
+                self.peak_files = max(self.peak_files, self.files)
+                self.peak_bytes = max(self.peak_bytes, self.bytes)
+            time.sleep(0.01)
+            with self.lock:
+                self.files -= 1
+                self.bytes -= size
+                self.drop_cache[path] = drop_cache
+            return "digest"
+
+        monkeypatch.setattr(hash_engine, "hash_file", hash_file)
+
+def test_admission_limits(tmp_path, monkeypatch):
+    in_flight = InFlight(monkeypatch)
+    items = make_files(tmp_path / "small", [1024] * 40)
+    assert len(list(HashEngine(workers=3).hash_files(items))) == 40
+    assert in_flight.peak_files == 3
+
+    in_flight = InFlight(monkeypatch)
+    items = make_files(tmp_path / "large", [100 * 1024] * 10 + [400 * 1024])
+    assert len(list(HashEngine(workers=8, max_bytes=250 * 1024).hash_files(items))) == 11
+    assert in_flight.peak_bytes <= 400 * 1024
+    assert in_flight.peak_files == 2
+
+def test_large_files_skip_the_page_cache(tmp_path, monkeypatch):
+    in_flight = InFlight(monkeypatch)
+    items = [(path, size) for path, size, _ in make_files(tmp_path / "src", [10, 20])]
+    # Sizes as the scan reported them decide, not what is read
+    list(HashEngine(workers=2).hash_files([(items[0][0], DROP_CACHE_MIN_SIZE), items[1]]))
+    assert in_flight.drop_cache == {items[0][0]: True, items[1][0]: False}
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        HashEngine(method="sendfile")
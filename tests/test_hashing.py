@@ -0,0 +1,63 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import hashing
+from utils.hashing import HASH_METHODS, SAMPLE_SIZE, StreamHasher, hash_file, hash_sample
+
+class ShortReads(io.RawIOBase):
+    # A raw file that returns at most 1000 bytes per read, like some network shares
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=0):
+        return self.data.seek(offset, whence)
+
+    def readinto(self, view):
+        chunk = self.data.read(min(len(view), 1000))
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+def test_sample_survives_short_reads(tmp_path, monkeypatch):
+    for size in (5000, 2 * SAMPLE_SIZE, 3 * SAMPLE_SIZE + 7):
+        path = tmp_path / f"{size}.bin"
+        path.write_bytes(os.urandom(size))
+        expected = hash_sample(str(path))
+        monkeypatch.setattr(hashing, "open", lambda p, *args, **kwargs: ShortReads(path.read_bytes()), raising=False)
+        assert hash_sample(str(path), size) == expected
+        monkeypatch.undo()
+
+SIZES = (0, 1, SAMPLE_SIZE, 2 * SAMPLE_SIZE - 1, 2 * SAMPLE_SIZE, 2 * SAMPLE_SIZE + 1, 3 * SAMPLE_SIZE + 7,
+         5 * SAMPLE_SIZE)
+CHUNKS = (1000, 4096, SAMPLE_SIZE, SAMPLE_SIZE + 1, 10 * SAMPLE_SIZE)
+
+@pytest.mark.parametrize("algorithm", [None, "md5"])
+@pytest.mark.parametrize("size", SIZES)
+def test_stream_hasher_matches_file_hashes(tmp_path, size, algorithm):
+    data = os.urandom(size)
+    path = tmp_path / "file.bin"
+    path.write_bytes(data)
+    expected = {hash_file(str(path), algorithm, buffer_size=4096, method=method) for method in HASH_METHODS}
+    assert len(expected) == 1
+    expected = (expected.pop(), hash_sample(str(path), algorithm=algorithm))
+    for chunk in CHUNKS:
+        stream = StreamHasher(size, algorithm)
+        for start in range(0, size, chunk):
+            stream.update(memoryview(data)[start:start + chunk])
+        assert stream.hexdigests() == expected, chunk
+
+def test_stream_hasher_rejects_a_size_change():
+    data = os.urandom(3 * SAMPLE_SIZE)
+    for fed in (data[:-1], data + b"x"):
+        stream = StreamHasher(len(data))
+        stream.update(fed)
+        assert stream.hexdigests() == (None, None)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations.sort_by_size import sort_by_size
+from utils.catalog import MediaCatalog
+from utils.journal import JobJournal, default_journal_path
+
+# Resuming a job must never give a file the name a journal entry recorded
+# for another file with the same basename.
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+def read_folder(folder):
+    contents = {}
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name)) as f:
+            contents[name] = f.read()
+    return contents
+
+def resume(tmp_path, planned, partial):
+    src, dest = str(tmp_path / "src"), str(tmp_path / "dest")
+    write(os.path.join(src, "a", "IMG.jpg"), "AAAA")
+    write(os.path.join(src, "b", "IMG.jpg"), "BBBBBB")
+    planned_dest = os.path.join(dest, "Below_100MB", "IMG.jpg")
+    if partial:
+        write(planned_dest, "par")
+    planned_src = os.path.join(src, planned, "IMG.jpg")
+    with JobJournal(default_journal_path(dest)) as journal:
+        journal.plan(planned_src, planned_dest, os.stat(planned_src))
+
+    sort_by_size(src, dest, catalog=MediaCatalog(":memory:"), resume=True, transfer_mode="move")
+    return read_folder(os.path.join(dest, "Below_100MB"))
+
+def test_resumed_planned_name_is_not_reused(tmp_path):
+    files = resume(tmp_path, planned="a", partial=True)
+    assert files == {"IMG.jpg": "AAAA", "IMG_1.jpg": "BBBBBB"}
+
+def test_resumed_planned_name_taken_earlier_in_the_run(tmp_path):
+    # b is planned as IMG.jpg but its partial never reached the disk, and a
+    # is scanned first and gets IMG.jpg
+    files = resume(tmp_path, planned="b", partial=False)
+    assert sorted(files.values()) == ["AAAA", "BBBBBB"]
+
+def test_done_entry_keeps_its_name(tmp_path):
+    src, dest = str(tmp_path / "src"), str(tmp_path / "dest")
+    write(os.path.join(src, "a", "IMG.jpg"), "AAAA")
+    sort_by_size(src, dest, catalog=MediaCatalog(":memory:"))
+    write(os.path.join(src, "b", "IMG.jpg"), "BBBBBB")
+
+    sort_by_size(src, dest, catalog=MediaCatalog(":memory:"), resume=True)
+    files = read_folder(os.path.join(dest, "Below_100MB"))
+    assert files == {"IMG.jpg": "AAAA", "IMG_1.jpg": "BBBBBB"}
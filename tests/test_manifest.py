@@ -0,0 +1,76 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations import sort_by_date
+from operations.apply_manifest import apply_manifest
+from operations.sort_by_date import organize_by_date
+from utils.catalog import MediaCatalog
+from utils.manifest import ManifestWriter, read_manifest, sort_rows
+
+def drop_folder(tmp_path):
+    # Three photos taken on May 9th (two named IMG_0.jpg) and one on the 3rd
+    drop = tmp_path / "drop"
+    for name, day in (("IMG_0.jpg", 9), ("IMG_1.jpg", 3), ("IMG_2.jpg", 9), ("IMG_0_copy/IMG_0.jpg", 9)):
+        path = drop / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(100 + len(name)))
+        stamp = datetime.datetime(2022, 5, day, 12).timestamp()
+        os.utime(path, (stamp, stamp))
+    return drop
+
+@pytest.mark.parametrize("name", ["plan.csv", "plan.csv.gz"])
+def test_plan_then_apply(tmp_path, monkeypatch, name):
+    drop, dest = drop_folder(tmp_path), tmp_path / "dest"
+    catalog = MediaCatalog(str(tmp_path / "media.db"))
+    catalog.update(str(drop / "IMG_2.jpg"), os.stat(drop / "IMG_2.jpg"), date_taken=datetime.datetime(2021, 1, 1))
+    catalog.flush()
+
+    def no_reads(*args):
+        raise AssertionError("plan-only run read a file")
+    monkeypatch.setattr(sort_by_date, "extract_metadata", no_reads)
+    manifest = str(tmp_path / name)
+    stats = organize_by_date(str(drop), str(dest), catalog=catalog, plan_only=True, manifest_path=manifest)
+    assert stats["processed"] == 4
+    assert not dest.exists()
+
+    rows = {os.path.relpath(row["source"], drop): row for row in read_manifest(manifest)}
+    day = os.path.join(str(dest), "2022", "05-May", "09-Monday")
+    assert rows["IMG_0.jpg"]["destination"] == os.path.join(day, "IMG_0.jpg")
+    # The name clash is resolved at plan time
+    assert rows[os.path.join("IMG_0_copy", "IMG_0.jpg")]["destination"] == os.path.join(day, "IMG_0_1.jpg")
+    assert rows["IMG_2.jpg"]["destination"].startswith(os.path.join(str(dest), "2021", "01-January"))
+    assert rows["IMG_2.jpg"]["reason"] == "date_taken 2021-01-01"
+    assert rows["IMG_1.jpg"]["reason"] == "mtime (not in catalog)"
+    assert rows["IMG_1.jpg"]["size"] == 109
+    assert rows["IMG_1.jpg"]["destination"] == os.path.join(str(dest), "2022", "05-May", "03-Tuesday", "IMG_1.jpg")
+
+    stats = apply_manifest(manifest)
+    assert (stats["processed"], stats["failed"]) == (4, 0)
+    for row in rows.values():
+        with open(row["source"], "rb") as src, open(row["destination"], "rb") as copy:
+            assert src.read() == copy.read()
+
+    # Applying it again never overwrites what is now there
+    stats = apply_manifest(manifest)
+    assert (stats["processed"], stats["failed"]) == (0, 4)
+
+def test_sort_rows():
+    rows = [
+        {"source": "c", "destination": "/b/c", "device": 1, "inode": 5},
+        {"source": "a", "destination": "/a/a", "device": 2, "inode": 1},
+        {"source": "b", "destination": "/b/b", "device": 1, "inode": 9},
+        {"source": "d", "destination": "/a/d", "device": 1, "inode": 7},
+    ]
+    assert [row["source"] for row in sort_rows(rows, "none")] == ["c", "a", "b", "d"]
+    assert [row["source"] for row in sort_rows(rows, "source")] == ["c", "d", "b", "a"]
+    assert [row["source"] for row in sort_rows(rows, "destination")] == ["d", "a", "c", "b"]
+
+def test_parquet_needs_pyarrow(tmp_path, monkeypatch):
+    from utils import manifest
+    monkeypatch.setattr(manifest, "pq", None)
+    with pytest.raises(ValueError):
+        ManifestWriter(str(tmp_path / "plan.parquet"))
@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import SLOWEST_FILES, Histogram, instrumented, metrics
+
+def test_histogram_percentiles_stay_in_range():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+    assert histogram.count == 100
+    assert 0.001 <= histogram.percentile(0.01) <= histogram.percentile(0.5) <= histogram.percentile(0.99) <= 0.1
+    assert abs(histogram.percentile(0.5) - 0.05) < 0.01
+    single = Histogram()
+    single.observe(0.2)
+    assert single.percentile(0.5) == single.percentile(0.99) == 0.2
+
+def test_outermost_operation_owns_the_report(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "report_dir", str(tmp_path / "metrics"))
+    monkeypatch.setattr(metrics, "profile_path", None)
+
+    @instrumented("inner")
+    def inner(i):
+        metrics.observe("plan", i / 1000, f"/photos/IMG_{i}.jpg", size=i)
+
+    @instrumented("outer")
+    def outer():
+        for i in range(1, 21):
+            inner(i)
+        metrics.observe("transfer", 0.5, "/photos/clip.mp4", size=1000)
+
+    outer()
+    out = capsys.readouterr().out
+    assert out.count("timings") == 1 and "outer timings" in out
+    assert "slowest plan: /photos/IMG_20.jpg" in out
+
+    with open(tmp_path / "metrics" / "metrics.json") as f:
+        report = json.load(f)
+    assert report["operation"] == "outer"
+    assert report["stages"]["plan"]["image"]["count"] == 20
+    assert report["stages"]["transfer"]["video"]["count"] == 1
+    assert len(report["slowest_files"]["plan"]) == SLOWEST_FILES
+    assert report["slowest_files"]["plan"][0] == {"path": "/photos/IMG_20.jpg", "seconds": 0.02}
+    counters = {(c["name"], c["labels"].get("stage")): c["value"] for c in report["counters"]}
+    assert counters[("bytes", "plan")] == sum(range(1, 21))
+
+    prom = (tmp_path / "metrics" / "metrics.prom").read_text()
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in prom.splitlines()
+               if line.startswith('media_organizer_stage_seconds_bucket{stage="plan"')]
+    assert buckets == sorted(buckets) and buckets[-1] == 20
+    assert 'media_organizer_files_total{kind="image",stage="plan"} 20' in prom
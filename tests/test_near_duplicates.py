@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations.near_duplicates import find_near_duplicate_groups
+from utils.catalog import MediaCatalog
+
+Image = pytest.importorskip("PIL.Image")
+
+def write_image(path, size):
+    # A horizontal gradient with a bright square, so dHash has bits to set
+    image = Image.new("L", size)
+    width, height = size
+    image.putdata([(x * 255 // width) ^ (255 if height // 4 < y < height // 2 and x < width // 3 else 0)
+                   for y in range(height) for x in range(width)])
+    image.save(path, "JPEG")
+
+def test_corrupt_image_does_not_stop_the_scan(tmp_path):
+    write_image(tmp_path / "a.jpg", (64, 48))
+    write_image(tmp_path / "b.jpg", (128, 96))
+    (tmp_path / "bad.jpg").write_bytes(b"not an image")
+
+    groups = find_near_duplicate_groups(str(tmp_path), catalog=MediaCatalog(":memory:"))
+    assert groups == [[str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")]]
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.parallel import map_ahead
+
+def check(item):
+    if item == 3:
+        raise ValueError("bad item")
+    return item * 2
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_errors_are_yielded_as_results(workers):
+    results = list(map_ahead(check, range(6), workers, batch_size=2))
+    assert [item for item, _ in results] == list(range(6))
+    assert isinstance(results[3][1], ValueError)
+    assert [value for item, value in results if item != 3] == [0, 2, 4, 8, 10]
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.pipeline import Pipeline, Stage
+
+def jitter(func):
+    # Finish items out of order
+    def run(item):
+        time.sleep(random.random() / 500)
+        return func(item)
+    return run
+
+def test_ordered_stage_keeps_source_order_through_drops():
+    out = []
+    stages = [
+        Stage("odd", jitter(lambda n: n if n % 3 else None), workers=4, queue_size=8, ordered=True),
+        Stage("square", jitter(lambda n: n * n), workers=4, queue_size=8, ordered=True),
+    ]
+    pipeline = Pipeline(range(200), stages, queue_size=8)
+    assert pipeline.run(out.append) == 133
+    assert out == [n * n for n in range(200) if n % 3]
+    rows = {row["stage"]: row for row in pipeline.stats()}
+    assert rows["scan"]["items_out"] == 200
+    assert (rows["odd"]["items_in"], rows["odd"]["dropped"], rows["odd"]["items_out"]) == (200, 67, 133)
+    assert rows["square"]["items_in"] == 133
+
+def test_errors_reach_on_error_and_drop_the_item():
+    failed = []
+
+    def check(n):
+        if n in (3, 7):
+            raise ValueError(n)
+        return n
+
+    stage = Stage("check", check, workers=2, on_error=lambda item, error: failed.append((item, str(error))))
+    out = []
+    Pipeline(range(10), [stage]).run(out.append)
+    assert sorted(out) == [0, 1, 2, 4, 5, 6, 8, 9]
+    assert sorted(failed) == [(3, "3"), (7, "7")]
+    assert (stage.stats.errors, stage.stats.dropped) == (2, 2)
+
+def test_source_errors_are_raised_after_the_items_before_them():
+    def source():
+        yield from range(5)
+        raise OSError("folder vanished")
+
+    out = []
+    with pytest.raises(OSError):
+        Pipeline(source(), [Stage("pass", lambda n: n)]).run(out.append)
+    assert out == list(range(5))
@@ -0,0 +1,76 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.catalog import MediaCatalog
+from utils.query import ORDER_KEYS, CatalogQuery, open_catalog
+
+def fill(db_path):
+    # 20 files, every third with no date and every fourth with no size;
+    # dates and sizes repeat so pages split runs of equal keys
+    MediaCatalog(db_path).close()
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO media (filename, filepath, media_type, date_taken, size) VALUES (?, ?, ?, ?, ?)", [
+        (f"f{i:02d}.jpg", f"/photos/f{i:02d}.jpg", "video" if i % 2 else "image",
+         None if i % 3 == 0 else f"2021-0{1 + i % 4}-01T00:00:00", None if i % 4 == 0 else 100 * (i % 5))
+        for i in range(20)
+    ])
+    conn.commit()
+    conn.close()
+
+@pytest.fixture
+def conn(tmp_path):
+    db_path = str(tmp_path / "media.db")
+    fill(db_path)
+    conn = open_catalog(db_path)
+    yield conn
+    conn.close()
+
+def expected(conn, order, media_type=None):
+    # Rows with no key first in id order, then by (key, id)
+    key = ORDER_KEYS[order]
+    where = "WHERE media_type = ?" if media_type else ""
+    sql = f"SELECT filepath FROM media {where} ORDER BY {key} IS NOT NULL, {key}, id"
+    return [row[0] for row in conn.execute(sql, [media_type] if media_type else [])]
+
+@pytest.mark.parametrize("media_type", [None, "video"])
+@pytest.mark.parametrize("order", sorted(ORDER_KEYS))
+@pytest.mark.parametrize("page_size", [1, 3, 7, 100])
+def test_pages_cover_every_row_once(conn, order, media_type, page_size):
+    query = CatalogQuery(conn, media_type=media_type, order=order)
+    pages = list(query.pages(page_size))
+    assert [row["filepath"] for page in pages for row in page.rows] == expected(conn, order, media_type)
+    assert all(len(page.rows) <= page_size for page in pages)
+    assert all(page.cursor is not None for page in pages[:-1])
+    assert query.count() == len(expected(conn, order, media_type))
+
+@pytest.mark.parametrize("order", ["date", "size"])
+def test_resume_from_each_cursor(conn, order):
+    # A cursor handed out by one query resumes a fresh one where it stopped,
+    # including the switch from the rows with no key to the keyed ones
+    rows = expected(conn, order)
+    seen = 0
+    for page in CatalogQuery(conn, order=order).pages(4):
+        seen += len(page.rows)
+        if page.cursor is None:
+            break
+        resumed = CatalogQuery(conn, order=order).pages(4, after=page.cursor)
+        assert [row["filepath"] for page in resumed for row in page.rows] == rows[seen:]
+    assert seen == len(rows)
+
+def test_ranges_on_the_key_leave_out_rows_with_no_key(conn):
+    paths = [row["filepath"] for row in CatalogQuery(conn, date_from="2021-02", order="date")]
+    assert paths == [path for path in expected(conn, "date")
+                     if conn.execute("SELECT date_taken >= '2021-02' FROM media WHERE filepath = ?",
+                                     (path,)).fetchone()[0]]
+
+@pytest.mark.parametrize("media_type", [None, "video"])
+@pytest.mark.parametrize("order", sorted(ORDER_KEYS))
+def test_pages_use_an_index_for_the_order(conn, order, media_type):
+    # Each page must be an index range scan, not a sort of every matching row
+    plan = CatalogQuery(conn, media_type=media_type, order=order).explain()
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("USING INDEX" in step for step in plan), plan
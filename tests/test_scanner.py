@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.scanner import scan, source_roots
+
+def tree(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * len(name))
+    return str(root)
+
+def relative(root, entries):
+    return [os.path.relpath(entry.path, root) for entry in entries]
+
+def test_order_and_stat_reuse(tmp_path):
+    root = tree(tmp_path / "src", ["b/IMG_2.JPG", "a/z/clip.mp4", "a/IMG_1.jpg", "notes.txt", "IMG_0.png"])
+    entries = list(scan(root))
+    # Sorted by name, a folder's files before its subfolders
+    assert relative(root, entries) == ["IMG_0.png", "notes.txt", "a/IMG_1.jpg", "a/z/clip.mp4", "b/IMG_2.JPG"]
+    assert [entry.kind for entry in entries] == ["image", "document", "image", "video", "image"]
+    for entry in entries:
+        assert entry.size == os.stat(entry.path).st_size
+        assert entry.inode == os.stat(entry.path).st_ino
+
+def test_filters(tmp_path):
+    root = tree(tmp_path / "src", ["IMG_1.JPG", "IMG_2.jpg", "skip.jpg", ".cache/IMG_3.jpg", "out/IMG_4.jpg",
+                                   "clip.mp4", "notes.txt"])
+    assert relative(root, scan(root, include=["*.jpg"], exclude=[".*", "SKIP*"],
+                               skip_dirs=[os.path.join(root, "out")])) == ["IMG_1.JPG", "IMG_2.jpg"]
+    assert relative(root, scan(root, kinds=("video", "document"), exclude=[".*"])) == ["clip.mp4", "notes.txt"]
+
+def test_symlinks(tmp_path):
+    root = tree(tmp_path / "src", ["a/IMG_1.jpg"])
+    outside = tree(tmp_path / "outside", ["IMG_2.jpg"])
+    os.symlink(root, os.path.join(root, "a", "loop"))
+    os.symlink(outside, os.path.join(root, "elsewhere"))
+    os.symlink(os.path.join(outside, "IMG_2.jpg"), os.path.join(root, "link.jpg"))
+    os.symlink(os.path.join(outside, "missing.jpg"), os.path.join(root, "broken.jpg"))
+    entries = list(scan(root))
+    # Folder links are not followed; a file link is listed with its target's stat
+    assert relative(root, entries) == ["link.jpg", "a/IMG_1.jpg"]
+    assert entries[0].size == len("IMG_2.jpg")
+
+def test_several_roots(tmp_path):
+    first = tree(tmp_path / "first", ["IMG_1.jpg", "inner/IMG_2.jpg"])
+    second = tree(tmp_path / "second", ["IMG_3.jpg"])
+    os.symlink(second, str(tmp_path / "alias"))
+    roots = [second, os.path.join(first, "inner"), first, str(tmp_path / "alias")]
+    assert source_roots(roots) == [first, second]
+    assert [entry.name for entry in scan(roots)] == ["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"]
@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Light entry points must not load heavy dependencies at import time, and must
+# import within a budget. benchmarks/bench_startup.py measures the same thing
+# more precisely; the budget here is twice its default to allow for noisy CI.
+
+HEAVY_MODULES = ("cv2", "PIL", "numpy", "tqdm")
+IMPORT_BUDGET_MS = 300
+RUNS = 3
+
+def import_ms(module):
+    # Cumulative `-X importtime` figure for module, in a fresh interpreter
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"no import time reported for {module}")
+
+def loaded_heavy(code):
+    # Heavy modules in sys.modules after running code in a fresh interpreter
+    script = f"{code}\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("module", ["cli", "operations.sort_by_size"])
+def test_import_is_light(module):
+    assert loaded_heavy(f"import {module}") == []
+    ms = min(import_ms(module) for _ in range(RUNS))
+    assert ms < IMPORT_BUDGET_MS, f"import {module} took {ms:.0f} ms"
+
+def test_sort_by_size_run_is_light(tmp_path):
+    source = tmp_path / "drop"
+    source.mkdir()
+    for i in range(5):
+        (source / f"IMG_{i:04d}.jpg").write_bytes(os.urandom(1024))
+    argv = ["by-size", str(source), "-d", str(tmp_path / "out"), "--catalog", str(tmp_path / "catalog.db")]
+    code = f"import cli\nstatus = cli.main({argv!r})\nassert not status, status"
+    assert loaded_heavy(code) == []
+    assert len(os.listdir(tmp_path / "out" / "Below_100MB")) == 5
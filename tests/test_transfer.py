@@ -0,0 +1,65 @@
+import os
+import sys
+import errno
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import transfer
+from utils.transfer import copy_file, transfer_file
+
+def write(path, size):
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+def test_copy(tmp_path):
+    src = write(tmp_path / "src.bin", 5 * 1024 * 1024 + 3)
+    copy_file(src, str(tmp_path / "dest.bin"))
+    assert (tmp_path / "dest.bin").read_bytes() == (tmp_path / "src.bin").read_bytes()
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="no copy_file_range")
+def test_copy_range_copying_nothing_falls_back(tmp_path, monkeypatch):
+    # procfs/sysfs and some FUSE, CIFS and overlay kernels return 0 at once
+    src = write(tmp_path / "src.bin", 4096)
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0)
+    copy_file(src, str(tmp_path / "dest.bin"))
+    assert (tmp_path / "dest.bin").read_bytes() == (tmp_path / "src.bin").read_bytes()
+
+def test_modes(tmp_path):
+    data = os.urandom(4096)
+    (tmp_path / "out").mkdir()
+    for mode in ("copy", "move", "hardlink", "symlink"):
+        src = tmp_path / f"{mode}.bin"
+        src.write_bytes(data)
+        before = os.stat(src)
+        dest = tmp_path / "out" / f"{mode}.bin"
+        assert transfer_file(str(src), str(dest), mode) == mode
+        assert dest.read_bytes() == data
+        assert src.exists() == (mode != "move")
+        if mode in ("move", "hardlink"):
+            assert os.stat(dest).st_ino == before.st_ino
+        assert os.path.islink(dest) == (mode == "symlink")
+        assert os.stat(dest).st_mtime_ns == before.st_mtime_ns
+
+def test_reflink_falls_back(tmp_path, monkeypatch):
+    def unsupported(src, dest):
+        raise OSError(errno.EOPNOTSUPP, "no reflink here")
+    monkeypatch.setattr(transfer, "reflink", unsupported)
+    src = write(tmp_path / "src.bin", 4096)
+    # Asked for explicitly: a real copy. Chosen by auto: a hard link, which is free on the same volume
+    assert transfer_file(src, str(tmp_path / "copy.bin"), "reflink") == "copy"
+    assert os.stat(tmp_path / "copy.bin").st_ino != os.stat(src).st_ino
+    assert transfer_file(src, str(tmp_path / "auto.bin"), "auto") == "hardlink"
+    assert os.stat(tmp_path / "auto.bin").st_ino == os.stat(src).st_ino
+
+def test_hardlink_across_devices_copies(tmp_path, monkeypatch):
+    def cross_device(src, dest):
+        raise OSError(errno.EXDEV, "cross-device link")
+    monkeypatch.setattr(os, "link", cross_device)
+    src = write(tmp_path / "src.bin", 4096)
+    assert transfer_file(src, str(tmp_path / "dest.bin"), "hardlink") == "copy"
+    assert (tmp_path / "dest.bin").read_bytes() == (tmp_path / "src.bin").read_bytes()
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        transfer_file(write(tmp_path / "src.bin", 1), str(tmp_path / "dest.bin"), "teleport")
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations import video_duplicates
+from operations.video_duplicates import compute_video_fingerprints, find_video_duplicate_groups
+from utils.catalog import MediaCatalog
+from utils.scanner import scan
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+def write_video(path, size, seed=0, frames=40, static=False):
+    # Coarse random textures, so every sampled frame has a distinct dHash
+    # (or, with static, one texture held for the whole video)
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, size)
+    texture = rng.integers(0, 256, (8, 9), dtype=np.uint8)
+    for _ in range(frames):
+        if not static:
+            texture = rng.integers(0, 256, (8, 9), dtype=np.uint8)
+        frame = cv2.resize(texture, size, interpolation=cv2.INTER_NEAREST)
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+def test_undecodable_video_does_not_stop_the_scan(tmp_path):
+    write_video(tmp_path / "a.avi", (72, 64))
+    write_video(tmp_path / "b.avi", (144, 128))
+    (tmp_path / "bad.mp4").write_bytes(b"not a video")
+
+    groups = find_video_duplicate_groups(str(tmp_path), catalog=MediaCatalog(":memory:"))
+    assert groups == [[str(tmp_path / "a.avi"), str(tmp_path / "b.avi")]]
+
+def test_decoder_error_does_not_stop_the_scan(tmp_path, monkeypatch):
+    # e.g. cv2 missing, or a decoder that raises instead of failing to open
+    write_video(tmp_path / "a.avi", (72, 64))
+    write_video(tmp_path / "b.avi", (144, 128))
+    (tmp_path / "bad.mp4").write_bytes(b"not a video")
+    fingerprint = video_duplicates.video_fingerprint
+
+    def fragile(path, samples):
+        if path.endswith("bad.mp4"):
+            raise RuntimeError("decoder crashed")
+        return fingerprint(path, samples)
+
+    monkeypatch.setattr(video_duplicates, "video_fingerprint", fragile)
+    groups = find_video_duplicate_groups(str(tmp_path), catalog=MediaCatalog(":memory:"))
+    assert groups == [[str(tmp_path / "a.avi"), str(tmp_path / "b.avi")]]
+
+def test_only_decode_failures_are_retried(tmp_path, monkeypatch):
+    write_video(tmp_path / "slideshow.avi", (72, 64), static=True)
+    (tmp_path / "bad.mp4").write_bytes(b"not a video")
+    catalog = MediaCatalog(":memory:")
+    compute_video_fingerprints(scan(str(tmp_path)), catalog=catalog)
+
+    opened = []
+    fingerprint = video_duplicates.video_fingerprint
+
+    def counting(path, samples):
+        opened.append(os.path.basename(path))
+        return fingerprint(path, samples)
+
+    monkeypatch.setattr(video_duplicates, "video_fingerprint", counting)
+    paths, _ = compute_video_fingerprints(scan(str(tmp_path)), catalog=catalog)
+    assert paths == [str(tmp_path / "slideshow.avi")]
+    assert opened == ["bad.mp4"]
@@ -0,0 +1,74 @@
+import os
+import sys
+import struct
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import video_metadata
+from utils.helpers import get_video_date
+from utils.video_metadata import MP4_EPOCH_OFFSET, get_video_metadata
+
+# Synthetic MP4 headers: ftyp, then moov holding mvhd and a trak/tkhd.
+
+CREATED = datetime.datetime(2021, 3, 14, 15, 9, 26)
+
+def box(kind, payload):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+def mvhd(created, version=0, duration=90, timescale=1000):
+    if version == 1:
+        fields = struct.pack(">B3xQQIQ", 1, created, created, timescale, duration * timescale)
+    else:
+        fields = struct.pack(">B3xIIII", 0, created, created, timescale, duration * timescale)
+    return box(b"mvhd", fields + bytes(80))
+
+def tkhd(width, height):
+    fields = struct.pack(">B3xIIIIII8x", 0, 0, 0, 1, 0, 0, 0) + bytes(4 + 36)
+    return box(b"tkhd", fields + struct.pack(">II", width << 16, height << 16))
+
+def write_mp4(path, header):
+    ftyp = box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomiso2mp41")
+    path.write_bytes(ftyp + box(b"moov", header + box(b"trak", tkhd(1920, 1080))) + box(b"mdat", bytes(64)))
+    return str(path)
+
+def mp4_seconds(date):
+    return int(date.timestamp()) + MP4_EPOCH_OFFSET
+
+@pytest.fixture
+def probes(monkeypatch):
+    # Records ffprobe fallbacks instead of running ffprobe
+    calls = []
+
+    def probe(file_path, timeout=None):
+        calls.append(file_path)
+        return {"date_taken": None, "duration": None, "resolution": None}
+
+    monkeypatch.setattr(video_metadata, "probe_ffprobe", probe)
+    return calls
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_mvhd(tmp_path, probes, version):
+    path = write_mp4(tmp_path / "clip.mp4", mvhd(mp4_seconds(CREATED), version))
+    meta = get_video_metadata(path)
+    assert meta == {"date_taken": CREATED, "duration": 90, "resolution": "1920x1080"}
+    assert probes == []
+
+def test_zero_creation_time_is_no_date(tmp_path, probes):
+    path = write_mp4(tmp_path / "clip.mp4", mvhd(0))
+    meta = get_video_metadata(path)
+    assert meta["date_taken"] is None and meta["duration"] == 90
+    assert probes == []
+
+@pytest.mark.parametrize("header", [
+    box(b"mvhd", b""),                      # empty
+    box(b"mvhd", b"\x00\x00\x00\x00\x01"),  # truncated
+    mvhd(2 ** 40 + MP4_EPOCH_OFFSET, version=1),  # year out of range
+])
+def test_corrupt_mvhd_falls_back_to_ffprobe(tmp_path, probes, header):
+    path = write_mp4(tmp_path / "clip.mp4", header)
+    assert get_video_metadata(path)["date_taken"] is None
+    assert probes == [path]
+    # Callers fall back to the file's mtime instead of failing
+    assert get_video_date(path) == datetime.datetime.fromtimestamp(os.path.getmtime(path))
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from operations.watch_folder import watch_folder
+from utils.catalog import MediaCatalog
+
+# Watch sessions run in a thread on a polling watcher and stop once the
+# expected files reached the destination.
+
+def watch_until(tmp_path, expected, **options):
+    dest = tmp_path / "dest" / "Below_100MB"
+    stop = threading.Event()
+    result = {}
+
+    def run():
+        result["totals"] = watch_folder(str(tmp_path / "drop"), str(tmp_path / "dest"), organizer="by-size",
+                                        settle=0.05, poll_interval=0.05, catalog=MediaCatalog(":memory:"),
+                                        stop=stop, **options)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and not (dest.exists() and len(os.listdir(dest)) >= expected):
+        time.sleep(0.05)
+    time.sleep(0.3)  # a few more polls, to see whether anything is routed again
+    stop.set()
+    thread.join()
+    return result["totals"]
+
+def test_batches_are_quiet_and_organized_files_are_not_redone(tmp_path, capsys):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    for i in range(3):
+        (drop / f"IMG_{i}.jpg").write_bytes(os.urandom(1024))
+
+    totals = watch_until(tmp_path, 3)
+    assert totals["processed"] == 3
+    assert len(os.listdir(tmp_path / "dest" / "Below_100MB")) == 3
+    assert not (tmp_path / "dest" / "summary.log").exists()
+    out = capsys.readouterr().out
+    assert "Pipeline stages" not in out
+    assert out.count("sort_by_size timings") == 0
+    assert out.count("watch_folder timings") == 1
+
+    # After a restart the catch-up scan sees the same files; the journal
+    # keeps them out of any batch
+    totals = watch_until(tmp_path, 3)
+    assert totals["batches"] == 0
+    assert len(os.listdir(tmp_path / "dest" / "Below_100MB")) == 3
+
+def test_quiet_by_date_batch_leaves_no_summary(tmp_path, capsys):
+    from operations.sort_by_date import organize_by_date
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    (drop / "IMG_0.mp4").write_bytes(os.urandom(1024))
+    stats = organize_by_date(str(drop), str(tmp_path / "dest"), catalog=MediaCatalog(":memory:"), quiet=True)
+    assert stats["processed"] == 1
+    assert not (tmp_path / "dest" / "summary.log").exists()
+    assert "📋 Summary" not in capsys.readouterr().out
@@ -0,0 +1,196 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import metrics
+from utils.transfer import device_of, transfer_file
+
+DEFAULT_MAX_FILES = 16
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Asyncio transfer engine for slow or high-latency destinations (SMB/NFS).
+#
+# Copies still run as blocking calls in a thread pool, but admission is
+# decided on the event loop: at most `max_files` files and `max_bytes` bytes
+# are in flight at once, and each destination device gets its own rate
+# limit. With many files in flight, per-file round trips (open, create,
+# close, setattr) overlap instead of adding up.
+#
+# Synchronous callers use submit()/drain() from any thread; asyncio code can
+# await transfer() on the engine's loop.
+
+class RateLimiter:
+    # Virtual-clock limiter: each transfer books size / rate seconds on the
+    # destination's timeline and waits until its slot starts. Bursts of
+    # small files pass immediately, large files are paced.
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.next_free = 0.0
+
+    async def acquire(self, size):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.next_free)
+        self.next_free = start + size / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+class ByteBudget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self, size):
+        async with self.condition:
+            # A file larger than the whole budget still runs, just alone
+            await self.condition.wait_for(
+                lambda: self.in_flight == 0 or self.in_flight + size <= self.limit)
+            self.in_flight += size
+
+    async def release(self, size):
+        async with self.condition:
+            self.in_flight -= size
+            self.condition.notify_all()
+
+class TransferEngine:
+    def __init__(self, max_files=DEFAULT_MAX_FILES, max_bytes=DEFAULT_MAX_BYTES, rate_limit=None,
+                 rate_limits=None, latency=0.0):
+        # rate_limit: bytes/s applied to every destination device separately
+        # rate_limits: {destination folder: bytes/s} overrides for its device
+        # latency: seconds added to every transfer, to simulate a network share
+        self.max_files = max(1, max_files)
+        self.max_bytes = max_bytes
+        self.rate_limit = rate_limit
+        self.rate_limits = rate_limits or {}
+        self.latency = latency
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.limiters = {}
+        self.pending = threading.BoundedSemaphore(self.max_files * 2)
+        self.idle = threading.Condition()
+        self.outstanding = 0
+        self.stats = {"files": 0, "bytes": 0, "errors": 0, "seconds": 0.0}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        if self.loop is not None:
+            return self
+        self.executor = ThreadPoolExecutor(max_workers=self.max_files, thread_name_prefix="transfer")
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        self.started = time.perf_counter()
+        return self
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.files = asyncio.Semaphore(self.max_files)
+        self.budget = ByteBudget(self.max_bytes)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def close(self):
+        if self.loop is None:
+            return
+        self.drain()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.executor.shutdown()
+        self.loop = None
+        self.stats["seconds"] = time.perf_counter() - self.started
+
+    # --- Rate limiting ---
+
+    def _limiter_for(self, dest):
+        folder = os.path.dirname(dest)
+        try:
+            key = device_of(folder)
+        except OSError:
+            key = folder
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            rate = self.rate_limit
+            for root, root_rate in self.rate_limits.items():
+                try:
+                    if device_of(root) == key:
+                        rate = root_rate
+                        break
+                except OSError:
+                    continue
+            limiter = self.limiters[key] = RateLimiter(rate) if rate else False
+        return limiter
+
+    # --- Transfers ---
+
+    def _blocking_transfer(self, src, dest, mode, src_stat, checksum):
+        size = src_stat.st_size if src_stat is not None else 0
+        with metrics.timer("engine_copy", src, size=size):
+            if self.latency:
+                time.sleep(self.latency)
+            return transfer_file(src, dest, mode, src_stat, checksum)
+
+    async def transfer(self, src, dest, mode="copy", src_stat=None, checksum=None):
+        # Coroutine on the engine's loop; returns the mode actually used
+        size = src_stat.st_size if src_stat is not None else os.stat(src).st_size
+        async with self.files:
+            await self.budget.acquire(size)
+            try:
+                limiter = self._limiter_for(dest)
+                if limiter:
+                    await limiter.acquire(size)
+                used = await self.loop.run_in_executor(None, self._blocking_transfer, src, dest, mode, src_stat,
+                                                       checksum)
+            finally:
+                await self.budget.release(size)
+        self.stats["files"] += 1
+        self.stats["bytes"] += size
+        return used
+
+    def submit(self, src, dest, mode="copy", src_stat=None, on_done=None, checksum=None):
+        # Thread-safe; blocks while 2 * max_files transfers are already queued
+        # so a fast producer cannot run ahead of the destination.
+        # on_done(future) runs on the engine thread once the copy finishes.
+        self.start()
+        self.pending.acquire()
+        with self.idle:
+            self.outstanding += 1
+        future = asyncio.run_coroutine_threadsafe(self.transfer(src, dest, mode, src_stat, checksum), self.loop)
+        future.add_done_callback(lambda f: self._finished(f, on_done))
+        return future
+
+    def _finished(self, future, on_done):
+        if future.exception() is not None:
+            self.stats["errors"] += 1
+        try:
+            if on_done is not None:
+                on_done(future)
+        finally:
+            self.pending.release()
+            with self.idle:
+                self.outstanding -= 1
+                self.idle.notify_all()
+
+    def drain(self):
+        # Waits for everything submitted so far
+        with self.idle:
+            self.idle.wait_for(lambda: self.outstanding == 0)
+
+    def print_stats(self):
+        seconds = self.stats["seconds"] or (time.perf_counter() - self.started)
+        mb = self.stats["bytes"] / (1024 * 1024)
+        print(f"\n🚚 Transfer engine: {self.stats['files']} file(s), {round(mb, 2)} MB in {seconds:.2f}s "
+              f"({mb / seconds if seconds else 0:.1f} MB/s, {self.stats['errors']} error(s), "
+              f"up to {self.max_files} in flight)")
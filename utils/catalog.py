@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import datetime
+import threading
+
+DEFAULT_DB_PATH = "db/media.db"
+
+# Columns added on top of the original init_db.py schema
+CATALOG_COLUMNS = {
+    "size": "INTEGER",
+    "mtime_ns": "INTEGER",
+    "inode": "INTEGER",
+    "content_hash": "TEXT",
+    "sample_hash": "TEXT",
+    "hash_algo": "TEXT",
+    "duration": "REAL",
+    "resolution": "TEXT",
+    "perceptual_hash": "TEXT",
+}
+
+# PRAGMA user_version once date_taken values are all in ISO format
+DATES_ISO_VERSION = 1
+
+METADATA_FIELDS = ("media_type", "date_taken", "content_hash", "sample_hash", "hash_algo", "duration", "resolution",
+                   "perceptual_hash")
+
+def ensure_schema(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS media (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT,
+        filepath TEXT,
+        media_type TEXT,
+        date_taken TEXT
+    )
+    """)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(media)")}
+    for column, column_type in CATALOG_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE media ADD COLUMN {column} {column_type}")
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_media_filepath'").fetchone():
+        # Catalogs filled by the original organizer hold one row per run for
+        # the same file; keep the newest so the unique index can be built
+        conn.execute("""
+        DELETE FROM media WHERE filepath IS NOT NULL AND id NOT IN (
+            SELECT MAX(id) FROM media WHERE filepath IS NOT NULL GROUP BY filepath
+        )
+        """)
+        conn.execute("CREATE UNIQUE INDEX idx_media_filepath ON media(filepath)")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < DATES_ISO_VERSION:
+        # The original organizer stored str(datetime) ("2020-11-06 13:41:43");
+        # store ISO ("2020-11-06T13:41:43") like update() so date ranges in
+        # utils.query compare correctly
+        conn.execute("UPDATE media SET date_taken = substr(date_taken, 1, 10) || 'T' || substr(date_taken, 12) "
+                     "WHERE date_taken LIKE '____-__-__ %'")
+        conn.execute(f"PRAGMA user_version = {DATES_ISO_VERSION}")
+    # For utils.query: searches by type in each order, date order without a
+    # type, size ranges and hash lookups
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_type_date ON media(media_type, date_taken)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_type_size ON media(media_type, size)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_type_path ON media(media_type, filepath)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_date ON media(date_taken)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_size ON media(size)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_media_hash ON media(content_hash)")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS video_fingerprints (
+        filepath TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime_ns INTEGER,
+        samples INTEGER,
+        fingerprint BLOB
+    )
+    """)
+    conn.commit()
+
+def stat_key(st):
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+def to_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+class MediaCatalog:
+    def __init__(self, db_path=DEFAULT_DB_PATH, batch_size=1000):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        ensure_schema(self.conn)
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def preload(self, root):
+        # One range scan over the filepath index instead of a query per file
+        if not isinstance(root, (str, os.PathLike)):
+            for one in root:
+                self.preload(one)
+            return
+        prefix = os.path.join(os.path.abspath(root), "")
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM media WHERE filepath >= ? AND filepath < ?",
+                (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)),
+            ).fetchall()
+            for row in rows:
+                self.cache[row["filepath"]] = dict(row)
+
+    def lookup(self, path, st):
+        # Returns the cached row only while (size, mtime_ns, inode) still match
+        path = os.path.abspath(path)
+        with self.lock:
+            row = self.pending.get(path) or self.cache.get(path)
+            if row is None:
+                found = self.conn.execute("SELECT * FROM media WHERE filepath = ?", (path,)).fetchone()
+                if found is None:
+                    return None
+                row = self.cache[path] = dict(found)
+        if (row["size"], row["mtime_ns"], row["inode"]) != stat_key(st):
+            return None
+        return row
+
+    def update(self, path, st, **fields):
+        path = os.path.abspath(path)
+        previous = self.lookup(path, st)
+        if isinstance(fields.get("date_taken"), datetime.datetime):
+            fields["date_taken"] = fields["date_taken"].isoformat()
+        if previous is not None and all(previous.get(k) == v for k, v in fields.items()):
+            return previous
+        row = {field: None for field in METADATA_FIELDS}
+        if previous is not None:
+            row.update({field: previous.get(field) for field in METADATA_FIELDS})
+        row.update(fields)
+        row.update({
+            "filename": os.path.basename(path),
+            "filepath": path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "inode": st.st_ino,
+        })
+        with self.lock:
+            self.pending[path] = row
+            self.cache[path] = row
+            should_flush = len(self.pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+        return row
+
+    def flush(self):
+        with self.lock:
+            rows = list(self.pending.values())
+            self.pending.clear()
+        if not rows:
+            return
+        columns = ("filename", "filepath", "size", "mtime_ns", "inode") + METADATA_FIELDS
+        placeholders = ", ".join(f":{c}" for c in columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "filepath")
+        with self.lock:
+            self.conn.executemany(
+                f"INSERT INTO media ({', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(filepath) DO UPDATE SET {updates}",
+                rows,
+            )
+            self.conn.commit()
+
+    def get_fingerprint(self, path, st, samples):
+        path = os.path.abspath(path)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fingerprint FROM video_fingerprints WHERE filepath = ? AND size = ? AND mtime_ns = ? AND samples = ?",
+                (path, st.st_size, st.st_mtime_ns, samples),
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put_fingerprint(self, path, st, samples, fingerprint):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO video_fingerprints VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(path), st.st_size, st.st_mtime_ns, samples, fingerprint),
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,137 @@
+import os
+from collections import namedtuple
+from types import MappingProxyType
+
+# File classification by extension, optionally confirmed by content.
+#
+# One frozen table maps every known extension to a FileType: the kind the
+# operations filter on ("image", "video", "document", "other") and a finer
+# group (the folder organize_documents files documents into, the container
+# for media). Lookups are a single dict probe on the lowercased extension.
+#
+# Sniffing reads the first SNIFF_BYTES bytes and recognises the formats
+# whose signature fits in them. A conclusive signature wins over the
+# extension, so extension-less and mislabeled files land in the right
+# bucket; containers that need more than the header to tell apart (ZIP
+# based Office files, OLE2) keep their extension's type.
+#   sniff=None       extension only, no file is opened
+#   sniff="unknown"  read headers only of files with no known extension
+#   sniff="all"      read every header, also catching mislabeled files
+
+FileType = namedtuple("FileType", ("kind", "group"))
+
+KINDS = ("image", "video", "document", "other")
+OTHER = FileType("other", None)
+SNIFF_BYTES = 32
+SNIFF_MODES = ("unknown", "all")
+
+def _table(kind, groups):
+    return {ext: FileType(kind, group) for group, extensions in groups.items() for ext in extensions}
+
+EXTENSIONS = MappingProxyType({
+    **_table("image", {
+        "JPEG": (".jpg", ".jpeg", ".jpe"),
+        "PNG": (".png",),
+        "HEIC": (".heic", ".heif"),
+        "WebP": (".webp",),
+        "TIFF": (".tif", ".tiff"),
+        "BMP": (".bmp",),
+        "GIF": (".gif",),
+    }),
+    **_table("video", {
+        "MP4": (".mp4", ".m4v", ".3gp"),
+        "QuickTime": (".mov",),
+        "AVI": (".avi",),
+        "Matroska": (".mkv", ".webm"),
+        "WMV": (".wmv",),
+    }),
+    **_table("document", {
+        "PDF": (".pdf",),
+        "Word": (".doc", ".docx", ".odt"),
+        "Excel": (".xls", ".xlsx", ".ods"),
+        "PowerPoint": (".ppt", ".pptx", ".odp"),
+        "Text": (".txt", ".csv"),
+    }),
+})
+
+_SEPARATORS = tuple(sep for sep in (os.sep, os.altsep) if sep)
+
+def extension_of(name):
+    # Lowercased extension of a file name or path ("" for none); same result
+    # as os.path.splitext, without its generic path handling
+    dot = name.rfind(".")
+    if dot <= 0 or name[dot - 1] in _SEPARATORS:
+        return ""
+    ext = name[dot:]
+    if any(sep in ext for sep in _SEPARATORS):
+        return ""
+    return ext.lower()
+
+def file_type(name):
+    return EXTENSIONS.get(extension_of(name), OTHER)
+
+def classify(name):
+    return EXTENSIONS.get(extension_of(name), OTHER).kind
+
+def media_type(kind):
+    # The catalog's media_type column only tells photos and videos apart
+    return kind if kind in ("image", "video") else "other"
+
+# --- Content sniffing ---
+
+# Fixed signatures at the start of the file
+_SIGNATURES = (
+    (b"\xff\xd8\xff", FileType("image", "JPEG")),
+    (b"\x89PNG\r\n\x1a\n", FileType("image", "PNG")),
+    (b"GIF87a", FileType("image", "GIF")),
+    (b"GIF89a", FileType("image", "GIF")),
+    (b"II*\x00", FileType("image", "TIFF")),
+    (b"MM\x00*", FileType("image", "TIFF")),
+    (b"BM", FileType("image", "BMP")),
+    (b"\x1aE\xdf\xa3", FileType("video", "Matroska")),
+    (b"0&\xb2u\x8ef\xcf\x11", FileType("video", "WMV")),
+    (b"%PDF-", FileType("document", "PDF")),
+)
+_RIFF_TYPES = {b"WEBP": FileType("image", "WebP"), b"AVI ": FileType("video", "AVI")}
+_HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"mif1", b"msf1", b"avif"}
+# ISO base media brands known to be video; others (Canon CR3 "crx ", JPEG
+# 2000 "jp2 ", audio "M4A ", ...) are left to the extension
+_VIDEO_BRANDS = {b"isom", b"iso2", b"iso3", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42", b"avc1", b"M4V ",
+                 b"M4VH", b"M4VP", b"mmp4", b"MSNV", b"dash", b"f4v ", b"XAVC", b"qt  "}
+
+def sniff(header):
+    # FileType identified from the first bytes of a file, or None when the
+    # header is not conclusive
+    if len(header) >= 12:
+        if header[4:8] == b"ftyp":
+            brand = header[8:12]
+            if brand in _HEIF_BRANDS:
+                return FileType("image", "HEIC")
+            if brand in _VIDEO_BRANDS or brand[:3] in (b"3gp", b"3g2"):
+                return FileType("video", "QuickTime" if brand == b"qt  " else "MP4")
+            return None
+        if header[:4] == b"RIFF":
+            return _RIFF_TYPES.get(header[8:12])
+    for signature, kind in _SIGNATURES:
+        if header.startswith(signature):
+            if signature == b"BM" and (len(header) < 14 or header[6:10] != bytes(4)):
+                continue  # BMP reserved fields are zero; "BM" alone is too weak
+            return kind
+    return None
+
+def read_header(path, size=SNIFF_BYTES):
+    try:
+        with open(path, "rb", buffering=0) as f:
+            return f.read(size)
+    except OSError:
+        return b""
+
+def sniff_file(path, by_extension=None, mode="all"):
+    # by_extension: the FileType from the name, if already looked up
+    if by_extension is None:
+        by_extension = file_type(path)
+    if mode not in SNIFF_MODES:
+        raise ValueError(f"Unknown sniff mode: {mode} (choose from {', '.join(SNIFF_MODES)})")
+    if mode == "unknown" and by_extension is not OTHER:
+        return by_extension
+    return sniff(read_header(path)) or by_extension
@@ -0,0 +1,350 @@
+import os
+import math
+import sqlite3
+import hashlib
+import threading
+from itertools import groupby
+from utils.classifier import classify, media_type
+from utils.hashing import default_algorithm, hash_file, hash_sample, sample_covers_file
+from utils.parallel import default_workers, map_ahead
+from utils.scanner import scan
+
+# Content index of a destination library, for skipping files it already has.
+#
+# Every library file is recorded with its size, head/tail sample hash and
+# (once needed) full hash. An in-memory Bloom filter over the sizes and the
+# (size, sample) pairs answers "definitely not in the library" without
+# touching the database, so an incoming file costs:
+#   - nothing, when no library file has its size
+#   - one sample read, when no library file has its (size, sample)
+#   - a full hash, only when the filter says it may be there
+# Source hashes are cached in the media catalog, so importing the same
+# backup again reads none of the files already seen.
+#
+# The filter is saved in the index on close and reloaded at startup; keys
+# for rows written since (another run, a crash) are added on load, and it is
+# rebuilt from the rows once it fills up.
+
+INDEX_NAME = ".media_organizer_content.db"
+BLOOM_ERROR_RATE = 0.01
+MIN_CAPACITY = 100_000
+# Not library content: journals and this index, run logs, manifests
+LIBRARY_EXCLUDE = (".*", "summary.log", "skipped_files.log", "plan_manifest.*")
+
+def default_index_path(dest_folder):
+    return os.path.join(dest_folder, INDEX_NAME)
+
+class BloomFilter:
+    # No false negatives; about `error_rate` false positives up to `capacity`
+    # keys, at roughly 10 bits per key for 1%
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, hashes=None, bits=None, keys=0):
+        # bits, hashes, keys: the state of a saved filter
+        self.capacity = max(1, capacity)
+        if bits is None:
+            size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+            bits = bytes((size + 7) // 8)
+        self.bits = bytearray(bits)
+        self.size = len(self.bits) * 8
+        self.hashes = hashes or max(1, round(self.size / self.capacity * math.log(2)))
+        self.keys = keys
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hashes)]
+
+    def add(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.keys += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self):
+        return self.keys > self.capacity
+
+def size_key(size):
+    return b"%d" % size
+
+def sample_key(size, sample):
+    return b"%d:%s" % (size, sample.encode())
+
+class ContentIndex:
+    def __init__(self, dest_folder, path=None, algorithm=None, refresh=True, workers=None, batch_size=500):
+        # refresh: sync with the library first (new, changed and removed
+        # files); only new or changed files are read
+        self.root = os.path.abspath(dest_folder)
+        self.path = path or default_index_path(dest_folder)
+        self.algorithm = algorithm or default_algorithm()
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.uncommitted = 0
+        self.stats = {
+            "indexed": 0,
+            "removed": 0,
+            "size_misses": 0,
+            "sample_misses": 0,
+            "sample_hashed": 0,
+            "full_hashed": 0,
+            "cached_hashes": 0,
+            "matches": 0,
+        }
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            folder TEXT,
+            name TEXT,
+            size INTEGER,
+            mtime_ns INTEGER,
+            sample_hash TEXT,
+            content_hash TEXT,
+            UNIQUE (folder, name)
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_files_sample ON files(size, sample_hash)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS bloom (
+            capacity INTEGER,
+            hashes INTEGER,
+            keys INTEGER,
+            max_id INTEGER,
+            bits BLOB
+        )
+        """)
+        stored = self.conn.execute("SELECT value FROM meta WHERE key = 'hash_algo'").fetchone()
+        if stored is not None and stored[0] != self.algorithm:
+            # Hashes from another algorithm can't be compared, start over
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("DELETE FROM bloom")
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('hash_algo', ?)", (self.algorithm,))
+        self.conn.commit()
+
+        self.filter, self.synced = self._load_filter()
+        if refresh:
+            self.refresh(workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Bloom filter persistence ---
+
+    def _load_filter(self):
+        saved = self.conn.execute("SELECT capacity, hashes, keys, max_id, bits FROM bloom").fetchone()
+        # Saved again on close; if this run dies the next one rebuilds
+        self.conn.execute("DELETE FROM bloom")
+        self.conn.commit()
+        if saved is not None:
+            capacity, hashes, keys, max_id, bits = saved
+            bloom = BloomFilter(capacity, hashes=hashes, bits=bits, keys=keys)
+            synced = self._add_keys(bloom, max_id)
+            if not bloom.full:
+                return bloom, synced
+        rows = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        # Two keys per file, with room for the library to double
+        bloom = BloomFilter(max(MIN_CAPACITY, 4 * rows))
+        return bloom, self._add_keys(bloom, 0)
+
+    def _add_keys(self, bloom, after_id):
+        # Adds the keys of rows written after `after_id` (ids only grow, a
+        # rewritten row gets a new one); returns the last id
+        last = after_id
+        for row_id, size, sample in self.conn.execute(
+                "SELECT id, size, sample_hash FROM files WHERE id > ?", (after_id,)):
+            bloom.add(size_key(size))
+            bloom.add(sample_key(size, sample))
+            last = max(last, row_id)
+        return last
+
+    def _save_filter(self):
+        with self.lock:
+            # Rows other processes wrote meanwhile
+            self.synced = self._add_keys(self.filter, self.synced)
+            bloom = self.filter
+            self.conn.execute("DELETE FROM bloom")
+            self.conn.execute("INSERT INTO bloom VALUES (?, ?, ?, ?, ?)",
+                              (bloom.capacity, bloom.hashes, bloom.keys, self.synced, bytes(bloom.bits)))
+            self.conn.commit()
+
+    # --- Library side ---
+
+    def _folder_key(self, folder):
+        relative = os.path.relpath(folder, self.root)
+        return "" if relative == "." else relative
+
+    def _put(self, folder, name, st, sample, content_hash=None):
+        with self.lock:
+            row_id = self.conn.execute(
+                "INSERT OR REPLACE INTO files (folder, name, size, mtime_ns, sample_hash, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (folder, name, st.st_size, st.st_mtime_ns, sample, content_hash)
+            ).lastrowid
+            self.filter.add(size_key(st.st_size))
+            self.filter.add(sample_key(st.st_size, sample))
+            if row_id == self.synced + 1:
+                self.synced = row_id  # nobody else wrote in between
+            self.stats["indexed"] += 1
+            self.uncommitted += 1
+            if self.uncommitted >= self.batch_size:
+                self.conn.commit()
+                self.uncommitted = 0
+
+    def _forget(self, folder, names):
+        with self.lock:
+            self.conn.executemany("DELETE FROM files WHERE folder = ? AND name = ?",
+                                  [(folder, name) for name in names])
+            self.stats["removed"] += len(names)
+
+    def refresh(self, workers=None):
+        visited = set()
+
+        def stale():
+            # Library files the index doesn't know in their current state.
+            # Folders are compared one at a time so memory stays per folder.
+            for folder, entries in groupby(scan(self.root, exclude=LIBRARY_EXCLUDE), key=lambda e: os.path.dirname(e.path)):
+                key = self._folder_key(folder)
+                visited.add(key)
+                with self.lock:
+                    known = {name: (size, mtime_ns) for name, size, mtime_ns in self.conn.execute(
+                        "SELECT name, size, mtime_ns FROM files WHERE folder = ?", (key,))}
+                for entry in entries:
+                    if known.pop(entry.name, None) != (entry.size, entry.mtime_ns):
+                        yield key, entry
+                if known:
+                    self._forget(key, list(known))
+
+        def sample(item):
+            entry = item[1]
+            return hash_sample(entry.path, entry.size, self.algorithm)
+
+        for (folder, entry), result in map_ahead(sample, stale(), workers or default_workers()):
+            if isinstance(result, str):
+                self._put(folder, entry.name, entry.stat, result)
+
+        with self.lock:
+            gone = [folder for (folder,) in self.conn.execute("SELECT DISTINCT folder FROM files")
+                    if folder not in visited]
+        for folder in gone:
+            with self.lock:
+                self.stats["removed"] += self.conn.execute("DELETE FROM files WHERE folder = ?", (folder,)).rowcount
+        with self.lock:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def add(self, path, sample=None, content_hash=None):
+        # Records a file just placed in the library; pass the source's
+        # hashes when known to avoid reading it back
+        st = os.stat(path)
+        if sample is None:
+            sample = hash_sample(path, st.st_size, self.algorithm)
+            if sample is None:
+                return
+        self._put(self._folder_key(os.path.dirname(os.path.abspath(path))), os.path.basename(path), st,
+                  sample, content_hash)
+
+    def record(self, dest, src, st, catalog=None):
+        # Records src, just placed in the library as dest. Its hashes come
+        # from (and are left in) the catalog, so importing src again later
+        # needs no sample read.
+        sample = self._source_hash(catalog, src, st, "sample_hash",
+                                   lambda: hash_sample(dest, st.st_size, self.algorithm))
+        if sample is None:
+            return
+        row = catalog.lookup(src, st) if catalog is not None else None
+        self.add(dest, sample, row["content_hash"] if row is not None else None)
+
+    # --- Incoming side ---
+
+    def _source_hash(self, catalog, path, st, field, compute):
+        row = catalog.lookup(path, st) if catalog is not None else None
+        if row is not None and row[field] and row["hash_algo"] == self.algorithm:
+            with self.lock:
+                self.stats["cached_hashes"] += 1
+            return row[field]
+        value = compute()
+        with self.lock:
+            self.stats["sample_hashed" if field == "sample_hash" else "full_hashed"] += 1
+        if value is not None and catalog is not None:
+            fields = {field: value, "hash_algo": self.algorithm}
+            if row is None:
+                fields["media_type"] = media_type(classify(path))
+            elif row["hash_algo"] != self.algorithm:
+                fields.setdefault("content_hash", None)
+                fields.setdefault("sample_hash", None)
+            catalog.update(path, st, **fields)
+        return value
+
+    def find(self, path, st, catalog=None):
+        # Returns the library file holding the same content as path, or None
+        size = st.st_size
+        if size_key(size) not in self.filter:
+            with self.lock:
+                self.stats["size_misses"] += 1
+            return None
+        sample = self._source_hash(catalog, path, st, "sample_hash",
+                                   lambda: hash_sample(path, size, self.algorithm))
+        if sample is None:
+            return None
+        if sample_key(size, sample) not in self.filter:
+            with self.lock:
+                self.stats["sample_misses"] += 1
+            return None
+
+        with self.lock:
+            candidates = self.conn.execute(
+                "SELECT folder, name, mtime_ns, content_hash FROM files WHERE size = ? AND sample_hash = ?",
+                (size, sample)).fetchall()
+        full = None
+        for folder, name, mtime_ns, content_hash in candidates:
+            existing = os.path.join(self.root, folder, name)
+            try:
+                current = os.stat(existing)
+            except OSError:
+                continue
+            if (current.st_size, current.st_mtime_ns) != (size, mtime_ns):
+                continue  # changed since it was indexed; the next refresh rehashes it
+            if not sample_covers_file(size):
+                if full is None:
+                    full = self._source_hash(catalog, path, st, "content_hash",
+                                             lambda: hash_file(path, self.algorithm))
+                    if full is None:
+                        return None
+                if content_hash is None:
+                    content_hash = hash_file(existing, self.algorithm)
+                    with self.lock:
+                        self.stats["full_hashed"] += 1
+                        self.conn.execute("UPDATE files SET content_hash = ? WHERE folder = ? AND name = ?",
+                                          (content_hash, folder, name))
+                if content_hash != full:
+                    continue
+            with self.lock:
+                self.stats["matches"] += 1
+            return existing
+        return None
+
+    def print_stats(self):
+        s = self.stats
+        with self.lock:
+            files = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        print(f"♻️  Library index: {files:,} file(s) ({s['indexed']:,} indexed, {s['removed']:,} removed); "
+              f"{s['matches']:,} already present")
+        print(f"   Ruled out by size: {s['size_misses']:,}, by sample: {s['sample_misses']:,}; "
+              f"hashed {s['sample_hashed']:,} sample(s), {s['full_hashed']:,} full; "
+              f"{s['cached_hashes']:,} reused from catalog")
+
+    def close(self):
+        self._save_filter()
+        self.conn.close()
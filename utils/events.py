@@ -0,0 +1,213 @@
+import time
+import threading
+from collections import deque
+
+# Progress/event bus shared by every operation and whatever front end is
+# watching (the Tk GUI today).
+#
+# Publishers only bump counters or append to a bounded deque under a lock,
+# so publishing is cheap and never touches a UI. A consumer calls drain() on
+# its own schedule (the GUI every ~150 ms via root.after) and gets every
+# queued event plus one coalesced progress snapshot; that is the throttling.
+# Nobody draining is fine: operations stay runnable headless and old log
+# events simply fall off the deque.
+#
+# The bus also carries cooperative job control. Long loops call
+# checkpoint(), which blocks while paused and raises Cancelled once cancel()
+# was requested; the pipeline source calls wait() and simply stops feeding
+# new files, so in-flight ones finish cleanly, and stage workers hold()
+# between items so a pause takes effect right away.
+#
+# Totals for an ETA come from stage() when a phase knows them up front. For
+# streamed scans a front end can set estimate_totals, and the organizer then
+# counts the source in a background thread and reports it via set_totals().
+
+MAX_EVENTS = 2000
+RATE_SMOOTHING = 0.3
+
+class Cancelled(Exception):
+    pass
+
+class ProgressBus:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.lock = threading.Lock()
+        self.events = deque(maxlen=max_events)
+        self.running = threading.Event()
+        self.running.set()
+        self.cancel_requested = threading.Event()
+        self.estimate_totals = False
+        self.stage_serial = 0
+        self.start_job(None)
+
+    # --- Job lifecycle ---
+
+    def start_job(self, name):
+        with self.lock:
+            self.job = name
+            self.job_started = time.perf_counter()
+            self.events.clear()
+            self.result = None
+            self._reset_stage(None)
+        self.cancel_requested.clear()
+        self.running.set()
+
+    def finish_job(self, result="done", message=None):
+        # result: "done", "cancelled" or "error"
+        with self.lock:
+            self.result = result
+            self.events.append(("finished", {"result": result, "message": message}))
+
+    def _reset_stage(self, name, files=None, total_bytes=None):
+        self.stage_serial += 1
+        self.stage_name = name
+        self.stage_started = time.perf_counter()
+        self.files_total = files
+        self.bytes_total = total_bytes
+        self.files_found = 0
+        self.bytes_found = 0
+        self.scan_complete = files is not None
+        self.files_done = 0
+        self.bytes_done = 0
+        self.last_sample = (self.stage_started, 0, 0)
+        self.files_rate = 0.0
+        self.bytes_rate = 0.0
+
+    # --- Publishing ---
+
+    def stage(self, name, files=None, total_bytes=None):
+        # Starts a phase; totals give an ETA straight away, otherwise it is
+        # estimated from found() once the scan feeding the phase completes
+        with self.lock:
+            self._reset_stage(name, files, total_bytes)
+            self.events.append(("stage", {"name": name}))
+
+    def found(self, files=1, size=0):
+        with self.lock:
+            self.files_found += files
+            self.bytes_found += size
+
+    def found_all(self):
+        with self.lock:
+            self.scan_complete = True
+
+    def set_totals(self, stage_serial, files, total_bytes):
+        # Ignored if the phase it was counted for is already over
+        with self.lock:
+            if stage_serial == self.stage_serial and self.files_total is None:
+                self.files_total = files
+                self.bytes_total = total_bytes
+
+    def advance(self, files=1, size=0):
+        with self.lock:
+            self.files_done += files
+            self.bytes_done += size
+
+    def log(self, message, level="info"):
+        with self.lock:
+            self.events.append(("log", {"message": message, "level": level}))
+
+    def writer(self):
+        # File-like object for contextlib.redirect_stdout
+        return _BusWriter(self)
+
+    # --- Job control ---
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def cancel(self):
+        self.cancel_requested.set()
+        self.running.set()  # a paused job must wake up to notice
+
+    @property
+    def paused(self):
+        return not self.running.is_set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_requested.is_set()
+
+    def hold(self):
+        # Blocks while paused
+        self.running.wait()
+
+    def wait(self):
+        # Blocks while paused; False once the job should stop
+        self.hold()
+        return not self.cancel_requested.is_set()
+
+    def checkpoint(self):
+        if not self.wait():
+            raise Cancelled()
+
+    # --- Consuming ---
+
+    def _snapshot(self):
+        # Called with the lock held
+        now = time.perf_counter()
+        last_time, last_files, last_bytes = self.last_sample
+        interval = now - last_time
+        if interval >= 0.05:
+            files_rate = (self.files_done - last_files) / interval
+            bytes_rate = (self.bytes_done - last_bytes) / interval
+            if self.files_rate:
+                files_rate = RATE_SMOOTHING * files_rate + (1 - RATE_SMOOTHING) * self.files_rate
+                bytes_rate = RATE_SMOOTHING * bytes_rate + (1 - RATE_SMOOTHING) * self.bytes_rate
+            self.files_rate, self.bytes_rate = files_rate, bytes_rate
+            self.last_sample = (now, self.files_done, self.bytes_done)
+
+        files_total = self.files_total
+        bytes_total = self.bytes_total
+        if files_total is None and self.scan_complete:
+            files_total, bytes_total = self.files_found, self.bytes_found
+        eta = None
+        if files_total is not None and self.files_rate > 0:
+            if bytes_total and self.bytes_rate > 0:
+                eta = max(0.0, (bytes_total - self.bytes_done) / self.bytes_rate)
+            else:
+                eta = max(0.0, (files_total - self.files_done) / self.files_rate)
+        return {
+            "job": self.job,
+            "stage": self.stage_name,
+            "files_done": self.files_done,
+            "bytes_done": self.bytes_done,
+            "files_found": self.files_found,
+            "files_total": files_total,
+            "bytes_total": bytes_total,
+            "elapsed": now - self.job_started,
+            "files_per_second": self.files_rate,
+            "bytes_per_second": self.bytes_rate,
+            "eta_seconds": eta,
+            "paused": self.paused,
+            "cancelled": self.cancelled,
+            "result": self.result,
+        }
+
+    def drain(self):
+        # Returns (events, progress snapshot); events are (kind, data) pairs
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+            return events, self._snapshot()
+
+class _BusWriter:
+    def __init__(self, bus):
+        self.bus = bus
+        self.pending = ""
+
+    def write(self, text):
+        self.pending += text
+        while "\n" in self.pending:
+            line, self.pending = self.pending.split("\n", 1)
+            self.bus.log(line)
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.bus.log(self.pending)
+            self.pending = ""
+
+bus = ProgressBus()
@@ -0,0 +1,137 @@
+import datetime
+import struct
+from utils.metrics import metrics
+
+HEADER_READ_SIZE = 64 * 1024
+
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+# Returned when the header parsed cleanly but has no DateTimeOriginal,
+# so there is no point in asking PIL again.
+MISSING = object()
+
+# --- Container parsing ---
+
+def _find_tiff_jpeg(data):
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xDA:  # start of scan, no more metadata segments
+            return MISSING
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker == 0xE1 and data[i + 4:i + 10] == b"Exif\x00\x00":
+            return i + 10
+        i += 2 + length
+    return None
+
+def _find_tiff_webp(data):
+    i = 12
+    while i + 8 <= len(data):
+        chunk, length = data[i:i + 4], struct.unpack("<I", data[i + 4:i + 8])[0]
+        if chunk == b"EXIF":
+            start = i + 8
+            if data[start:start + 6] == b"Exif\x00\x00":
+                start += 6
+            return start
+        i += 8 + length + (length & 1)
+    return None
+
+def _find_tiff_png(data):
+    i = 8
+    while i + 8 <= len(data):
+        length, chunk = struct.unpack(">I4s", data[i:i + 8])
+        if chunk == b"eXIf":
+            return i + 8
+        if chunk in (b"IDAT", b"IEND"):
+            return MISSING
+        i += 12 + length
+    return None
+
+def _find_tiff_bmff(data):
+    # HEIC/HEIF/AVIF keep Exif as an item prefixed with "Exif\0\0"; walking
+    # iinf/iloc is not needed to locate it inside the header window.
+    for header in (b"Exif\x00\x00MM\x00*", b"Exif\x00\x00II*\x00"):
+        pos = data.find(header)
+        if pos != -1:
+            return pos + 6
+    return None
+
+def find_tiff_offset(data):
+    if data[:2] == b"\xff\xd8":
+        return _find_tiff_jpeg(data)
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return 0
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _find_tiff_webp(data)
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return _find_tiff_png(data)
+    if data[4:8] == b"ftyp":
+        return _find_tiff_bmff(data)
+    return None
+
+# --- TIFF/IFD parsing ---
+
+def _ifd_entry(data, base, ifd_offset, endian, wanted):
+    start = base + ifd_offset
+    count = struct.unpack(endian + "H", data[start:start + 2])[0]
+    for n in range(count):
+        entry = start + 2 + n * 12
+        tag, type_, num = struct.unpack(endian + "HHI", data[entry:entry + 8])
+        if tag == wanted:
+            return type_, num, entry + 8
+    return None
+
+def parse_date_original(data, base):
+    endian = "<" if data[base:base + 2] == b"II" else ">"
+    ifd0 = struct.unpack(endian + "I", data[base + 4:base + 8])[0]
+    pointer = _ifd_entry(data, base, ifd0, endian, TAG_EXIF_IFD)
+    if pointer is None:
+        return MISSING
+    exif_ifd = struct.unpack(endian + "I", data[pointer[2]:pointer[2] + 4])[0]
+    entry = _ifd_entry(data, base, exif_ifd, endian, TAG_DATETIME_ORIGINAL)
+    if entry is None:
+        return MISSING
+    _, num, value_at = entry
+    if num > 4:
+        value_at = base + struct.unpack(endian + "I", data[value_at:value_at + 4])[0]
+    raw = data[value_at:value_at + num]
+    if len(raw) < num:
+        return None  # value lies beyond the header window
+    return raw.rstrip(b"\x00 ").decode("ascii")
+
+# --- Public API ---
+
+def read_date_original(file_path, read_size=HEADER_READ_SIZE):
+    # Bounded single read; returns the raw string, MISSING, or None if the
+    # header could not be parsed and a full decoder is needed.
+    with open(file_path, "rb") as f:
+        data = f.read(read_size)
+    try:
+        base = find_tiff_offset(data)
+        if base is None or base is MISSING:
+            return base
+        return parse_date_original(data, base)
+    except (struct.error, UnicodeDecodeError):
+        return None
+
+def _read_date_original_pil(file_path):
+    from PIL import Image
+    with Image.open(file_path) as image:
+        return image.getexif().get_ifd(TAG_EXIF_IFD).get(TAG_DATETIME_ORIGINAL)
+
+def get_exif_date(file_path):
+    try:
+        with metrics.timer("exif_header", file_path, "image"):
+            value = read_date_original(file_path)
+        if value is None:
+            with metrics.timer("exif_pil", file_path, "image"):
+                value = _read_date_original_pil(file_path)
+        if value and value is not MISSING:
+            return datetime.datetime.strptime(value, EXIF_DATE_FORMAT)
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,77 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from utils.hashing import HASH_METHODS, default_algorithm, hash_file
+from utils.metrics import metrics
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DROP_CACHE_MIN_SIZE = 64 * 1024 * 1024
+
+# Full-file hashing of many files at once.
+#
+# hashlib (and xxhash) release the GIL while hashing a buffer and reads
+# release it too, so a thread pool spreads the work over every core and keeps
+# several reads queued at the device. Admission is limited twice: at most
+# 2 * workers files are queued, and at most `max_bytes` of file data is being
+# hashed at once (a file larger than that runs alone), so a batch of
+# multi-GB videos streams one or two at a time instead of seeking between
+# all of them. Files of DROP_CACHE_MIN_SIZE or more are evicted from the page
+# cache as they are read.
+
+def default_hash_workers():
+    # Hashing is CPU-bound once the data is in memory; a few extra threads
+    # cover the time spent waiting for reads
+    return min(16, (os.cpu_count() or 1) + 2)
+
+class HashEngine:
+    def __init__(self, workers=None, max_bytes=DEFAULT_MAX_BYTES, algorithm=None, method="read",
+                 stage="full_hash"):
+        # method: see utils.hashing.hash_file; stage: name for the per-file metrics
+        if method not in HASH_METHODS:
+            raise ValueError(f"Unknown hash method: {method} (choose from {', '.join(HASH_METHODS)})")
+        self.workers = max(1, workers or default_hash_workers())
+        self.max_bytes = max_bytes
+        self.algorithm = algorithm or default_algorithm()
+        self.method = method
+        self.stage = stage
+        self.stats = {"files": 0, "bytes": 0, "errors": 0}
+
+    def _hash(self, path, size):
+        with metrics.timer(self.stage, path, size=size):
+            return hash_file(path, self.algorithm, method=self.method, drop_cache=size >= DROP_CACHE_MIN_SIZE)
+
+    def hash_files(self, items):
+        # items: (path, size, ...) tuples; yields (item, hex digest or None)
+        # in completion order. Admission is decided here, on the caller's
+        # thread, so no locks are needed.
+        done = queue.SimpleQueue()
+        in_flight = in_flight_bytes = 0
+
+        def work(item):
+            try:
+                digest = self._hash(item[0], item[1])
+            except Exception:
+                digest = None
+            done.put((item, digest))
+
+        def finished():
+            nonlocal in_flight, in_flight_bytes
+            item, digest = done.get()
+            in_flight -= 1
+            in_flight_bytes -= item[1]
+            self.stats["files"] += 1
+            self.stats["bytes"] += item[1]
+            if digest is None:
+                self.stats["errors"] += 1
+            return item, digest
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as pool:
+            for item in items:
+                size = item[1]
+                while in_flight and (in_flight >= 2 * self.workers or in_flight_bytes + size > self.max_bytes):
+                    yield finished()
+                pool.submit(work, item)
+                in_flight += 1
+                in_flight_bytes += size
+            while in_flight:
+                yield finished()
@@ -0,0 +1,177 @@
+import os
+import mmap
+import hashlib
+import threading
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+READ_BUFFER_SIZE = 1024 * 1024
+SAMPLE_SIZE = 64 * 1024
+HASH_METHODS = ("read", "mmap")
+MMAP_CHUNK = 8 * 1024 * 1024
+DROP_BEHIND = 64 * 1024 * 1024  # evict after this many bytes with drop_cache
+
+_buffers = threading.local()
+
+# --- Hash selection ---
+
+def available_algorithms():
+    algorithms = ["md5", "sha1", "blake2b"]
+    if xxhash is not None:
+        algorithms.append("xxh3")
+    return algorithms
+
+def default_algorithm():
+    return "xxh3" if xxhash is not None else "blake2b"
+
+def new_hasher(algorithm=None):
+    algorithm = algorithm or default_algorithm()
+    if algorithm == "xxh3":
+        if xxhash is None:
+            raise ValueError("xxhash is not installed")
+        return xxhash.xxh3_128()
+    if algorithm == "blake2b":
+        # 128-bit digests are plenty for dedup and cheaper to store/compare
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.new(algorithm)
+
+# --- File hashing ---
+
+def read_buffer(size=READ_BUFFER_SIZE):
+    # A per-thread buffer reused across files: readinto() fills it in place,
+    # so reading, hashing and copying allocate nothing per chunk
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = _buffers.buffer = bytearray(size)
+    return memoryview(buffer)[:size]
+
+def _advise(fd, advice, offset=0, length=0):
+    # posix_fadvise hint where the platform has one; hints never fail a hash
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, offset, length, getattr(os, f"POSIX_FADV_{advice}"))
+        except OSError:
+            pass
+
+def _hash_mapped(f, hasher, drop_cache):
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return  # empty files can't be mapped
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mapped)
+        try:
+            for offset in range(0, len(mapped), MMAP_CHUNK):
+                hasher.update(view[offset:offset + MMAP_CHUNK])
+                if drop_cache and hasattr(mapped, "madvise") and (offset + MMAP_CHUNK) % DROP_BEHIND == 0:
+                    # Unmap the pages behind so the fadvise below can evict them
+                    start = offset + MMAP_CHUNK - DROP_BEHIND
+                    mapped.madvise(mmap.MADV_DONTNEED, start, DROP_BEHIND)
+                    _advise(f.fileno(), "DONTNEED", start, DROP_BEHIND)
+        finally:
+            view.release()
+
+def hash_file(file_path, algorithm=None, buffer_size=READ_BUFFER_SIZE, method="read", drop_cache=False):
+    # method: "read" fills a reusable buffer with large reads; "mmap" hashes
+    #   the page cache in place, with no copy at all. A mapped file that is
+    #   truncated meanwhile kills the process (SIGBUS), so mmap is only for
+    #   files nothing else is writing.
+    # drop_cache: evict the pages behind the read, so hashing multi-GB videos
+    #   doesn't push everything else out of the page cache
+    hasher = new_hasher(algorithm)
+    try:
+        with open(file_path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            _advise(fd, "SEQUENTIAL")
+            if method == "mmap":
+                _hash_mapped(f, hasher, drop_cache)
+            else:
+                view = read_buffer(buffer_size)
+                done = dropped = 0
+                while True:
+                    n = f.readinto(view)
+                    if not n:
+                        break
+                    hasher.update(view[:n])
+                    done += n
+                    if drop_cache and done - dropped >= DROP_BEHIND:
+                        _advise(fd, "DONTNEED", dropped, done - dropped)
+                        dropped = done
+            if drop_cache:
+                _advise(fd, "DONTNEED")
+        return hasher.hexdigest()
+    except Exception:
+        return None
+
+def _read_into(f, view):
+    # Fills view unless EOF comes first; a raw read may return less than
+    # asked for (network shares, pipes), so one readinto() is not enough
+    filled = 0
+    while filled < len(view):
+        n = f.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+def hash_sample(file_path, size=None, algorithm=None, sample_size=SAMPLE_SIZE):
+    # Head + tail sample; files that fit in the sample are hashed whole, so
+    # the result is only "maybe equal" for files larger than 2 * sample_size.
+    hasher = new_hasher(algorithm)
+    try:
+        with open(file_path, "rb", buffering=0) as f:
+            if size is None:
+                size = f.seek(0, 2)
+                f.seek(0)
+            if size <= 2 * sample_size:
+                view = read_buffer(size)
+                hasher.update(view[:_read_into(f, view)])
+            else:
+                view = read_buffer(sample_size)
+                hasher.update(view[:_read_into(f, view)])
+                f.seek(size - sample_size)
+                hasher.update(view[:_read_into(f, view)])
+        hasher.update(str(size).encode())
+        return hasher.hexdigest()
+    except Exception:
+        return None
+
+def sample_covers_file(size, sample_size=SAMPLE_SIZE):
+    return size <= 2 * sample_size
+
+class StreamHasher:
+    # Full and head/tail sample hash of a file fed front to back in chunks,
+    # matching hash_file() and hash_sample() of the same bytes, so a single
+    # pass over the data (e.g. while copying it) yields both
+    def __init__(self, size, algorithm=None, sample_size=SAMPLE_SIZE):
+        self.algorithm = algorithm or default_algorithm()
+        self.size = size
+        self.offset = 0
+        self.full = new_hasher(self.algorithm)
+        self.sample = new_hasher(self.algorithm)
+        if sample_covers_file(size, sample_size):
+            self.head = self.tail = size
+        else:
+            self.head, self.tail = sample_size, size - sample_size
+
+    def update(self, chunk):
+        offset = self.offset
+        end = offset + len(chunk)
+        self.full.update(chunk)
+        if offset < self.head:
+            self.sample.update(chunk[:self.head - offset])
+        if end > self.tail and offset < self.size:
+            self.sample.update(chunk[max(0, self.tail - offset):self.size - offset])
+        self.offset = end
+
+    def hexdigests(self):
+        # (content hash, sample hash); None for both when the file did not
+        # have the size it was started with (changed while being read)
+        if self.offset != self.size:
+            return None, None
+        self.sample.update(str(self.size).encode())
+        return self.full.hexdigest(), self.sample.hexdigest()
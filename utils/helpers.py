@@ -1,45 +1,175 @@
 import os
-import shutil
-from PIL import Image
-from PIL.ExifTags import TAGS
 import datetime
-import cv2
+import tempfile
+import threading
+from utils import exif_reader, video_metadata
+from utils.classifier import classify, media_type
+from utils.transfer import transfer_file
 
 # --- Helpers ---
 
 def is_image(file):
-    return file.lower().endswith(('.jpg', '.jpeg', '.png', '.heic', '.webp', '.tiff', '.bmp'))
+    return classify(file) == "image"
 
 def is_video(file):
-    return file.lower().endswith(('.mp4', '.mov', '.avi', '.mkv', '.3gp', '.wmv'))
+    return classify(file) == "video"
 
-def safe_copy(src, dest_folder):
+def is_document(file):
+    return classify(file) == "document"
+
+def get_file_kind(file):
+    return classify(file)
+
+def get_media_type(file):
+    return media_type(classify(file))
+
+def _case_insensitive(folder, names, probe=True):
+    # Whether the filesystem holding folder treats IMG.JPG and img.jpg as
+    # one name, or None if that can't be told. normcase only folds case on
+    # Windows, but macOS (APFS/HFS+) and exFAT/vfat mounts are
+    # case-insensitive too.
+    if os.path.normcase("A") == "a":
+        return True
+    try:
+        for name in names:
+            other = name.swapcase()
+            if other != name:
+                path = os.path.join(folder, other)
+                return os.path.exists(path) and os.path.samefile(path, os.path.join(folder, name))
+        if probe:
+            # No name with letters to compare: ask the filesystem directly
+            with tempfile.NamedTemporaryFile(prefix=".case_probe_", dir=folder) as f:
+                return os.path.exists(os.path.join(folder, os.path.basename(f.name).upper()))
+    except OSError:
+        pass
+    return None
+
+class DestinationIndex:
+    # In-memory view of destination folders, filled with one listdir per
+    # folder and updated as names are handed out. Picks the same names as
+    # the exists() probing loop, but each lookup is O(1) and it is safe to
+    # share between worker threads writing into the same folder.
+    def __init__(self, create_dirs=True):
+        self.create_dirs = create_dirs
+        self.lock = threading.Lock()
+        self.folders = {}
+        self.folded = {}
+        self.case_by_device = {}
+        self.next_suffix = {}
+        # Suffixed name handed out -> (requested filename, its suffix number)
+        self.suffixed = {}
+        # Names handed out by this index, as opposed to ones found on disk
+        self.handed_out = set()
+
+    def _names(self, dest_folder):
+        key = os.path.normcase(os.path.abspath(dest_folder))
+        names = self.folders.get(key)
+        if names is None:
+            if self.create_dirs:
+                os.makedirs(dest_folder, exist_ok=True)
+            elif not os.path.isdir(dest_folder):
+                # Nothing on disk to probe; fold case to be safe
+                self.folded[key] = True
+                names = self.folders[key] = set()
+                return key, names
+            listing = os.listdir(dest_folder)
+            self.folded[key] = self._folds_case(dest_folder, listing)
+            names = self.folders[key] = {self._fold(key, n) for n in listing}
+        return key, names
+
+    def _folds_case(self, dest_folder, listing):
+        # Decided once per device, so at most one probe file per filesystem
+        try:
+            device = os.stat(dest_folder).st_dev
+        except OSError:
+            device = None
+        folded = self.case_by_device.get(device)
+        if folded is None:
+            folded = _case_insensitive(dest_folder, listing, probe=self.create_dirs)
+            if folded is None:
+                # Undecided: folding case can only add a suffix, never overwrite
+                return True
+            if device is not None:
+                self.case_by_device[device] = folded
+        return folded
+
+    def _fold(self, key, name):
+        return name.casefold() if self.folded[key] else os.path.normcase(name)
+
+    def reserve(self, dest_folder, filename):
+        with self.lock:
+            key, names = self._names(dest_folder)
+            candidate = filename
+            if self._fold(key, candidate) in names:
+                base, ext = os.path.splitext(filename)
+                counter = self.next_suffix.get((key, filename), 1)
+                candidate = f"{base}_{counter}{ext}"
+                while self._fold(key, candidate) in names:
+                    counter += 1
+                    candidate = f"{base}_{counter}{ext}"
+                self.next_suffix[(key, filename)] = counter + 1
+                self.suffixed[(key, self._fold(key, candidate))] = (filename, counter)
+            names.add(self._fold(key, candidate))
+            self.handed_out.add((key, self._fold(key, candidate)))
+            return os.path.join(dest_folder, candidate)
+
+    def claim(self, dest):
+        # Takes a name chosen earlier (e.g. recorded in a journal) so reserve()
+        # never hands it out again. False if this index already gave it to
+        # another file; a file of that name on disk does not count.
+        with self.lock:
+            key, names = self._names(os.path.dirname(dest))
+            name = self._fold(key, os.path.basename(dest))
+            if (key, name) in self.handed_out:
+                return False
+            names.add(name)
+            self.handed_out.add((key, name))
+            return True
+
+    def release(self, dest):
+        with self.lock:
+            key, names = self._names(os.path.dirname(dest))
+            name = self._fold(key, os.path.basename(dest))
+            names.discard(name)
+            self.handed_out.discard((key, name))
+            # Hand the freed suffix out again next, as the exists() loop would
+            filename, counter = self.suffixed.pop((key, name), (None, None))
+            if filename is not None and self.next_suffix.get((key, filename), 1) > counter:
+                self.next_suffix[(key, filename)] = counter
+
+def next_free_path(dest_folder, filename):
     os.makedirs(dest_folder, exist_ok=True)
-    filename = os.path.basename(src)
     dest = os.path.join(dest_folder, filename)
-    
+
     base, ext = os.path.splitext(filename)
     counter = 1
     while os.path.exists(dest):
         dest = os.path.join(dest_folder, f"{base}_{counter}{ext}")
         counter += 1
+    return dest
 
-    shutil.copy2(src, dest)
+def safe_copy(src, dest_folder, index=None, mode="copy", src_stat=None, checksum=None):
+    filename = os.path.basename(src)
+    if index is None:
+        dest = next_free_path(dest_folder, filename)
+    else:
+        dest = index.reserve(dest_folder, filename)
 
-def get_exif_date(file_path):
     try:
-        image = Image.open(file_path)
-        exif_data = image._getexif()
-        if exif_data:
-            for tag, value in exif_data.items():
-                tag_name = TAGS.get(tag)
-                if tag_name == 'DateTimeOriginal':
-                    return datetime.datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+        transfer_file(src, dest, mode, src_stat, checksum)
     except Exception:
-        pass
-    return None
+        if index is not None:
+            index.release(dest)
+        raise
+    return dest
+
+def get_exif_date(file_path):
+    return exif_reader.get_exif_date(file_path)
 
 def get_video_date(file_path):
+    date_taken = video_metadata.get_video_metadata(file_path)["date_taken"]
+    if date_taken is not None:
+        return date_taken
     try:
         timestamp = os.path.getmtime(file_path)
         return datetime.datetime.fromtimestamp(timestamp)
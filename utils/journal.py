@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from utils.transfer import transfer_file
+
+JOURNAL_NAME = ".media_organizer_journal.db"
+
+# fsync policy -> SQLite synchronous level and how often to commit:
+#   always: every planned/completed record is durable before the next copy
+#   batch:  commit every `batch_size` records, a crash redoes at most one batch
+#   off:    leave flushing to the OS, fastest but a crash may lose the journal
+FSYNC_POLICIES = {
+    "always": "FULL",
+    "batch": "NORMAL",
+    "off": "OFF",
+}
+
+def default_journal_path(dest_folder):
+    return os.path.join(dest_folder, JOURNAL_NAME)
+
+class JobJournal:
+    def __init__(self, path, fsync="batch", resume=False, batch_size=500):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.fsync = fsync
+        self.batch_size = 1 if fsync == "always" else batch_size
+        self.uncommitted = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(f"PRAGMA synchronous={FSYNC_POLICIES[fsync]}")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS transfers (
+            src TEXT PRIMARY KEY,
+            dest TEXT,
+            size INTEGER,
+            mtime_ns INTEGER,
+            status TEXT
+        )
+        """)
+        if not resume:
+            self.conn.execute("DELETE FROM transfers")
+        self.conn.commit()
+
+        # Loaded once so resume checks never touch the destination tree
+        self.entries = {
+            src: (dest, size, mtime_ns, status)
+            for src, dest, size, mtime_ns, status in self.conn.execute("SELECT * FROM transfers")
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, src, st):
+        entry = self.entries.get(src)
+        if entry is None or (entry[1], entry[2]) != (st.st_size, st.st_mtime_ns):
+            return None
+        return entry
+
+    def _write(self, sql, params):
+        # Called with self.lock held
+        self.conn.execute(sql, params)
+        self.uncommitted += 1
+        if self.uncommitted >= self.batch_size:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def plan(self, src, dest, st):
+        with self.lock:
+            self.entries[src] = (dest, st.st_size, st.st_mtime_ns, "planned")
+            self._write("INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, 'planned')",
+                        (src, dest, st.st_size, st.st_mtime_ns))
+
+    def complete(self, src):
+        with self.lock:
+            dest, size, mtime_ns, _ = self.entries[src]
+            self.entries[src] = (dest, size, mtime_ns, "done")
+            self._write("UPDATE transfers SET status = 'done' WHERE src = ?", (src,))
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+def plan_transfer(journal, index, src, dest_folder, st):
+    # Picks the destination for src. Returns (dest, done): done transfers are
+    # skipped, and a planned but unfinished one is redone into the same name.
+    if journal is None:
+        return index.reserve(dest_folder, os.path.basename(src)), False
+
+    entry = journal.lookup(src, st)
+    if entry is not None and os.path.dirname(entry[0]) == dest_folder:
+        dest, _, _, status = entry
+        # The recorded name must not be handed to another file of this run
+        claimed = index.claim(dest)
+        if status == "done":
+            return dest, True
+        if claimed:
+            try:
+                if os.path.getsize(dest) == st.st_size:
+                    journal.complete(src)
+                    return dest, True
+                os.remove(dest)
+            except OSError:
+                pass
+            os.makedirs(dest_folder, exist_ok=True)
+            return dest, False
+        # Another file already took the name (its partial copy never reached
+        # the disk); plan this one afresh rather than touch that file
+
+    dest = index.reserve(dest_folder, os.path.basename(src))
+    journal.plan(src, dest, st)
+    return dest, False
+
+def journaled_copy(journal, src, dest_folder, index, mode="copy", src_stat=None):
+    # Returns (dest, resumed)
+    st = src_stat or os.stat(src)
+    dest, done = plan_transfer(journal, index, src, dest_folder, st)
+    if done:
+        return dest, True
+    try:
+        transfer_file(src, dest, mode, st)
+    except Exception:
+        index.release(dest)
+        raise
+    if journal is not None:
+        journal.complete(src)
+    return dest, False
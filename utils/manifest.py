@@ -0,0 +1,131 @@
+import os
+import csv
+import gzip
+import struct
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+MANIFEST_COLUMNS = ("source", "destination", "size", "reason", "device", "inode")
+PARQUET_BATCH_ROWS = 10_000
+
+FS_IOC_FIEMAP = 0xC020660B
+FIEMAP_HEADER = "=QQIIII"
+FIEMAP_EXTENT = "=QQQQQIIII"
+
+# --- Writing ---
+
+class ManifestWriter:
+    # Streams rows to CSV (optionally .csv.gz) or, when pyarrow is installed
+    # and the path ends in .parquet, to Parquet in fixed-size row groups.
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.rows = 0
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self.parquet = path.endswith(".parquet")
+        if self.parquet:
+            if pq is None:
+                raise ValueError("Writing .parquet manifests needs pyarrow; use .csv or .csv.gz instead")
+            self.schema = pa.schema([
+                ("source", pa.string()), ("destination", pa.string()), ("size", pa.int64()),
+                ("reason", pa.string()), ("device", pa.int64()), ("inode", pa.int64()),
+            ])
+            self.writer = pq.ParquetWriter(path, self.schema)
+            self.buffer = {column: [] for column in MANIFEST_COLUMNS}
+        else:
+            opener = gzip.open if path.endswith(".gz") else open
+            self.file = opener(path, "wt", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(MANIFEST_COLUMNS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, source, destination, st, reason=""):
+        row = (source, destination, st.st_size, reason, st.st_dev, st.st_ino)
+        with self.lock:
+            self.rows += 1
+            if not self.parquet:
+                self.writer.writerow(row)
+                return
+            for column, value in zip(MANIFEST_COLUMNS, row):
+                self.buffer[column].append(value)
+            if len(self.buffer["source"]) >= PARQUET_BATCH_ROWS:
+                self._flush_parquet()
+
+    def _flush_parquet(self):
+        if self.buffer["source"]:
+            self.writer.write_table(pa.table(self.buffer, schema=self.schema))
+            self.buffer = {column: [] for column in MANIFEST_COLUMNS}
+
+    def close(self):
+        with self.lock:
+            if self.parquet:
+                self._flush_parquet()
+                self.writer.close()
+            else:
+                self.file.close()
+
+# --- Reading ---
+
+def read_manifest(path):
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ValueError("Reading .parquet manifests needs pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+            yield from batch.to_pylist()
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row["size"] = int(row["size"])
+            row["device"] = int(row["device"])
+            row["inode"] = int(row["inode"])
+            yield row
+
+# --- Physical ordering ---
+
+def first_extent(path):
+    # Physical byte offset of the file's first extent via FIEMAP (Linux);
+    # None when the filesystem or platform does not support it.
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    request = bytearray(struct.pack(FIEMAP_HEADER, 0, 2 ** 64 - 1, 0, 0, 1, 0) + bytes(struct.calcsize(FIEMAP_EXTENT)))
+    try:
+        with open(path, "rb") as f:
+            fcntl.ioctl(f.fileno(), FS_IOC_FIEMAP, request)
+    except OSError:
+        return None
+    mapped = struct.unpack_from(FIEMAP_HEADER, request)[3]
+    if not mapped:
+        return None
+    return struct.unpack_from(FIEMAP_EXTENT, request, struct.calcsize(FIEMAP_HEADER))[1]
+
+def physical_key(row, use_extents=False):
+    position = first_extent(row["source"]) if use_extents else None
+    return (row["device"], position if position is not None else -1, row["inode"])
+
+def sort_rows(rows, order="source", use_extents=False):
+    # "source" reads in on-disk order (inode, or first extent when asked),
+    # "destination" groups writes per folder and reads each group in on-disk
+    # order, "none" keeps the planned order.
+    if order == "none":
+        return list(rows)
+    keyed = [(physical_key(row, use_extents), row) for row in rows]
+    if order == "destination":
+        keyed.sort(key=lambda kr: (os.path.dirname(kr[1]["destination"]), kr[0]))
+    else:
+        keyed.sort(key=lambda kr: kr[0])
+    return [row for _, row in keyed]
@@ -1,26 +1,11 @@
-from PIL import Image
-from PIL.ExifTags import TAGS
-import datetime
-import os
+from utils.classifier import file_type
+from utils.exif_reader import get_exif_date
 
 def extract_image_metadata(file_path):
-    try:
-        image = Image.open(file_path)
-        exif_data = image._getexif()
-        if not exif_data:
-            return None
-
-        for tag_id, value in exif_data.items():
-            tag = TAGS.get(tag_id, tag_id)
-            if tag == 'DateTimeOriginal':
-                return datetime.datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
-    except Exception:
-        return None
-    return None
+    return get_exif_date(file_path)
 
 def extract_metadata(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext in ['.jpg', '.jpeg', '.png']:
+    if file_type(file_path).group in ("JPEG", "PNG"):
         return extract_image_metadata(file_path)
     else:
         return None
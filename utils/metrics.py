@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import heapq
+import bisect
+import datetime
+import threading
+import functools
+from contextlib import contextmanager
+from utils.classifier import classify
+
+# Shared instrumentation for every operation.
+#
+# Stages record one observation per file (seconds, bytes, file kind); the
+# registry keeps counters, a latency histogram per (stage, kind) and the
+# slowest files per stage. The outermost @instrumented operation resets the
+# registry, prints a summary when it finishes and, when configured, writes
+# a JSON report, a Prometheus text file and a merged cProfile dump.
+#
+# Timings recorded inside process-pool workers stay in those processes; the
+# pipeline's extract stage still times each file as a whole.
+
+METRICS_DIR_ENV = "MEDIA_ORGANIZER_METRICS"
+PROFILE_ENV = "MEDIA_ORGANIZER_PROFILE"
+SLOWEST_FILES = 10
+PROMETHEUS_PREFIX = "media_organizer"
+
+# Exponential latency buckets: 10 µs growing by √2 up to ~168 s
+BUCKET_BOUNDS = tuple(1e-5 * 2 ** (i / 2) for i in range(49))
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "low", "high")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.low = float("inf")
+        self.high = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.low = min(self.low, seconds)
+        self.high = max(self.high, seconds)
+
+    def percentile(self, q):
+        # Linear interpolation inside the bucket holding the q-th sample,
+        # clamped to the observed range so small samples stay honest
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKET_BOUNDS[i - 1] if i else 0.0
+                high = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else low * 2
+                value = low + (high - low) * (rank - seen) / n
+                return min(max(value, self.low), self.high)
+            seen += n
+        return self.high
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "mean_seconds": round(self.total / self.count, 6) if self.count else 0.0,
+            "max_seconds": round(self.high, 6),
+            "p50_seconds": round(self.percentile(0.50), 6),
+            "p99_seconds": round(self.percentile(0.99), 6),
+        }
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.report_dir = os.environ.get(METRICS_DIR_ENV) or None
+        self.profile_path = os.environ.get(PROFILE_ENV) or None
+        self.depth = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.operation = None
+            self.started = None
+            self.finished = None
+            self.counters = {}
+            self.histograms = {}
+            self.slowest = {}
+            self.profiles = []
+
+    def configure(self, report_dir=None, profile_path=None):
+        # report_dir: write metrics.json and metrics.prom there after each operation
+        # profile_path: dump a cProfile of the operation (all pipeline threads)
+        self.report_dir = report_dir
+        self.profile_path = profile_path
+
+    # --- Recording ---
+
+    def add(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds, path=None, kind=None, size=0):
+        if kind is None:
+            kind = classify(path) if path else "other"
+        with self.lock:
+            histogram = self.histograms.get((stage, kind))
+            if histogram is None:
+                histogram = self.histograms[(stage, kind)] = Histogram()
+            histogram.observe(seconds)
+            for name, value in (("files", 1), ("bytes", size)):
+                key = (name, (("kind", kind), ("stage", stage)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            if path is not None:
+                slowest = self.slowest.setdefault(stage, [])
+                if len(slowest) < SLOWEST_FILES:
+                    heapq.heappush(slowest, (seconds, path))
+                elif seconds > slowest[0][0]:
+                    heapq.heapreplace(slowest, (seconds, path))
+
+    @contextmanager
+    def timer(self, stage, path=None, kind=None, size=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, path, kind, size)
+
+    # --- Profiling ---
+
+    @contextmanager
+    def profiled(self):
+        # cProfile only sees the thread that enabled it, so each pipeline
+        # thread profiles itself and the results are merged at the end
+        if not self.profile_path:
+            yield
+            return
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self.lock:
+                self.profiles.append(profile)
+
+    def _dump_profile(self):
+        with self.lock:
+            profiles, self.profiles = self.profiles, []
+        if not profiles:
+            return
+        import pstats
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        folder = os.path.dirname(os.path.abspath(self.profile_path))
+        os.makedirs(folder, exist_ok=True)
+        stats.dump_stats(self.profile_path)
+        print(f"🔬 Profile saved to: {self.profile_path} (python -m pstats {self.profile_path})")
+
+    # --- Operations ---
+
+    @contextmanager
+    def run(self, operation):
+        with self.lock:
+            self.depth += 1
+            outermost = self.depth == 1
+        if outermost:
+            self.reset()
+            self.operation = operation
+            self.started = time.time()
+        try:
+            with self.profiled():
+                yield self
+        finally:
+            with self.lock:
+                self.depth -= 1
+            if outermost:
+                self.finished = time.time()
+                self.print_summary()
+                if self.report_dir:
+                    self.write_reports(self.report_dir)
+                if self.profile_path:
+                    self._dump_profile()
+
+    # --- Export ---
+
+    def snapshot(self):
+        with self.lock:
+            stages = {}
+            for (stage, kind), histogram in sorted(self.histograms.items()):
+                stages.setdefault(stage, {})[kind] = histogram.as_dict()
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            slowest = {stage: [{"path": path, "seconds": round(seconds, 6)}
+                               for seconds, path in sorted(heap, reverse=True)]
+                       for stage, heap in self.slowest.items()}
+        wall = (self.finished or time.time()) - self.started if self.started else 0.0
+        return {
+            "operation": self.operation,
+            "started": datetime.datetime.fromtimestamp(self.started).isoformat() if self.started else None,
+            "wall_seconds": round(wall, 3),
+            "stages": stages,
+            "counters": counters,
+            "slowest_files": slowest,
+        }
+
+    def to_prometheus(self):
+        lines = []
+        name = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        lines.append(f"# HELP {name} Per-file latency of each stage by file kind.")
+        lines.append(f"# TYPE {name} histogram")
+        with self.lock:
+            for (stage, kind), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",kind="{kind}"'
+                cumulative = 0
+                for bound, n in zip(BUCKET_BOUNDS, histogram.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            by_name = {}
+            for (counter, labels), value in sorted(self.counters.items()):
+                by_name.setdefault(counter, []).append((labels, value))
+        for counter, series in by_name.items():
+            metric = f"{PROMETHEUS_PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series:
+                rendered = ",".join(f'{key}="{val}"' for key, val in labels)
+                lines.append(f"{metric}{{{rendered}}} {value}" if rendered else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        json_path = os.path.join(folder, "metrics.json")
+        prom_path = os.path.join(folder, "metrics.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        # Written then renamed so a node_exporter textfile collector never
+        # reads a half-written file
+        with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(prom_path + ".tmp", prom_path)
+        print(f"📈 Metrics saved to: {json_path}, {prom_path}")
+        return json_path, prom_path
+
+    def print_summary(self):
+        report = self.snapshot()
+        if not report["stages"]:
+            return
+        print(f"\n⏱️  {report['operation']} timings ({report['wall_seconds']:.2f}s wall):")
+        for stage, kinds in report["stages"].items():
+            for kind, h in kinds.items():
+                print(f"   {stage:<12} {kind:<9} {h['count']:>8} files  p50 {h['p50_seconds'] * 1000:>8.2f} ms  "
+                      f"p99 {h['p99_seconds'] * 1000:>8.2f} ms  total {h['sum_seconds']:.2f}s")
+        for stage, files in report["slowest_files"].items():
+            if files:
+                print(f"   🐌 slowest {stage}: {files[0]['path']} ({files[0]['seconds'] * 1000:.1f} ms)")
+
+metrics = Metrics()
+
+def instrumented(operation):
+    # Decorator: the outermost instrumented call owns the metrics report
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.run(operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
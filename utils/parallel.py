@@ -0,0 +1,58 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+POOL_MODES = ("thread", "process")
+
+def default_workers(mode="thread"):
+    cpus = os.cpu_count() or 1
+    # I/O-bound work benefits from more threads than cores
+    return min(32, cpus * 4) if mode == "thread" else cpus
+
+def batched(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def create_executor(workers, mode="thread"):
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pool mode: {mode}")
+    if mode == "process":
+        # Pulls in multiprocessing, so only imported when asked for
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+def map_ahead(func, items, workers=1, mode="thread", batch_size=256, prefetch=1):
+    # Yields (item, result) in input order while the next `prefetch` batches
+    # are already running in the pool, so memory stays bounded by the batches.
+    # An exception raised by func is yielded as the result, on either path.
+    if workers <= 1:
+        for item in items:
+            try:
+                result = func(item)
+            except Exception as e:
+                result = e
+            yield item, result
+        return
+
+    with create_executor(workers, mode) as executor:
+        pending = deque()
+        for batch in batched(items, batch_size):
+            pending.append((batch, [executor.submit(func, item) for item in batch]))
+            if len(pending) > prefetch:
+                yield from _drain(*pending.popleft())
+        while pending:
+            yield from _drain(*pending.popleft())
+
+def _drain(batch, futures):
+    for item, future in zip(batch, futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = e
+        yield item, result
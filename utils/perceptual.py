@@ -0,0 +1,150 @@
+from itertools import combinations
+import numpy as np
+
+HASH_ALGORITHMS = ("dhash", "phash")
+HASH_BITS = 64
+
+# --- Perceptual hashes ---
+
+def _load_gray(file_path, size):
+    from PIL import Image
+    with Image.open(file_path) as image:
+        # Lets the JPEG decoder scale by 1/2..1/8 instead of decoding full size
+        image.draft("L", (size[0] * 4, size[1] * 4))
+        return np.asarray(image.convert("L").resize(size, Image.BILINEAR), dtype=np.float32)
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+def dhash(file_path, hash_size=8):
+    pixels = _load_gray(file_path, (hash_size + 1, hash_size))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi / n * (k[None, :] + 0.5) * k[:, None])
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+_DCT32 = _dct_matrix(32)
+
+def phash(file_path, hash_size=8):
+    pixels = _load_gray(file_path, (32, 32))
+    low = (_DCT32 @ pixels @ _DCT32.T)[:hash_size, :hash_size]
+    return _bits_to_int(low > np.median(low.ravel()[1:]))
+
+def image_hash(file_path, algorithm="dhash"):
+    if algorithm == "phash":
+        return phash(file_path)
+    return dhash(file_path)
+
+# --- Hamming distance ---
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values):
+        return np.bitwise_count(values)
+else:
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        as_bytes = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8)
+        return _POPCOUNT8[as_bytes].reshape(-1, 8).sum(axis=1)
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+# --- Multi-index hashing ---
+
+def _flip_masks(width, radius):
+    masks = [0]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(width), r):
+            mask = 0
+            for bit in bits:
+                mask |= 1 << bit
+            masks.append(mask)
+    return np.array(masks)
+
+# Upper bound on candidate pairs expanded at once by near_pairs (~16 bytes each)
+MAX_CANDIDATES = 1 << 22
+
+def near_pairs(hashes, threshold, chunks=HASH_BITS // 16):
+    # Multi-index hashing: split each 64-bit hash into `chunks` parts. If two
+    # hashes are within `threshold`, at least one part differs by at most
+    # threshold // chunks bits, so only hashes landing in such a neighbouring
+    # bucket are ever compared. Buckets are read from an argsort plus a flat
+    # offset table rather than Python dicts, so 1M hashes take under a minute.
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    n = len(hashes)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    width = HASH_BITS // chunks
+    radius = threshold // chunks
+    masks = _flip_masks(width, radius).astype(np.int64)
+    chunk_mask = np.uint64((1 << width) - 1)
+    found, pending = [], 0
+
+    for c in range(chunks):
+        values = ((hashes >> np.uint64(c * width)) & chunk_mask).astype(np.int64)
+        order = np.argsort(values, kind="stable")
+        bucket_sizes = np.bincount(values, minlength=1 << width)
+        bucket_starts = np.cumsum(bucket_sizes) - bucket_sizes
+        for mask in masks:
+            query = values ^ mask
+            counts = bucket_sizes[query]
+            ends = np.cumsum(counts)
+            if ends[-1] == 0:
+                continue
+            # Candidate pairs are expanded a block of queries at a time, so
+            # crowded buckets (near-black frames, flat skies) cost time but
+            # never more than about MAX_CANDIDATES pairs of memory
+            start = 0
+            while start < n:
+                base = int(ends[start - 1]) if start else 0
+                stop = max(start + 1, int(np.searchsorted(ends, base + MAX_CANDIDATES, side="right")))
+                block_counts = counts[start:stop]
+                total = int(ends[stop - 1]) - base
+                if total:
+                    i = np.repeat(np.arange(start, stop), block_counts)
+                    offsets = np.arange(total) - np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+                    j = order[np.repeat(bucket_starts[query[start:stop]], block_counts) + offsets]
+                    keep = i < j
+                    i, j = i[keep], j[keep]
+                    close = popcount(hashes[i] ^ hashes[j]) <= threshold
+                    if close.any():
+                        found.append(i[close] * n + j[close])
+                        pending += int(close.sum())
+                start = stop
+            if pending > 4 * MAX_CANDIDATES:
+                # The same pair turns up under several masks and chunks
+                found = [np.unique(np.concatenate(found))]
+                pending = len(found[0])
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    keys = np.unique(np.concatenate(found))
+    return np.stack([keys // n, keys % n], axis=1)
+
+def group_pairs(n, pairs):
+    # Union-find over near pairs; returns groups of indices with 2+ members
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        ri, rj = find(int(i)), find(int(j))
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
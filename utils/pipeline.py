@@ -0,0 +1,210 @@
+import time
+import queue
+import threading
+from utils.events import bus
+from utils.metrics import metrics
+
+_STOP = object()
+_DROP = object()
+
+class StageStats:
+    __slots__ = ("name", "items_in", "items_out", "dropped", "errors", "busy_seconds", "started", "finished")
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    @property
+    def wall_seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self):
+        wall = self.wall_seconds
+        return self.items_out / wall if wall else 0.0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "items_per_second": round(self.throughput, 1),
+        }
+
+class Stage:
+    # func(item) returns the item for the next stage, or None to drop it.
+    # ordered stages with several workers re-sequence their output, and at
+    # most `queue_size` items are in flight inside the stage (backpressure).
+    def __init__(self, name, func, workers=1, queue_size=256, ordered=False, on_error=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ordered = ordered and self.workers > 1
+        self.on_error = on_error
+        self.stats = StageStats(name)
+
+def describe(item):
+    # (path, kind, size) of a pipeline item for the per-file metrics
+    return getattr(item, "path", None), getattr(item, "kind", None), getattr(item, "size", 0)
+
+class Pipeline:
+    def __init__(self, source, stages, source_name="scan", queue_size=1024, describe=describe):
+        self.source = source
+        self.describe = describe
+        self.stages = stages
+        self.source_stats = StageStats(source_name)
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.error = None
+
+    def _run_source(self, out_q):
+        stats = self.source_stats
+        stats.started = time.perf_counter()
+        try:
+            for seq, item in enumerate(self.source):
+                # Pausing holds the source; cancelling stops it and lets
+                # the items already in flight finish
+                if not bus.wait():
+                    break
+                stats.items_out += 1
+                bus.found(1, self.describe(item)[2] or 0)
+                out_q.put((seq, item))
+            else:
+                bus.found_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            stats.finished = time.perf_counter()
+            out_q.put(_STOP)
+
+    def _run_worker(self, stage, in_q, out_q, window, remaining):
+        with metrics.profiled():
+            self._work(stage, in_q, out_q, window, remaining)
+
+    def _work(self, stage, in_q, out_q, window, remaining):
+        stats = stage.stats
+        while True:
+            if window is not None:
+                window.acquire()
+            packet = in_q.get()
+            if packet is _STOP:
+                in_q.put(_STOP)  # let sibling workers see it too
+                if window is not None:
+                    window.release()
+                with self.lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    stats.finished = time.perf_counter()
+                    out_q.put(_STOP)
+                return
+
+            seq, item = packet
+            if item is _DROP:
+                out_q.put(packet)
+                continue
+
+            bus.hold()
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                result = None
+                with self.lock:
+                    stats.errors += 1
+                if stage.on_error is not None:
+                    stage.on_error(item, e)
+            elapsed = time.perf_counter() - start
+            path, kind, size = self.describe(item)
+            metrics.observe(stage.name, elapsed, path, kind, size)
+            with self.lock:
+                stats.items_in += 1
+                stats.busy_seconds += elapsed
+                if result is None:
+                    stats.dropped += 1
+                else:
+                    stats.items_out += 1
+
+            # Dropped items travel on as markers so sequence numbers stay
+            # contiguous for any ordered stage further down.
+            out_q.put((seq, _DROP if result is None else result))
+
+    def _run_reorder(self, in_q, out_q, window):
+        pending = {}
+        expected = 0
+        while True:
+            packet = in_q.get()
+            if packet is _STOP:
+                out_q.put(_STOP)
+                return
+            seq, item = packet
+            pending[seq] = item
+            while expected in pending:
+                out_q.put((expected, pending.pop(expected)))
+                window.release()
+                expected += 1
+
+    def run(self, sink=None):
+        # Blocks until every item has passed all stages; final outputs go to
+        # sink(item) on the calling thread. Returns the number of outputs.
+        q = queue.Queue(self.queue_size)
+        # Named threads keep py-spy dumps and profiles readable
+        threads = [threading.Thread(target=self._run_source, args=(q,), name=self.source_stats.name, daemon=True)]
+        for stage in self.stages:
+            out_q = queue.Queue(stage.queue_size)
+            stage.stats.started = time.perf_counter()
+            remaining = [stage.workers]
+            window = None
+            worker_out = out_q
+            if stage.ordered:
+                window = threading.Semaphore(stage.queue_size)
+                worker_out = queue.Queue()
+                threads.append(threading.Thread(target=self._run_reorder, args=(worker_out, out_q, window),
+                                                name=f"{stage.name}-reorder", daemon=True))
+            for i in range(stage.workers):
+                threads.append(threading.Thread(target=self._run_worker, args=(stage, q, worker_out, window, remaining),
+                                                name=f"{stage.name}-{i}", daemon=True))
+            q = out_q
+
+        for thread in threads:
+            thread.start()
+        count = 0
+        while True:
+            packet = q.get()
+            if packet is _STOP:
+                break
+            if packet[1] is _DROP:
+                continue
+            count += 1
+            if sink is not None:
+                sink(packet[1])
+        for thread in threads:
+            thread.join()
+        for stage in self.stages:
+            metrics.add("stage_busy_seconds", stage.stats.busy_seconds, stage=stage.name)
+            metrics.add("stage_errors", stage.stats.errors, stage=stage.name)
+        if self.error is not None:
+            raise self.error
+        return count
+
+    def stats(self):
+        return [self.source_stats.as_dict()] + [stage.stats.as_dict() for stage in self.stages]
+
+    def print_stats(self):
+        print("\n📊 Pipeline stages:")
+        for row in self.stats():
+            print(f"   {row['stage']:<10} {row['items_out']:>8} out  {row['dropped']:>6} dropped  "
+                  f"{row['errors']:>4} errors  {row['items_per_second']:>9.1f}/s  busy {row['busy_seconds']:.2f}s")
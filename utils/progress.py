@@ -0,0 +1,39 @@
+import sys
+
+# Progress bars, imported on first use.
+#
+# tqdm pulls in a lot of its own machinery (~50 ms at import time), which is
+# most of a short cron run on a small drop folder. Modules import tqdm from
+# here instead: on a terminal it is the real tqdm, imported when the first
+# bar is shown; without one (cron, pipes, the GUI) nobody could watch the
+# bar anyway, so a silent stand-in is returned and tqdm is never imported.
+
+def tqdm(iterable=None, *args, **kwargs):
+    stream = sys.stderr
+    if stream is None or not stream.isatty():
+        return _SilentBar(iterable)
+    from tqdm import tqdm as _tqdm
+    return _tqdm(iterable, *args, **kwargs)
+
+class _SilentBar:
+    # The subset of the tqdm interface the operations use
+    def __init__(self, iterable=None):
+        self.iterable = iterable
+        self.n = 0
+
+    def __iter__(self):
+        for item in self.iterable:
+            yield item
+            self.n += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, n=1):
+        self.n += n
+
+    def close(self):
+        pass
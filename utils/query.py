@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import base64
+import sqlite3
+import datetime
+from urllib.parse import quote
+from utils.catalog import DEFAULT_DB_PATH, MediaCatalog
+
+# Searches over the media catalog, e.g. "all videos from March 2021 longer
+# than 5 minutes", without walking the archive.
+#
+# Results are paged with keyset pagination: each page is one short query
+# that seeks in an index to the last (sort key, id) seen and reads
+# `page_size` rows, so a page costs the same on the first or the millionth
+# row, memory stays at one page and no read transaction is held between
+# pages. A page's cursor is an opaque token; passing it back as `after`
+# resumes right behind that page.
+#
+# Filters on type, date, size and hash use the catalog indexes (see
+# utils.catalog.ensure_schema); duration and resolution are checked on the
+# rows those indexes select.
+
+DEFAULT_PAGE_SIZE = 500
+ORDER_KEYS = {"date": "date_taken", "size": "size", "path": "filepath"}
+COLUMNS = ("id", "filepath", "filename", "media_type", "date_taken", "size", "duration", "resolution",
+           "content_hash")
+WIDTH_SQL = "CAST(substr(resolution, 1, instr(resolution, 'x') - 1) AS INTEGER)"
+HEIGHT_SQL = "CAST(substr(resolution, instr(resolution, 'x') + 1) AS INTEGER)"
+
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4}
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "min": 60, "h": 3600}
+
+# --- Value parsing (CLI friendly) ---
+
+def parse_size(text):
+    # "1500", "5MB", "1.5g" -> bytes
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(text))
+    if not match or match.group(2).lower() not in SIZE_UNITS:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+def parse_duration(text):
+    # "300", "90s", "5m", "1.5h", "1:30:00" -> seconds
+    text = str(text).strip()
+    if ":" in text:
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    match = re.fullmatch(r"([\d.]+)\s*([a-zA-Z]*)", text)
+    if not match or match.group(2).lower() not in DURATION_UNITS:
+        raise ValueError(f"Invalid duration: {text}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+
+def parse_resolution(text):
+    # "1920x1080" -> (1920, 1080)
+    match = re.fullmatch(r"\s*(\d+)\s*[xX×]\s*(\d+)\s*", str(text))
+    if not match:
+        raise ValueError(f"Invalid resolution: {text} (expected WIDTHxHEIGHT)")
+    return int(match.group(1)), int(match.group(2))
+
+def date_range(text):
+    # "2021", "2021-03", "2021-03-14" or a full ISO timestamp -> the
+    # [start, end) range of ISO strings it covers, matching date_taken
+    text = str(text).strip()
+    parts = text.split("-")
+    try:
+        if len(parts) == 1:
+            start = datetime.datetime(int(parts[0]), 1, 1)
+            end = datetime.datetime(start.year + 1, 1, 1)
+        elif len(parts) == 2:
+            start = datetime.datetime(int(parts[0]), int(parts[1]), 1)
+            end = datetime.datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        elif len(parts) == 3 and len(parts[2]) <= 2:
+            start = datetime.datetime(int(parts[0]), int(parts[1]), int(parts[2]))
+            end = start + datetime.timedelta(days=1)
+        else:
+            start = datetime.datetime.fromisoformat(text)
+            end = start + datetime.timedelta(seconds=1)
+    except ValueError:
+        raise ValueError(f"Invalid date: {text} (expected YYYY, YYYY-MM, YYYY-MM-DD or an ISO timestamp)")
+    return start.isoformat(), end.isoformat()
+
+def _iso(value, end=False):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        value = datetime.datetime(value.year, value.month, value.day)
+        return (value + datetime.timedelta(days=1) if end else value).isoformat()
+    start, stop = date_range(value)
+    return stop if end else start
+
+# --- Cursors ---
+
+def encode_cursor(phase, key, row_id):
+    raw = json.dumps([phase, key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        phase, key, row_id = json.loads(raw)
+        return phase, key, row_id
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {token}")
+
+# --- Queries ---
+
+class Page:
+    __slots__ = ("rows", "cursor")
+
+    def __init__(self, rows, cursor):
+        self.rows = rows
+        self.cursor = cursor  # None on the last page
+
+class CatalogQuery:
+    def __init__(self, conn, media_type=None, date_from=None, date_to=None, min_size=None, max_size=None,
+                 min_duration=None, max_duration=None, resolution=None, min_resolution=None,
+                 content_hash=None, under=None, order="date"):
+        # conn: an sqlite3 connection to a catalog (see open_catalog)
+        # date_from / date_to: inclusive; datetimes, dates or strings such
+        #   as "2021-03" (date_to="2021-03" runs to the end of March)
+        # resolution: exact "WxH"; min_resolution: at least that width and height
+        # under: only files below this folder
+        if order not in ORDER_KEYS:
+            raise ValueError(f"Unknown order: {order} (choose from {', '.join(ORDER_KEYS)})")
+        self.conn = conn
+        self.order = order
+        self.key = ORDER_KEYS[order]
+        where, params = [], []
+
+        if media_type:
+            types = [media_type] if isinstance(media_type, str) else list(media_type)
+            # A single type is an equality, so (media_type, <order key>) also gives the order
+            where.append("media_type = ?" if len(types) == 1 else f"media_type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        if date_from is not None:
+            where.append("date_taken >= ?")
+            params.append(_iso(date_from))
+        if date_to is not None:
+            where.append("date_taken < ?")
+            params.append(_iso(date_to, end=True))
+        if min_size is not None:
+            where.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            where.append("size <= ?")
+            params.append(max_size)
+        if content_hash:
+            where.append("content_hash = ?")
+            params.append(content_hash)
+        if under:
+            prefix = os.path.join(os.path.abspath(under), "")
+            where.append("filepath >= ? AND filepath < ?")
+            params.extend((prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+        if min_duration is not None:
+            where.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            where.append("duration <= ?")
+            params.append(max_duration)
+        if resolution:
+            width, height = parse_resolution(resolution) if isinstance(resolution, str) else resolution
+            where.append("resolution = ?")
+            params.append(f"{width}x{height}")
+        if min_resolution:
+            width, height = parse_resolution(min_resolution) if isinstance(min_resolution, str) else min_resolution
+            where.append(f"{WIDTH_SQL} >= ? AND {HEIGHT_SQL} >= ?")
+            params.extend((width, height))
+
+        self.where = where
+        self.params = params
+        # Rows with a NULL sort key (e.g. no date) come first, unless a
+        # range on that key already excludes them
+        if order == "date":
+            self.has_nulls = date_from is None and date_to is None
+        elif order == "size":
+            self.has_nulls = min_size is None and max_size is None
+        else:
+            self.has_nulls = False
+
+    def _sql(self, extra, select=", ".join(COLUMNS), order_by=None):
+        clauses = self.where + extra
+        sql = f"SELECT {select} FROM media"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by:
+            sql += f" ORDER BY {order_by} LIMIT ?"
+        return sql
+
+    def _page(self, phase, key, row_id, page_size):
+        # phase 0: rows whose sort key is NULL, in id order; phase 1: the rest
+        if phase == 0:
+            extra, params, order_by = [f"{self.key} IS NULL", "id > ?"], [row_id], "id"
+        elif key is None:
+            extra, params, order_by = [f"{self.key} IS NOT NULL"], [], f"{self.key}, id"
+        else:
+            extra, params, order_by = [f"({self.key}, id) > (?, ?)"], [key, row_id], f"{self.key}, id"
+        cursor = self.conn.execute(self._sql(extra, order_by=order_by), self.params + params + [page_size])
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def pages(self, page_size=DEFAULT_PAGE_SIZE, after=None):
+        # Yields Page objects; after: a cursor from a previous page
+        if after is not None:
+            phase, key, row_id = decode_cursor(after)
+        else:
+            phase, key, row_id = (0 if self.has_nulls else 1), None, 0
+        while True:
+            rows = self._page(phase, key, row_id, page_size)
+            if rows:
+                last = rows[-1]
+                key, row_id = (None, last["id"]) if phase == 0 else (last[self.key], last["id"])
+            if len(rows) < page_size:
+                if phase == 0:
+                    # NULL keys done; continue with the keyed rows
+                    phase, key, row_id = 1, None, 0
+                    if rows:
+                        yield Page(rows, encode_cursor(phase, key, row_id))
+                    continue
+                if rows:
+                    yield Page(rows, None)
+                return
+            yield Page(rows, encode_cursor(phase, key, row_id))
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page.rows
+
+    def count(self):
+        return self.conn.execute(self._sql([], "COUNT(*)"), self.params).fetchone()[0]
+
+    def explain(self):
+        # The query plan of a keyed page, to check which index is used
+        sql = self._sql([f"({self.key}, id) > (?, ?)"], order_by=f"{self.key}, id")
+        rows = self.conn.execute("EXPLAIN QUERY PLAN " + sql, self.params + ["", 0, 1]).fetchall()
+        return [row[-1] for row in rows]
+
+def open_catalog(db_path=DEFAULT_DB_PATH):
+    # Creates any missing indexes once, then returns a read-only connection
+    # so queries never block (or get blocked by) an organizer writing
+    MediaCatalog(db_path).close()
+    return sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True, check_same_thread=False)
@@ -0,0 +1,110 @@
+import os
+from fnmatch import fnmatch
+from utils.classifier import OTHER, SNIFF_MODES, file_type, sniff_file
+
+class ScanEntry:
+    __slots__ = ("path", "name", "stat", "kind", "group")
+
+    def __init__(self, path, name, stat, kind, group=None):
+        self.path = path
+        self.name = name
+        self.stat = stat
+        self.kind = kind
+        self.group = group
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def mtime(self):
+        return self.stat.st_mtime
+
+    @property
+    def mtime_ns(self):
+        return self.stat.st_mtime_ns
+
+    @property
+    def inode(self):
+        return self.stat.st_ino
+
+    def __repr__(self):
+        return f"ScanEntry({self.path!r}, kind={self.kind!r}, size={self.size})"
+
+def _classify(path, name, sniff):
+    by_extension = file_type(name)
+    if sniff and (sniff == "all" or by_extension is OTHER):
+        return sniff_file(path, by_extension, sniff)
+    return by_extension
+
+def entry_for(path, st=None, sniff=None):
+    name = os.path.basename(path)
+    kind, group = _classify(path, name, sniff)
+    return ScanEntry(path, name, st or os.stat(path), kind, group)
+
+def source_roots(source):
+    # One root or a list of them. Repeated roots and roots nested inside
+    # another one are dropped (compared by real path, so symlinked aliases
+    # count too) and the rest keep a stable, sorted order.
+    if isinstance(source, (str, os.PathLike)):
+        return [source]
+    by_real = {}
+    for root in source:
+        by_real.setdefault(os.path.realpath(root), root)
+    kept = []
+    for real in sorted(by_real):
+        if not any(real.startswith(os.path.join(parent, "")) for parent, _ in kept):
+            kept.append((real, by_real[real]))
+    return [root for _, root in kept]
+
+def _matches(name, patterns):
+    return any(fnmatch(name, pattern) for pattern in patterns)
+
+def scan(source_folder, include=None, exclude=None, kinds=None, skip_dirs=(), sniff=None):
+    # Generator over files below source_folder (or a list of roots, see
+    # source_roots). Each entry carries the stat result from scandir so
+    # callers never stat the same file twice.
+    #   include/exclude: fnmatch patterns (exclude also prunes directories)
+    #   kinds: only yield these kinds ("image", "video", "document", "other")
+    #   skip_dirs: directories to prune, e.g. a destination inside the source
+    #   sniff: None, "unknown" or "all" (see utils.classifier); headers are
+    #          read right here, while the folder's inodes are still hot
+    if sniff is not None and sniff not in SNIFF_MODES:
+        raise ValueError(f"Unknown sniff mode: {sniff} (choose from {', '.join(SNIFF_MODES)})")
+    include = [p.lower() for p in include or ()]
+    exclude = [p.lower() for p in exclude or ()]
+    skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs if d}
+    stack = list(reversed(source_roots(source_folder)))
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            lowered = name.lower()
+            if exclude and _matches(lowered, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.normcase(os.path.abspath(entry.path)) not in skip:
+                        subdirs.append(entry.path)
+                    continue
+                if entry.is_dir():
+                    # A symlink to a folder: not followed, like os.walk
+                    continue
+                if include and not _matches(lowered, include):
+                    continue
+                kind, group = _classify(entry.path, name, sniff)
+                if kinds and kind not in kinds:
+                    continue
+                yield ScanEntry(entry.path, name, entry.stat(), kind, group)
+            except OSError:
+                continue
+
+        # Reversed so the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirs))
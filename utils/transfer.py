@@ -0,0 +1,214 @@
+import os
+import errno
+import shutil
+import threading
+from utils.hashing import READ_BUFFER_SIZE, StreamHasher, default_algorithm, read_buffer
+
+TRANSFER_MODES = ("copy", "move", "hardlink", "symlink", "reflink", "auto")
+
+FICLONE = 0x40049409  # linux/fs.h
+COPY_CHUNK = 64 * 1024 * 1024
+
+# copy_file_range errors meaning "not between these two files", not failure
+_NO_COPY_RANGE = (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.EBADF)
+
+_device_cache = {}
+_device_lock = threading.Lock()
+
+# --- Device detection ---
+
+def device_of(folder):
+    key = os.path.abspath(folder)
+    with _device_lock:
+        dev = _device_cache.get(key)
+    if dev is None:
+        dev = os.stat(key).st_dev
+        with _device_lock:
+            _device_cache[key] = dev
+    return dev
+
+def same_device(src, dest_folder, src_stat=None):
+    try:
+        src_dev = (src_stat or os.stat(src)).st_dev
+        return src_dev == device_of(dest_folder)
+    except OSError:
+        return False
+
+# --- Transfer primitives ---
+
+def _copy_range(src, dest, size):
+    # In-kernel copy; NFS 4.2 and SMB3 turn it into a server-side copy, so
+    # the data never crosses the network twice. Returns False if unsupported,
+    # or if it stopped short: procfs/sysfs and some FUSE, CIFS and overlay
+    # kernels report 0 bytes copied for a file that is not empty.
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        copied = 0
+        while True:
+            try:
+                n = os.copy_file_range(s.fileno(), d.fileno(), COPY_CHUNK)
+            except OSError as e:
+                if copied == 0 and e.errno in _NO_COPY_RANGE:
+                    break
+                raise
+            if n == 0:
+                break
+            copied += n
+    return copied == size
+
+class Checksum:
+    # Asks transfer_file to hash the bytes it copies; content_hash and
+    # sample_hash (see utils.hashing) are filled in afterwards. Renames,
+    # links and clones copy nothing and leave them None.
+    #   verify: read the copy back from the device and compare
+    __slots__ = ("algorithm", "verify", "content_hash", "sample_hash")
+
+    def __init__(self, algorithm=None, verify=False):
+        self.algorithm = algorithm or default_algorithm()
+        self.verify = verify
+        self.content_hash = None
+        self.sample_hash = None
+
+def _write_all(f, view):
+    while view:
+        view = view[f.write(view):]
+
+def _drop_cache(fd):
+    # So the verification read comes from the device, not the page cache
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def hash_copy(src, dest, checksum, src_stat=None, buffer_size=READ_BUFFER_SIZE):
+    # One read per byte: each chunk read into the thread's reusable buffer is
+    # hashed and written from the same memory (1 MB chunks measured best, see
+    # benchmarks/bench_hash_copy.py). With checksum.verify the copy
+    # is flushed, evicted from the cache and hashed again. On any failure,
+    # including a source that changed size while being read, the partial
+    # copy is removed and OSError raised, so a move never drops the source.
+    size = (src_stat or os.stat(src)).st_size
+    view = read_buffer(buffer_size)
+    hasher = StreamHasher(size, checksum.algorithm)
+    created = False
+    try:
+        with open(src, "rb", buffering=0) as s, open(dest, "wb", buffering=0) as d:
+            created = True
+            while True:
+                n = s.readinto(view)
+                if not n:
+                    break
+                hasher.update(view[:n])
+                _write_all(d, view[:n])
+            if checksum.verify:
+                os.fsync(d.fileno())
+                _drop_cache(d.fileno())
+        checksum.content_hash, checksum.sample_hash = hasher.hexdigests()
+        if checksum.content_hash is None:
+            raise OSError(errno.EIO, "source changed size while being copied", src)
+
+        if checksum.verify:
+            copied = StreamHasher(size, checksum.algorithm)
+            with open(dest, "rb", buffering=0) as d:
+                while True:
+                    n = d.readinto(view)
+                    if not n:
+                        break
+                    copied.update(view[:n])
+            if copied.hexdigests()[0] != checksum.content_hash:
+                raise OSError(errno.EIO, "copy does not match the source (verification failed)", dest)
+        shutil.copystat(src, dest)
+    except BaseException:
+        checksum.content_hash = checksum.sample_hash = None
+        if created:
+            _discard(dest)
+        raise
+
+def copy_file(src, dest, src_stat=None, checksum=None):
+    # shutil.copy2 with copy_file_range first; shutil falls back to
+    # sendfile on Linux and a buffered copy elsewhere. With a checksum the
+    # bytes go through userspace once instead, to be hashed on the way.
+    if checksum is not None:
+        hash_copy(src, dest, checksum, src_stat)
+        return
+    size = (src_stat or os.stat(src)).st_size
+    try:
+        if not (hasattr(os, "copy_file_range") and _copy_range(src, dest, size)):
+            shutil.copyfile(src, dest)
+        shutil.copystat(src, dest)
+    except shutil.SameFileError:
+        raise
+    except BaseException:
+        # Never leave a partial copy behind (e.g. ENOSPC halfway)
+        _discard(dest)
+        raise
+
+def reflink(src, dest):
+    # Copy-on-write clone (btrfs, XFS, bcachefs); raises OSError when the
+    # filesystem or platform cannot clone.
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dest)
+            raise
+    shutil.copystat(src, dest)
+
+def _link_or_copy(link, src, dest, checksum=None):
+    try:
+        link(src, dest)
+        return True
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.EMLINK, errno.ENOTSUP):
+            raise
+    copy_file(src, dest, checksum=checksum)
+    return False
+
+def resolve_mode(mode, src, dest_folder, src_stat=None):
+    if mode != "auto":
+        return mode
+    return "reflink" if same_device(src, dest_folder, src_stat) else "copy"
+
+def transfer_file(src, dest, mode="copy", src_stat=None, checksum=None):
+    # Returns the mode that was actually used after fallbacks
+    # checksum: a Checksum to hash (and verify) whatever is copied
+    if mode not in TRANSFER_MODES:
+        raise ValueError(f"Unknown transfer mode: {mode}")
+    dest_folder = os.path.dirname(dest)
+    auto = mode == "auto"
+    mode = resolve_mode(mode, src, dest_folder, src_stat)
+
+    if mode == "copy":
+        copy_file(src, dest, src_stat, checksum)
+    elif mode == "move":
+        if same_device(src, dest_folder, src_stat):
+            os.rename(src, dest)
+        elif checksum is not None:
+            # The source is only removed once the copy is complete (and verified)
+            copy_file(src, dest, src_stat, checksum)
+            os.remove(src)
+        else:
+            shutil.move(src, dest)
+    elif mode == "hardlink":
+        if not _link_or_copy(os.link, src, dest, checksum):
+            return "copy"
+    elif mode == "symlink":
+        os.symlink(os.path.abspath(src), dest)
+    elif mode == "reflink":
+        try:
+            reflink(src, dest)
+        except OSError:
+            # Same volume without CoW support: a hard link is still free
+            if auto:
+                return "hardlink" if _link_or_copy(os.link, src, dest, checksum) else "copy"
+            copy_file(src, dest, src_stat, checksum)
+            return "copy"
+    return mode
@@ -0,0 +1,81 @@
+import numpy as np
+from utils.perceptual import near_pairs, popcount
+
+DEFAULT_SAMPLES = 16
+
+# Frames with almost no gradients (black, white, fades) hash to nearly all
+# zeros or ones and would match every other video.
+MIN_FRAME_BITS = 4
+MAX_FRAME_BITS = 60
+
+def _frame_dhash(frame, cv2):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+def video_fingerprint(file_path, samples=DEFAULT_SAMPLES):
+    # Seeks to `samples` evenly spaced timestamps instead of decoding the
+    # whole stream; returns a uint64 array of frame dHashes.
+    import cv2
+    capture = cv2.VideoCapture(file_path)
+    try:
+        if not capture.isOpened():
+            return np.empty(0, dtype=np.uint64)
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        frames = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        duration_ms = frames / fps * 1000 if fps else 0
+        if duration_ms <= 0:
+            # Unknown length: every seek would land on the first frame
+            return np.empty(0, dtype=np.uint64)
+        hashes = []
+        for k in range(samples):
+            capture.set(cv2.CAP_PROP_POS_MSEC, (k + 0.5) / samples * duration_ms)
+            ok, frame = capture.read()
+            if ok:
+                hashes.append(_frame_dhash(frame, cv2))
+        return np.array(hashes, dtype=np.uint64)
+    finally:
+        capture.release()
+
+def to_blob(fingerprint):
+    return np.asarray(fingerprint, dtype="<u8").tobytes()
+
+def from_blob(blob):
+    return np.frombuffer(blob, dtype="<u8").astype(np.uint64)
+
+def informative(fingerprint):
+    bits = popcount(fingerprint)
+    return fingerprint[(bits >= MIN_FRAME_BITS) & (bits <= MAX_FRAME_BITS)]
+
+def match_videos(fingerprints, frame_threshold=10, min_ratio=0.5):
+    # Pools every sampled frame into one multi-index search, then calls two
+    # videos duplicates when enough of the shorter one's frames have a close
+    # frame in the other. Trims and re-muxes shift sample positions, so
+    # frames are matched as sets rather than position by position.
+    owners, frames = [], []
+    usable = [informative(fp) for fp in fingerprints]
+    for video, fp in enumerate(usable):
+        owners.extend([video] * len(fp))
+        frames.append(fp)
+    if not owners:
+        return []
+    owners = np.array(owners)
+    pairs = near_pairs(np.concatenate(frames), frame_threshold)
+
+    matched = {}
+    for i, j in pairs:
+        a, b = owners[i], owners[j]
+        if a == b:
+            continue
+        key = (min(a, b), max(a, b))
+        hits = matched.setdefault(key, (set(), set()))
+        hits[0 if a == key[0] else 1].add(int(i))
+        hits[1 if a == key[0] else 0].add(int(j))
+
+    result = []
+    for (a, b), (hits_a, hits_b) in matched.items():
+        shorter = min(len(usable[a]), len(usable[b]))
+        if shorter and min(len(hits_a), len(hits_b)) >= min_ratio * shorter:
+            result.append((int(a), int(b)))
+    return result
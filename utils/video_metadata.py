@@ -0,0 +1,148 @@
+import json
+import shutil
+import struct
+import datetime
+import subprocess
+from utils.metrics import metrics
+from utils.parallel import map_ahead
+
+MP4_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.3gp')
+MP4_EPOCH_OFFSET = 2082844800  # seconds between 1904-01-01 and 1970-01-01
+PROBE_TIMEOUT = 30
+
+FFPROBE = shutil.which("ffprobe")
+
+def empty_metadata():
+    return {"date_taken": None, "duration": None, "resolution": None}
+
+# --- MP4/MOV atom parsing ---
+
+def _iter_boxes(f, start, end):
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+def _parse_mvhd(data):
+    version = data[0]
+    if version == 1:
+        created, _, timescale, duration = struct.unpack(">QQIQ", data[4:32])
+    else:
+        created, _, timescale, duration = struct.unpack(">IIII", data[4:20])
+    return created, (duration / timescale if timescale else None)
+
+def _parse_tkhd_size(data):
+    width, height = struct.unpack(">II", data[-8:])
+    return width >> 16, height >> 16
+
+def _read_mp4(file_path):
+    # Returns (metadata or None, whether an mvhd box was read). A file whose
+    # mvhd has no creation time (0) has no date; ffprobe would find none either.
+    meta = empty_metadata()
+    has_mvhd = False
+    with open(file_path, "rb") as f:
+        end = f.seek(0, 2)
+        f.seek(4)
+        if f.read(4) not in (b"ftyp", b"moov", b"wide", b"mdat", b"free", b"skip", b"pnot"):
+            return None, False
+        for box_type, start, stop in _iter_boxes(f, 0, end):
+            if box_type != b"moov":
+                continue
+            for child, c_start, c_stop in _iter_boxes(f, start, stop):
+                if child == b"mvhd":
+                    f.seek(c_start)
+                    created, duration = _parse_mvhd(f.read(min(c_stop - c_start, 120)))
+                    if created > MP4_EPOCH_OFFSET:
+                        meta["date_taken"] = datetime.datetime.fromtimestamp(created - MP4_EPOCH_OFFSET)
+                    meta["duration"] = duration
+                    has_mvhd = True
+                elif child == b"trak" and meta["resolution"] is None:
+                    for atom, a_start, a_stop in _iter_boxes(f, c_start, c_stop):
+                        if atom == b"tkhd":
+                            f.seek(a_start)
+                            width, height = _parse_tkhd_size(f.read(a_stop - a_start))
+                            if width and height:
+                                meta["resolution"] = f"{width}x{height}"
+                            break
+            return meta, has_mvhd
+    return None, False
+
+def read_mp4_metadata(file_path):
+    # Reads only box headers plus mvhd/tkhd, even when moov sits at the end
+    return _read_mp4(file_path)[0]
+
+# --- ffprobe fallback ---
+
+def probe_ffprobe(file_path, timeout=PROBE_TIMEOUT):
+    meta = empty_metadata()
+    if FFPROBE is None:
+        return meta
+    command = [
+        FFPROBE, '-v', 'quiet', '-print_format', 'json',
+        '-show_entries', 'format=duration:format_tags=creation_time:stream=width,height,codec_type',
+        file_path
+    ]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
+        data = json.loads(result.stdout or "{}")
+    except (subprocess.TimeoutExpired, ValueError, OSError):
+        return meta
+
+    fmt = data.get('format', {})
+    date_str = fmt.get('tags', {}).get('creation_time', '')
+    if date_str:
+        try:
+            parsed = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            meta["date_taken"] = parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+        except ValueError:
+            pass
+    if fmt.get('duration'):
+        meta["duration"] = float(fmt['duration'])
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video' and stream.get('width'):
+            meta["resolution"] = f"{stream['width']}x{stream['height']}"
+            break
+    return meta
+
+# --- Public API ---
+
+def get_video_metadata(file_path, timeout=PROBE_TIMEOUT):
+    meta, has_mvhd = None, False
+    if file_path.lower().endswith(MP4_EXTENSIONS):
+        try:
+            with metrics.timer("mp4_header", file_path, "video"):
+                meta, has_mvhd = _read_mp4(file_path)
+        except (OSError, struct.error, IndexError, ValueError, OverflowError):
+            # Truncated boxes or a creation time out of range: let ffprobe try
+            meta, has_mvhd = None, False
+    if meta is not None and (meta["date_taken"] is not None or has_mvhd):
+        return meta
+
+    with metrics.timer("ffprobe", file_path, "video"):
+        probed = probe_ffprobe(file_path, timeout)
+    if meta is not None:
+        probed.update({k: v for k, v in meta.items() if v is not None})
+    return probed
+
+def probe_videos(paths, workers=4, timeout=PROBE_TIMEOUT):
+    # Bounded pool: at most `workers` ffprobe processes run at once, and each
+    # one is killed after `timeout` seconds.
+    def probe(path):
+        return get_video_metadata(path, timeout)
+    for path, meta in map_ahead(probe, paths, workers, "thread", batch_size=workers * 4):
+        if isinstance(meta, Exception):
+            meta = empty_metadata()
+        yield path, meta
@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import stat
+import errno
+import select
+import struct
+from fnmatch import fnmatch
+from utils.scanner import scan, source_roots
+
+# Filesystem change sources for watch mode, plus the debouncer that decides
+# when a new file is complete.
+#
+# InotifyWatcher (Linux) blocks in poll() on an inotify descriptor, so an
+# idle watch costs no CPU at all; it watches every directory below the roots
+# and picks up new subdirectories as they appear. PollingWatcher is the
+# fallback elsewhere: it rescans the roots every `interval` seconds and diffs
+# (size, mtime) against the previous scan.
+#
+# Both expose changes(timeout) -> (changed paths, removed paths), returning
+# early when something happened and after `timeout` seconds (None = block)
+# otherwise.
+
+DEFAULT_SETTLE = 2.0
+DEFAULT_POLL_INTERVAL = 5.0
+# Names writers use while a file is still incomplete
+DEFAULT_IGNORE = ("*.part", "*.partial", "*.crdownload", "*.download", "*.tmp", "~$*", ".*")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+READ_SIZE = 64 * 1024
+
+def ignored(name, patterns):
+    return any(fnmatch(name, pattern) for pattern in patterns)
+
+def _libc():
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.inotify_init1  # AttributeError when the C library has no inotify
+    return libc, ctypes
+
+class InotifyWatcher:
+    def __init__(self, roots, skip_dirs=(), ignore=DEFAULT_IGNORE):
+        self.libc, self.ctypes = _libc()
+        self.roots = source_roots(roots)
+        self.skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs if d}
+        self.ignore = ignore
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise self._error("inotify_init1")
+        self.poller = select.poll()
+        self.poller.register(self.fd, select.POLLIN)
+        self.paths = {}  # watch descriptor -> directory
+        self.found = set()  # files found while adding watches for new folders
+        for root in self.roots:
+            self._watch_tree(root, report=False)
+
+    def _error(self, call, path=None):
+        code = self.ctypes.get_errno()
+        if code == errno.ENOSPC:
+            return OSError(code, f"{call}: inotify watch limit reached "
+                                 "(raise fs.inotify.max_user_watches or use polling)", path)
+        return OSError(code, f"{call}: {os.strerror(code)}", path)
+
+    def _watch_tree(self, folder, report=True):
+        # Adds a watch on folder and everything below it. Files created
+        # before a watch existed would be missed, so with report=True the
+        # ones already there are reported as changed.
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            if os.path.normcase(os.path.abspath(current)) in self.skip:
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                if self.ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # gone again already
+                raise self._error("inotify_add_watch", current)
+            self.paths[wd] = current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if ignored(entry.name, self.ignore):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif report:
+                            self.found.add(entry.path)
+            except OSError:
+                continue
+
+    def _rescan(self):
+        # After a queue overflow: start over and report every file
+        for wd in list(self.paths):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.paths.clear()
+        for root in self.roots:
+            self._watch_tree(root)
+
+    def changes(self, timeout=None):
+        changed, removed = set(), set()
+        if self.found:
+            changed, self.found = self.found, set()
+            timeout = 0
+        if not self.poller.poll(None if timeout is None else int(timeout * 1000)):
+            return changed, removed
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            self._parse(data, changed, removed)
+        changed |= self.found
+        self.found = set()
+        return changed - removed, removed
+
+    def _parse(self, data, changed, removed):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                print("⚠️ inotify queue overflowed; rescanning", file=sys.stderr)
+                self._rescan()
+                continue
+            folder = self.paths.get(wd)
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self.paths.pop(wd, None)
+                continue
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, name)
+            if mask & IN_ISDIR:
+                # A folder moved within the tree keeps its watch descriptors;
+                # adding them again just points them at the new paths
+                if mask & (IN_CREATE | IN_MOVED_TO) and not ignored(name, self.ignore):
+                    self._watch_tree(path)
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                removed.add(path)
+                changed.discard(path)
+            elif not ignored(name, self.ignore):
+                removed.discard(path)
+                changed.add(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    def __init__(self, roots, skip_dirs=(), ignore=DEFAULT_IGNORE, interval=DEFAULT_POLL_INTERVAL):
+        self.roots = source_roots(roots)
+        self.skip_dirs = list(skip_dirs)
+        self.ignore = ignore
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        return {entry.path: (entry.size, entry.mtime_ns)
+                for entry in scan(self.roots, exclude=self.ignore, skip_dirs=self.skip_dirs)}
+
+    def changes(self, timeout=None):
+        wait = self.next_scan - time.monotonic()
+        if timeout is not None and timeout < wait:
+            time.sleep(max(0.0, timeout))
+            return set(), set()
+        time.sleep(max(0.0, wait))
+        current = self._scan()
+        self.next_scan = time.monotonic() + self.interval
+        changed = {path for path, signature in current.items() if self.snapshot.get(path) != signature}
+        removed = set(self.snapshot) - set(current)
+        self.snapshot = current
+        return changed, removed
+
+    def close(self):
+        pass
+
+def open_watcher(roots, skip_dirs=(), ignore=DEFAULT_IGNORE, poll_interval=None):
+    # inotify where the platform has it, polling otherwise (or when a
+    # poll_interval is given, e.g. for network shares inotify cannot see)
+    if poll_interval is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, skip_dirs, ignore)
+        except (AttributeError, OSError) as e:
+            print(f"⚠️ inotify unavailable ({e}); falling back to polling", file=sys.stderr)
+    return PollingWatcher(roots, skip_dirs, ignore, poll_interval or DEFAULT_POLL_INTERVAL)
+
+class Debouncer:
+    # Holds changed paths until their writer is done. A file is ready once
+    # no event touched it for `settle` seconds and it looks finished: its
+    # mtime is at least `settle` seconds old, or its (size, mtime) did not
+    # change since the previous check (writers that preserve mtimes, clock
+    # skew on network shares).
+    def __init__(self, settle=DEFAULT_SETTLE):
+        self.settle = settle
+        self.pending = {}  # path -> (last event, (size, mtime_ns) at the last check)
+
+    def __len__(self):
+        return len(self.pending)
+
+    def touch(self, path, now=None):
+        previous = self.pending.get(path)
+        self.pending[path] = (now or time.monotonic(), previous[1] if previous else None)
+
+    def discard(self, path):
+        self.pending.pop(path, None)
+
+    def next_check(self, now=None):
+        # Seconds until the earliest pending file may be ready, None if idle
+        if not self.pending:
+            return None
+        now = now or time.monotonic()
+        return max(0.0, min(last for last, _ in self.pending.values()) + self.settle - now)
+
+    def ready(self, now=None):
+        # Returns [(path, stat)] of the files that settled
+        now = now or time.monotonic()
+        wall = time.time()
+        settled = []
+        for path, (last, signature) in list(self.pending.items()):
+            if now - last < self.settle:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                del self.pending[path]
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if wall - st.st_mtime >= self.settle or current == signature:
+                del self.pending[path]
+                settled.append((path, st))
+            else:
+                self.pending[path] = (now, current)
+        return settled